@@ -0,0 +1,35 @@
+import numpy as np
+
+# Vectorized as-of alignment of two sorted sample streams (e.g. accelerometer
+# rows onto load cell times). Both time arrays are epoch seconds, ascending.
+
+# Accelerometer samples further than this from a load cell sample are left out (NaN)
+ACCEL_TOLERANCE_S = 0.1
+
+
+def accel_tolerance(bucket_ms):
+    # Bucketed rows of both tables share the bucket centres, allow up to half a bucket
+    return max(ACCEL_TOLERANCE_S, bucket_ms / 2000)
+
+
+def asof_indices(times, other_times, tolerance):
+    """
+    Index into other_times of the latest sample at or before each of `times`,
+    -1 when there is none within `tolerance` seconds.
+    """
+    times = np.asarray(times, dtype=float)
+    other_times = np.asarray(other_times, dtype=float)
+    idx = np.searchsorted(other_times, times, side="right") - 1
+    found = idx >= 0
+    found[found] = (times[found] - other_times[idx[found]]) <= tolerance
+    return np.where(found, idx, -1)
+
+
+def asof_align(times, other_times, other_values, tolerance):
+    """Rows of other_values (M, k) merged onto `times` (N,) -> (N, k), NaN where nothing matched."""
+    other_values = np.asarray(other_values, dtype=float).reshape(len(other_times), -1)
+    idx = asof_indices(times, other_times, tolerance)
+    aligned = np.full((len(idx), other_values.shape[1]), np.nan)
+    matched = idx >= 0
+    aligned[matched] = other_values[idx[matched]]
+    return aligned
@@ -0,0 +1,83 @@
+import datetime
+
+# Fixed time-bucket averaging shared by the plotter and the exporters.
+# Buckets are aligned to the epoch, so every bucket covers the same time span
+# whatever the Teensy sample rate is and however many samples were dropped.
+
+BUCKET_OPTIONS = {
+    "Raw": 0,
+    "10 ms": 10,
+    "100 ms": 100,
+    "500 ms": 500,
+    "1 s": 1000,
+}
+
+# Tables holding samples. Offsets and config rows are events and are never averaged.
+SAMPLED_TABLES = ("load_cells", "accelerometer")
+
+# Seconds since a naive 1970-01-01 (SQLite treats our naive timestamps as UTC).
+# Whole seconds and the fraction are converted separately to keep microseconds,
+# julianday() alone rounds to the millisecond.
+EPOCH_SQL = "(CAST(strftime('%s', substr(timestamp, 1, 19)) AS INTEGER) + CAST('0' || substr(timestamp, 20) AS REAL))"
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def bucket_ms_from_text(text):
+    return BUCKET_OPTIONS.get(text, 0)
+
+
+def epoch_to_datetime(seconds):
+    return EPOCH + datetime.timedelta(seconds=seconds)
+
+
+def datetime_to_epoch(dt):
+    return (dt - EPOCH).total_seconds()
+
+
+def bucketed_select(table, columns, bucket_ms, where="timestamp >= ? AND timestamp < ?"):
+    """
+    Build a SELECT returning (epoch_seconds, *values) rows from `table`.
+    With bucket_ms > 0 the rows are averaged in SQL per fixed time bucket and
+    stamped with the bucket centre; otherwise the raw rows are returned.
+    """
+    value_cols = [c for c in columns if c != "timestamp"]
+
+    if bucket_ms <= 0:
+        return f"""
+            SELECT {EPOCH_SQL} AS t, {', '.join(value_cols)}
+            FROM {table}
+            WHERE {where}
+            ORDER BY timestamp
+        """
+
+    avg_cols = ", ".join(f"AVG({c})" for c in value_cols)
+    return f"""
+        SELECT (bucket * {bucket_ms} + {bucket_ms / 2}) / 1000.0 AS t, {avg_cols}
+        FROM (
+            SELECT CAST(ROUND({EPOCH_SQL} * 1000) AS INTEGER) / {bucket_ms} AS bucket, {', '.join(value_cols)}
+            FROM {table}
+            WHERE {where}
+        )
+        GROUP BY bucket
+        ORDER BY bucket
+    """
+
+
+def choose_bucket_ms(span_ms, max_points, max_sps=800):
+    """
+    Finest bucket (raw first) that keeps a span of span_ms under max_points rows.
+    Raw row counts are estimated from the highest Teensy sample rate.
+    """
+    if span_ms / 1000 * max_sps <= max_points:
+        return 0
+    for bucket_ms in sorted(b for b in BUCKET_OPTIONS.values() if b > 0):
+        if span_ms / bucket_ms <= max_points:
+            return bucket_ms
+    return max(BUCKET_OPTIONS.values())
+
+
+def is_finer(bucket_ms, than_ms):
+    """True when bucket_ms resolves more detail than than_ms (0 = raw is the finest)."""
+    if than_ms == 0:
+        return False
+    return bucket_ms == 0 or bucket_ms < than_ms
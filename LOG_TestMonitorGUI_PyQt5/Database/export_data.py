@@ -1,17 +1,21 @@
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, 
-    QDateTimeEdit, QFileDialog, QMessageBox, QCheckBox, QComboBox
+    QDateTimeEdit, QFileDialog, QMessageBox, QCheckBox, QComboBox, QProgressBar
 )
-from PyQt5.QtCore import QDateTime
-import csv
-import datetime
-import os
-from Database.db import get_connection
-import pandas as pd
-import numpy as np
+from PyQt5.QtCore import QDateTime, pyqtSignal
+import threading
+import time
+from Database.db import get_db_path
+from Database.averaging import BUCKET_OPTIONS, bucket_ms_from_text
+from Database import export_engine
+from Database.export_engine import MERGED, SLICED_TABLES
+from Database.export_formats import FORMAT_LABELS, ExportFormatError, check_format
+from ui.query_service import QueryService, LANE_EXPORT
 
 
 class DataExportDialog(QDialog):
+    export_progress = pyqtSignal(str, int, int)  # table, rows read, rows in range; emitted from the export worker
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Export Sensor Data")
@@ -32,12 +36,19 @@ class DataExportDialog(QDialog):
         layout.addWidget(QLabel("End Time:"))
         layout.addWidget(self.end_dt)
 
-        self.smoothing_label = QLabel("Smoothing Factor (1 = Raw):")
+        self.smoothing_label = QLabel("Averaging Window:")
         self.smoothing_combo = QComboBox()
-        self.smoothing_combo.addItems(["1", "2", "4", "8", "16", "32", "64"])
+        self.smoothing_combo.addItems(list(BUCKET_OPTIONS))
         layout.addWidget(self.smoothing_label)
         layout.addWidget(self.smoothing_combo)
 
+        # CSV first, the binary formats keep typed columns and int64 timestamps
+        self.format_combo = QComboBox()
+        for format_name, label in FORMAT_LABELS.items():
+            self.format_combo.addItem(label, format_name)
+        layout.addWidget(QLabel("Format:"))
+        layout.addWidget(self.format_combo)
+
         # Checkboxes
         self.cb_load_cells = QCheckBox("Export Load Cells")
         self.cb_load_cells.setChecked(True)
@@ -49,11 +60,14 @@ class DataExportDialog(QDialog):
         self.cb_accel_offsets.setChecked(True)
         self.cb_log_config = QCheckBox("Export LOG Config")
         self.cb_log_config.setChecked(True)
+        # One time-aligned table: loads, accel, forces/moments, active offsets and config
+        self.cb_merged = QCheckBox("Export Merged Table (loads, accel, forces, offsets, config)")
         layout.addWidget(self.cb_log_config)
         layout.addWidget(self.cb_load_cells)
         layout.addWidget(self.cb_lc_offsets)
         layout.addWidget(self.cb_accel)
         layout.addWidget(self.cb_accel_offsets)
+        layout.addWidget(self.cb_merged)
 
         # Folder selector
         folder_layout = QHBoxLayout()
@@ -64,13 +78,27 @@ class DataExportDialog(QDialog):
         folder_layout.addWidget(self.select_folder_btn)
         layout.addLayout(folder_layout)
 
-        # Export button
+        # Export and cancel buttons
+        button_layout = QHBoxLayout()
         self.export_btn = QPushButton("Export")
         self.export_btn.clicked.connect(self.run_export)
-        layout.addWidget(self.export_btn)
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel_export)
+        button_layout.addWidget(self.export_btn)
+        button_layout.addWidget(self.cancel_btn)
+        layout.addLayout(button_layout)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1000)
+        self.progress_label = QLabel("")
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.progress_label)
 
         self.setLayout(layout)
         self.output_folder = None
+        self.cancel_event = None
+        self.export_progress.connect(self.on_export_progress)
+        self.set_exporting(False)
 
     def select_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "Select Export Folder")
@@ -85,79 +113,84 @@ class DataExportDialog(QDialog):
 
         start = self.start_dt.dateTime().toPyDateTime().replace(microsecond=0)
         end = self.end_dt.dateTime().toPyDateTime().replace(microsecond=0)
-        base = f"{start.strftime('%Y-%m-%d_%H-%M-%S')}_to_{end.strftime('%Y-%m-%d_%H-%M-%S')}"
-        row_counts = []
-
+        bucket_ms = bucket_ms_from_text(self.smoothing_combo.currentText())
+        selected = [(table, label) for checkbox, table, label in [
+            (self.cb_load_cells, "load_cells", "Load Cells"),
+            (self.cb_accel, "accelerometer", "Accelerometer"),
+            (self.cb_lc_offsets, "load_cell_zero_offsets", "Load Cell Zero Offsets"),
+            (self.cb_accel_offsets, "accelerometer_zero_offsets", "Accelerometer Zero Offsets"),
+            (self.cb_log_config, "log_config", "Config Log"),
+            (self.cb_merged, MERGED, "Merged"),
+        ] if checkbox.isChecked()]
+        labels = dict(selected)
+        format_name = self.format_combo.currentData()
         try:
-            if self.cb_load_cells.isChecked():
-                n = self.export_table("load_cells",
-                                      ["timestamp", "lc1", "lc2", "lc3", "lc4", "lc5", "lc6"],
-                                      start, end, f"load_cells_{base}.csv")
-                row_counts.append(f"Load Cells: {n}")
-
-            if self.cb_accel.isChecked():
-                n = self.export_table("accelerometer",
-                                      ["timestamp", "ax", "ay", "az"],
-                                      start, end, f"accelerometer_{base}.csv")
-                row_counts.append(f"Accelerometer: {n}")
-
-            if self.cb_lc_offsets.isChecked():
-                n = self.export_table("load_cell_zero_offsets",
-                                      ["timestamp", "lc1_offset", "lc2_offset", "lc3_offset", "lc4_offset", "lc5_offset", "lc6_offset"],
-                                      start, end, f"load_cell_zero_offsets_{base}.csv")
-                row_counts.append(f"Load Cell Zero Offsets: {n}")
-
-            if self.cb_accel_offsets.isChecked():
-                n = self.export_table("accelerometer_zero_offsets",
-                                      ["timestamp", "ax_offset", "ay_offset", "az_offset"],
-                                      start, end, f"accelerometer_zero_offsets_{base}.csv")
-                row_counts.append(f"Accelerometer Zero Offsets: {n}")
-
-            if self.cb_log_config.isChecked():
-                n = self.export_table("log_config",
-                                    ["timestamp", "wheel_type", "depth", "feed_rate", "pitch"],
-                                    start, end, f"log_config_{base}.csv")
-                row_counts.append(f"Config Log: {n}")
-
-            summary = "\n".join(row_counts)
-            QMessageBox.information(self, "Export Complete", f"✅ Data export complete.\n\n{summary}")
-
-        except Exception as e:
-            QMessageBox.critical(self, "Export Failed", f"❌ Error: {e}")
-
-    def export_table(self, table, columns, start_time, end_time, filename):
-        smoothing_factor = int(self.smoothing_combo.currentText())
-        print(f"Exporting {table} data from {start_time} to {end_time} with smoothing factor {smoothing_factor}")
-
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(f"""
-            SELECT {', '.join(columns)}
-            FROM {table}
-            WHERE timestamp >= ? AND timestamp < ?
-            ORDER BY timestamp
-        """, (start_time, end_time))
-        rows = cursor.fetchall()
-        conn.close()
-
-        # Create DataFrame
-        df = pd.DataFrame(rows, columns=columns)
-
-        # Handle timestamp conversion
-        df['timestamp'] = pd.to_datetime(df['timestamp'], format='mixed')
-
-        # Apply smoothing if needed
-        if smoothing_factor > 1:
-            # Create group labels for averaging
-            group_labels = np.arange(len(df)) // smoothing_factor
-            df = df.groupby(group_labels).agg({
-                'timestamp': 'mean',
-                **{col: 'mean' for col in columns if col != 'timestamp'}
-            }).reset_index(drop=True)
-
-        # Export to CSV
-        full_path = os.path.join(self.output_folder, filename)
-        df['timestamp'] = df['timestamp'].dt.strftime("%Y-%m-%d %H:%M:%S.%f").str[:-3]
-        df.to_csv(full_path, index=False)
-
-        return len(df)
+            check_format(format_name)
+        except ExportFormatError as e:
+            QMessageBox.warning(self, "Format unavailable", str(e))
+            return
+        print(f"Exporting {', '.join(labels)} from {start} to {end} with {bucket_ms} ms buckets as {format_name}")
+
+        # Runs on the shared query workers (export lane), the GUI and live data keep going
+        self.export_labels = labels
+        self.export_progress_rows = {table: (0, 0) for table in labels}
+        self.export_started = time.perf_counter()
+        self.cancel_event = threading.Event()
+        self.set_exporting(True)
+        self.update_progress_display()
+        QueryService.instance().submit(
+            LANE_EXPORT, export_engine.export_tables,
+            (get_db_path(), tuple(labels), start, end, self.output_folder, bucket_ms,
+             None, None, self.export_progress.emit, self.cancel_event, format_name),
+            self.on_export_finished, self.on_export_failed, owner=self)
+
+    def cancel_export(self):
+        if self.cancel_event and self.cancel_btn.isEnabled():
+            self.cancel_event.set()
+            self.cancel_btn.setEnabled(False)
+            self.progress_label.setText(self.progress_label.text() + "\nCancelling...")
+
+    def set_exporting(self, exporting):
+        self.export_btn.setEnabled(not exporting)
+        self.cancel_btn.setEnabled(exporting)
+        self.progress_bar.setVisible(exporting)
+        self.progress_label.setVisible(exporting)
+
+    def on_export_progress(self, table, done, total):
+        self.export_progress_rows[table] = (done, total)
+        self.update_progress_display()
+
+    def update_progress_display(self):
+        lines = []
+        for table, label in self.export_labels.items():
+            done, total = self.export_progress_rows[table]
+            lines.append(f"{label}: {done:,} / {total:,} rows")
+
+        done = sum(d for d, _ in self.export_progress_rows.values())
+        total = sum(t for _, t in self.export_progress_rows.values())
+        elapsed = time.perf_counter() - self.export_started
+        if done and total > done:
+            remaining = (total - done) * elapsed / done
+            lines.append(f"{done / elapsed:,.0f} rows/s, about {remaining:.0f} s left")
+        self.progress_label.setText("\n".join(lines))
+        self.progress_bar.setValue(int(1000 * done / total) if total else 0)
+
+    def on_export_finished(self, results):
+        self.set_exporting(False)
+        elapsed = time.perf_counter() - self.export_started
+        row_counts = []
+        for result in results:
+            print(f"✅ Exported {result.summary()}")
+            rate = f"  ({result.rows_per_s:,.0f} rows/s)" if result.table in SLICED_TABLES else ""
+            row_counts.append(f"{self.export_labels[result.table]}: {result.rows}{rate}")
+
+        summary = "\n".join(row_counts)
+        QMessageBox.information(self, "Export Complete",
+                                f"✅ Data export complete in {elapsed:.1f} s.\n\n{summary}\n\n{self.output_folder}")
+
+    def on_export_failed(self, error):
+        self.set_exporting(False)
+        if self.cancel_event.is_set():
+            QMessageBox.information(self, "Export Cancelled", "Export cancelled, partially written files were removed.")
+        else:
+            QMessageBox.critical(self, "Export Failed", f"❌ Error: {error}")
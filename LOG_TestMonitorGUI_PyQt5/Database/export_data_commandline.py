@@ -1,11 +1,15 @@
 #  python3 export_data_commandline.py "2025-07-15 10:57:00" "2025-07-15 10:57:01" --load_cells
 
-import sqlite3
 import datetime
 import os
 import sys
-import pandas as pd
-import numpy as np
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Database.averaging import BUCKET_OPTIONS
+from Database import export_engine
+from Database.export_engine import MERGED, SLICES
+from Database.export_formats import ExportFormatError, check_format
 
 def get_db_path():
     if getattr(sys, 'frozen', False):
@@ -17,18 +21,11 @@ def get_db_path():
     
     return os.path.join(base_dir, "data_log.db")
 
-def get_connection():
-    db_path = get_db_path()
-    print(f"🔍 Using DB at: {db_path}")
-    conn = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES)
-    conn.execute("PRAGMA journal_mode=WAL;")
-    return conn
-
 def print_usage():
     print("""
 export_data_commandline.py
 
-Extract logged sensor data into CSV files.
+Extract logged sensor data into CSV (default), Parquet, Feather, HDF5 or NPZ files.
 
 USAGE:
   python3 export_data_commandline.py YYYY-MM-DD [options]
@@ -43,40 +40,35 @@ OPTIONS:
   --accelerometer Export Accelerometer
   --lc_offsets    Export Load Cell Zero Offsets
   --accel_offsets Export Accelerometer Zero Offsets
+  --log_config    Export LOG Config
   --all           Export all data (default)
-  --smooth N      Apply smoothing factor (default: 1)          
+  --merged        Export one time-aligned table: loads, accel (as-of matched),
+                  Fx..Mz and the zero offsets and config active at each sample
+  --bucket MS     Average into fixed MS millisecond time buckets
+                  (one of 0, 10, 100, 500, 1000; default: 0 = raw)
+  --workers N     Export processes (default: one per core)
+  --slice UNIT    Split sampled tables per day or hour for the workers
+                  (default: day for ranges over a day, else hour)
+  --format FMT    csv, parquet, feather, hdf5 or npz (default: csv). The binary
+                  formats keep typed columns and int64 microsecond timestamps;
+                  parquet and feather need pyarrow, hdf5 needs h5py
   -h, --help      Show this help message
 """)
 
-def export_table(table, columns, start_time, end_time, output_folder, filename, smoothing_factor=1):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(f"""
-        SELECT {', '.join(columns)}
-        FROM {table}
-        WHERE timestamp >= ? AND timestamp < ?
-        ORDER BY timestamp
-    """, (start_time, end_time))
-    rows = cursor.fetchall()
-    conn.close()
-
-    df = pd.DataFrame(rows, columns=columns)
-    df['timestamp'] = pd.to_datetime(df['timestamp'], format='mixed')
-
-    if smoothing_factor > 1:
-        group_labels = np.arange(len(df)) // smoothing_factor
-        df = df.groupby(group_labels).agg({
-            'timestamp': 'mean',
-            **{col: 'mean' for col in columns if col != 'timestamp'}
-        }).reset_index(drop=True)
-
+def export(tables, start_time, end_time, output_folder, bucket_ms=0, workers=None, slice_name=None, format_name="csv"):
     os.makedirs(output_folder, exist_ok=True)
-    full_path = os.path.join(output_folder, filename)
-    df['timestamp'] = df['timestamp'].dt.strftime("%Y-%m-%d %H:%M:%S.%f").str[:-3]
-    df.to_csv(full_path, index=False)
+    db_path = get_db_path()
+    print(f"🔍 Using DB at: {db_path}")
 
-    print(f"✅ Exported {len(df)} rows from {table} to {full_path}")
-    return len(df)
+    started = time.perf_counter()
+    results = export_engine.export_tables(db_path, tables, start_time, end_time, output_folder,
+                                          bucket_ms, workers, slice_name, format_name=format_name)
+    for result in results:
+        print(f"✅ Exported {result.summary()}")
+    raw_rows = sum(r.raw_rows for r in results)
+    seconds = time.perf_counter() - started
+    print(f"🏁 {raw_rows} rows in {seconds:.1f} s ({raw_rows / max(seconds, 1e-9):,.0f} rows/s)")
+    return results
 
 if __name__ == "__main__":
     args = sys.argv[1:]
@@ -85,8 +77,11 @@ if __name__ == "__main__":
         sys.exit(0)
 
     output_folder = os.path.expanduser("~/Desktop/exportedData")
-    export_load = export_accel = export_lc_offsets = export_accel_offsets = False
-    smoothing_factor = 1
+    export_load = export_accel = export_lc_offsets = export_accel_offsets = export_log_config = export_merged = False
+    bucket_ms = 0
+    workers = None
+    slice_name = None
+    format_name = "csv"
 
     date_args = []
     i = 0
@@ -109,17 +104,41 @@ if __name__ == "__main__":
             export_lc_offsets = True
         elif opt == "--accel_offsets":
             export_accel_offsets = True
+        elif opt == "--log_config":
+            export_log_config = True
+        elif opt == "--merged":
+            export_merged = True
         elif opt == "--all":
-            export_load = export_accel = export_lc_offsets = export_accel_offsets = True
-        elif opt == "--smooth":
-            smoothing_factor = int(options.pop(0))        
+            export_load = export_accel = export_lc_offsets = export_accel_offsets = export_log_config = True
+        elif opt == "--workers":
+            workers = int(options.pop(0))
+        elif opt == "--format":
+            format_name = options.pop(0).lower()
+            try:
+                check_format(format_name)
+            except ExportFormatError as e:
+                print(f"❌ {e}")
+                print_usage()
+                sys.exit(1)
+        elif opt == "--slice":
+            slice_name = options.pop(0)
+            if slice_name not in SLICES:
+                print(f"❌ Unsupported slice: {slice_name}")
+                print_usage()
+                sys.exit(1)
+        elif opt == "--bucket":
+            bucket_ms = int(options.pop(0))
+            if bucket_ms not in BUCKET_OPTIONS.values():
+                print(f"❌ Unsupported bucket: {bucket_ms} ms")
+                print_usage()
+                sys.exit(1)
         else:
             print(f"❌ Unknown option: {opt}")
             print_usage()
             sys.exit(1)
 
-    if not any([export_load, export_accel, export_lc_offsets, export_accel_offsets]):
-        export_load = export_accel = export_lc_offsets = export_accel_offsets = True
+    if not any([export_load, export_accel, export_lc_offsets, export_accel_offsets, export_log_config, export_merged]):
+        export_load = export_accel = export_lc_offsets = export_accel_offsets = export_log_config = True
 
     try:
         if len(date_args) == 1:
@@ -136,28 +155,17 @@ if __name__ == "__main__":
         print_usage()
         sys.exit(1)
 
-    base = f"{start.strftime('%Y-%m-%d_%H-%M-%S')}_to_{end.strftime('%Y-%m-%d_%H-%M-%S')}"
+    tables = [table for table, selected in [
+        ("load_cells", export_load),
+        ("accelerometer", export_accel),
+        ("load_cell_zero_offsets", export_lc_offsets),
+        ("accelerometer_zero_offsets", export_accel_offsets),
+        ("log_config", export_log_config),
+        (MERGED, export_merged),
+    ] if selected]
 
     try: 
-        if export_load:
-            export_table("load_cells",
-                        ["timestamp", "lc1", "lc2", "lc3", "lc4", "lc5", "lc6"],
-                        start, end, output_folder, f"load_cells_{base}.csv")
-
-        if export_accel:
-            export_table("accelerometer",
-                        ["timestamp", "ax", "ay", "az"],
-                        start, end, output_folder, f"accelerometer_{base}.csv")
-
-        if export_lc_offsets:
-            export_table("load_cell_zero_offsets",
-                        ["timestamp", "lc1_offset", "lc2_offset", "lc3_offset", "lc4_offset", "lc5_offset", "lc6_offset"],
-                        start, end, output_folder, f"load_cell_zero_offsets_{base}.csv")
-
-        if export_accel_offsets:
-            export_table("accelerometer_zero_offsets",
-                        ["timestamp", "ax_offset", "ay_offset", "az_offset"],
-                        start, end, output_folder, f"accelerometer_zero_offsets_{base}.csv")
+        export(tables, start, end, output_folder, bucket_ms, workers, slice_name, format_name)
     except Exception as e:
         print(f"❌ Error during export: {e}")
         sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,466 @@
+import contextlib
+import csv
+import datetime
+import math
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from queue import Empty
+
+import numpy as np
+
+from Database.alignment import accel_tolerance, asof_align, asof_indices
+from Database.averaging import SAMPLED_TABLES, bucketed_select
+from Database.export_formats import EXPORT_FORMATS, check_format, make_sink, read_part
+from Database.mechanics import RIG, WRENCH_COLUMNS
+
+# Streaming export shared by the Export dialog and export_data_commandline.py.
+# Rows are read in fixed-size chunks in timestamp order, averaged per time
+# bucket in numpy and written as they come, so memory does not depend on the
+# length of the exported range.
+
+CHUNK_ROWS = 50000  # Rows fetched from SQLite per chunk
+SLICES = {"day": datetime.timedelta(days=1), "hour": datetime.timedelta(hours=1)}
+
+# Exported tables in export order: table -> columns
+EXPORT_TABLES = {
+    "log_config": ["timestamp", "wheel_type", "depth", "feed_rate", "pitch"],
+    "load_cells": ["timestamp", "lc1", "lc2", "lc3", "lc4", "lc5", "lc6"],
+    "load_cell_zero_offsets": ["timestamp", "lc1_offset", "lc2_offset", "lc3_offset", "lc4_offset", "lc5_offset", "lc6_offset"],
+    "accelerometer": ["timestamp", "ax", "ay", "az"],
+    "accelerometer_zero_offsets": ["timestamp", "ax_offset", "ay_offset", "az_offset"],
+}
+TEXT_COLUMNS = {"wheel_type"}
+
+
+def export_filename(table, start, end, format_name="csv"):
+    base = f"{start.strftime('%Y-%m-%d_%H-%M-%S')}_to_{end.strftime('%Y-%m-%d_%H-%M-%S')}"
+    return f"{table}_{base}{EXPORT_FORMATS[format_name].extension}"
+
+
+def to_columns(rows, columns):
+    """SQLite rows (t, *values) -> (times, [one array per value column]), NULL is NaN or None."""
+    times = np.fromiter((row[0] for row in rows), dtype=float, count=len(rows))
+    values = []
+    for i, column in enumerate(columns[1:], start=1):
+        if column in TEXT_COLUMNS:
+            values.append(np.array([row[i] for row in rows], dtype=object))
+        else:
+            values.append(np.array([row[i] for row in rows], dtype=float))
+    return times, values
+
+
+class BucketAverager:
+    """
+    Averages time-ordered chunks into fixed, epoch-aligned buckets exactly like
+    Database.averaging.bucketed_select does in SQL. The last bucket of a chunk
+    may continue in the next one, so its rows are carried over instead of
+    being averaged early; finish() averages what is left.
+    """
+
+    def __init__(self, bucket_ms):
+        self.bucket_ms = bucket_ms
+        self._carry = None  # (times, values) of the bucket still open
+
+    def feed(self, times, values):
+        if self._carry is not None:
+            times = np.concatenate([self._carry[0], times])
+            values = np.concatenate([self._carry[1], values])
+            self._carry = None
+        if len(times) == 0:
+            return times, values
+
+        buckets = np.round(times * 1000).astype("int64") // self.bucket_ms
+        open_start = np.searchsorted(buckets, buckets[-1], side="left")
+        self._carry = (times[open_start:], values[open_start:])
+        return self._average(buckets[:open_start], values[:open_start])
+
+    def finish(self):
+        if self._carry is None:
+            return np.empty(0), np.empty((0, 0))
+        times, values = self._carry
+        self._carry = None
+        return self._average(np.round(times * 1000).astype("int64") // self.bucket_ms, values)
+
+    def _average(self, buckets, values):
+        if len(buckets) == 0:
+            return np.empty(0), values[:0]
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        valid = ~np.isnan(values)
+        sums = np.add.reduceat(np.where(valid, values, 0.0), starts, axis=0)
+        counts = np.add.reduceat(valid, starts, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)  # AVG() of only NULLs is NULL
+        centres = (buckets[starts] * self.bucket_ms + self.bucket_ms / 2) / 1000.0
+        return centres, means
+
+
+def iter_chunks(conn, table, columns, start_time, end_time, bucket_ms=0, chunk_rows=CHUNK_ROWS):
+    """
+    Yield (times, values, raw_rows) chunks of `table` between start_time and
+    end_time: times in epoch seconds (bucket centres when averaged), values as
+    one array per column, raw_rows the number of table rows they came from.
+    """
+    if table not in SAMPLED_TABLES:
+        bucket_ms = 0  # Offsets and config are events, never averaged
+    averager = BucketAverager(bucket_ms) if bucket_ms > 0 else None
+
+    cursor = conn.cursor()
+    cursor.execute(bucketed_select(table, columns, 0), (start_time, end_time))
+    while True:
+        rows = cursor.fetchmany(chunk_rows)
+        if not rows:
+            break
+        times, values = to_columns(rows, columns)
+        if averager:
+            times, matrix = averager.feed(times, np.column_stack(values))
+            values = list(matrix.T)
+        yield times, values, len(rows)
+    cursor.close()
+
+    if averager:
+        times, matrix = averager.finish()
+        if len(times):
+            yield times, list(matrix.T), 0
+
+
+# --- Merged export ---------------------------------------------------------
+# One wide table on the load cell times: the loads, the accelerometer as-of
+# matched within accel_tolerance(), the net forces and moments of the rig
+# (Database/mechanics.py), and the zero offsets and LOG config in effect at
+# every sample (the latest event at or before it). Load cells and
+# accelerometer are streamed side by side in one pass; the event tables are
+# small and read up front, with the event already active at start_time.
+
+MERGED = "merged"
+MERGED_EVENTS = ["load_cell_zero_offsets", "accelerometer_zero_offsets", "log_config"]
+MERGED_COLUMNS = (EXPORT_TABLES["load_cells"] + EXPORT_TABLES["accelerometer"][1:] + WRENCH_COLUMNS
+                  + [column for table in MERGED_EVENTS for column in EXPORT_TABLES[table][1:]])
+SLICED_TABLES = SAMPLED_TABLES + (MERGED,)  # Split into time slices for the workers
+
+
+def table_columns(table):
+    return MERGED_COLUMNS if table == MERGED else EXPORT_TABLES[table]
+
+
+def read_events(conn, table, start_time, end_time):
+    """(times, values) of an event table in the range, plus the event already active at start_time."""
+    columns = EXPORT_TABLES[table]
+    active = conn.execute(f"SELECT MAX(timestamp) FROM {table} WHERE timestamp < ?", (start_time,)).fetchone()[0]
+    cursor = conn.execute(bucketed_select(table, columns, 0), (active or start_time, end_time))
+    return to_columns(cursor.fetchall(), columns)
+
+
+def take_asof(column, idx):
+    """column[idx], None or NaN where idx is -1 (no match)."""
+    taken = np.full(len(idx), None if column.dtype == object else np.nan, dtype=column.dtype)
+    matched = idx >= 0
+    taken[matched] = column[idx[matched]]
+    return taken
+
+
+class AsofStream:
+    """
+    As-of lookups into a chunked, time-ordered stream (iter_chunks). Chunks
+    are pulled until they pass the looked up times, and only the rows later
+    lookups can still match are kept.
+    """
+
+    def __init__(self, chunks, width):
+        self._chunks = chunks
+        self._times = np.empty(0)
+        self._values = np.empty((0, width))
+        self._exhausted = False
+
+    def align(self, times, tolerance):
+        if len(times) == 0:
+            return self._values[:0]
+        while not self._exhausted and (len(self._times) == 0 or self._times[-1] <= times[-1]):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._exhausted = True
+            else:
+                self._times = np.concatenate([self._times, chunk[0]])
+                self._values = np.concatenate([self._values, np.column_stack(chunk[1])])
+
+        aligned = asof_align(times, self._times, self._values, tolerance)
+        keep = max(np.searchsorted(self._times, times[-1], side="right") - 1, 0)
+        self._times, self._values = self._times[keep:], self._values[keep:]
+        return aligned
+
+
+def iter_merged(conn, start_time, end_time, bucket_ms=0, chunk_rows=CHUNK_ROWS):
+    """Like iter_chunks, for the MERGED_COLUMNS table. raw_rows counts load cell rows."""
+    tolerance = accel_tolerance(bucket_ms)
+    # Accelerometer rows from one tolerance (in whole buckets) before start_time,
+    # so the first samples of the range and of every parallel slice find their match
+    lookback_ms = tolerance * 1000
+    if bucket_ms > 0:
+        lookback_ms = math.ceil(lookback_ms / bucket_ms) * bucket_ms
+    accel_start = start_time - datetime.timedelta(milliseconds=lookback_ms)
+
+    conn.execute("BEGIN")  # All five tables from one snapshot
+    try:
+        events = [read_events(conn, table, start_time, end_time) for table in MERGED_EVENTS]
+        accel = AsofStream(iter_chunks(conn, "accelerometer", EXPORT_TABLES["accelerometer"],
+                                       accel_start, end_time, bucket_ms, chunk_rows), 3)
+        for times, values, raw_rows in iter_chunks(conn, "load_cells", EXPORT_TABLES["load_cells"],
+                                                   start_time, end_time, bucket_ms, chunk_rows):
+            loads = np.column_stack(values)
+            merged = values + list(accel.align(times, tolerance).T) + list(RIG.wrench(loads).T)
+            for event_times, event_values in events:
+                idx = asof_indices(times, event_times, np.inf)
+                merged.extend(take_asof(column, idx) for column in event_values)
+            yield times, merged, raw_rows
+    finally:
+        conn.commit()
+
+
+class ExportResult:
+    def __init__(self, table, path, rows, raw_rows, seconds):
+        self.table = table
+        self.path = path
+        self.rows = rows          # Rows written
+        self.raw_rows = raw_rows  # Table rows read
+        self.seconds = seconds
+
+    @property
+    def rows_per_s(self):
+        return self.raw_rows / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self):
+        return (f"{self.rows} rows from {self.table} to {self.path} "
+                f"({self.raw_rows} read in {self.seconds:.1f} s, {self.rows_per_s:,.0f} rows/s)")
+
+
+def export_table(conn, table, start_time, end_time, path, bucket_ms=0, columns=None,
+                 chunk_rows=CHUNK_ROWS, progress=None, header=True, format_name="csv"):
+    """
+    Stream one table, or the MERGED table, to `path` in `format_name` (see
+    Database/export_formats.py). progress(raw_rows_read), if given, is called
+    after every chunk. Returns an ExportResult.
+    """
+    columns = columns or table_columns(table)
+    started = time.perf_counter()
+    rows = raw_rows = 0
+
+    sink = make_sink(format_name, path, columns, TEXT_COLUMNS, header)
+    if table == MERGED:
+        chunks = iter_merged(conn, start_time, end_time, bucket_ms, chunk_rows)
+    else:
+        chunks = iter_chunks(conn, table, columns, start_time, end_time, bucket_ms, chunk_rows)
+    try:
+        # Closed here on cancel or error, while the caller's connection is still open
+        with contextlib.closing(chunks):
+            for times, values, n_raw in chunks:
+                sink.write(times, values)
+                rows += len(times)
+                raw_rows += n_raw
+                if progress:
+                    progress(raw_rows)
+    except BaseException:
+        sink.abort()
+        raise
+    sink.close()
+
+    return ExportResult(table, path, rows, raw_rows, time.perf_counter() - started)
+
+
+# --- Parallel export -------------------------------------------------------
+# Sampled tables and the merged table are split into day or hour slices
+# (bucket boundaries always fall on slice boundaries, so no bucket is split),
+# every slice is exported to a part file by a pool process with its own
+# read-only connection, and the parts are joined in time order: headerless
+# CSV parts are concatenated, the binary formats are replayed from PartSink
+# files into one final file.
+
+def connect_readonly(db_path):
+    return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+
+def time_slices(start_time, end_time, slice_name):
+    """[start, end) cut at whole days or hours."""
+    step = SLICES[slice_name]
+    slices = []
+    lower = start_time
+    while lower < end_time:
+        if slice_name == "day":
+            upper = datetime.datetime.combine(lower.date(), datetime.time.min) + step
+        else:
+            upper = lower.replace(minute=0, second=0, microsecond=0) + step
+        slices.append((lower, min(upper, end_time)))
+        lower = upper
+    return slices
+
+
+def auto_slice(start_time, end_time):
+    return "day" if end_time - start_time > datetime.timedelta(days=1) else "hour"
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def count_rows(conn, table, start_time, end_time):
+    cursor = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE timestamp >= ? AND timestamp < ?",
+                          (start_time, end_time))
+    return cursor.fetchone()[0]
+
+
+def _run_slice(db_path, table, start_time, end_time, path, bucket_ms, part_format, progress_queue, cancel_event, job_id):
+    """Pool worker: one table slice to a part file."""
+    def progress(n):
+        if cancel_event.is_set():
+            raise ExportCancelled()
+        if progress_queue is not None:
+            progress_queue.put((job_id, n))
+
+    conn = connect_readonly(db_path)
+    try:
+        result = export_table(conn, table, start_time, end_time, path, bucket_ms, progress=progress,
+                              header=False, format_name=part_format)
+    finally:
+        conn.close()
+    return job_id, result.rows, result.raw_rows
+
+
+def _join_parts(part_paths, format_name, path, columns):
+    sink = make_sink(format_name, path, columns, TEXT_COLUMNS)
+    try:
+        for part_path in part_paths:
+            for times, values in read_part(part_path, len(columns) - 1):
+                sink.write(times, values)
+    except BaseException:
+        sink.abort()
+        raise
+    sink.close()
+
+
+def export_tables(db_path, tables, start_time, end_time, output_folder, bucket_ms=0,
+                  workers=None, slice_name=None, progress=None, cancel=None, format_name="csv"):
+    """
+    Export `tables` between start_time and end_time to output_folder, one
+    file per table in `format_name`, using a pool of `workers` processes
+    (default: one per core). `tables` may include MERGED for the merged
+    wide table. Returns one ExportResult per table, in the order of `tables`.
+
+    progress(table, raw_rows_read, raw_rows_total), if given, is called as
+    slices advance. When `cancel` (a threading.Event) is set the export stops
+    within one chunk, its files are removed and ExportCancelled is raised.
+    """
+    check_format(format_name)
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    slice_name = slice_name or auto_slice(start_time, end_time)
+    part_format = "csv" if format_name == "csv" else "part"
+    parts_dir = os.path.join(output_folder, f".export_parts_{os.getpid()}")
+    os.makedirs(parts_dir, exist_ok=True)
+
+    jobs = []  # (table, start, end, part_path)
+    for table in tables:
+        slices = time_slices(start_time, end_time, slice_name) if table in SLICED_TABLES else [(start_time, end_time)]
+        for i, (lower, upper) in enumerate(slices):
+            jobs.append((table, lower, upper, os.path.join(parts_dir, f"{table}_{i:05d}.{part_format}")))
+
+    totals = {}
+    if progress:
+        conn = connect_readonly(db_path)
+        try:
+            totals = {table: count_rows(conn, "load_cells" if table == MERGED else table, start_time, end_time)
+                      for table in tables}
+        finally:
+            conn.close()
+        for table in tables:
+            progress(table, 0, totals[table])
+
+    done_rows = {}      # job_id -> (rows, raw_rows)
+    read_rows = {}      # job_id -> raw rows read so far, for progress
+    table_started = {}  # table -> when its first part started, sequential runs only
+    table_done = {}     # table -> when its last part finished
+    written = []        # Final files, removed again if the export does not complete
+
+    def check_cancel():
+        if cancel is not None and cancel.is_set():
+            raise ExportCancelled()
+
+    def report(job_id, raw_rows):
+        check_cancel()
+        read_rows[job_id] = raw_rows
+        if progress:
+            table = jobs[job_id][0]
+            progress(table, sum(n for j, n in read_rows.items() if jobs[j][0] == table), totals.get(table, 0))
+
+    def finished(job_id, rows, raw_rows):
+        done_rows[job_id] = (rows, raw_rows)
+        report(job_id, raw_rows)
+        table = jobs[job_id][0]
+        table_done[table] = time.perf_counter()
+
+    try:
+        if workers <= 1 or len(jobs) == 1:
+            for job_id, (table, lower, upper, part) in enumerate(jobs):
+                table_started.setdefault(table, time.perf_counter())
+                conn = connect_readonly(db_path)
+                try:
+                    result = export_table(conn, table, lower, upper, part, bucket_ms, header=False,
+                                          progress=lambda n, j=job_id: report(j, n), format_name=part_format)
+                finally:
+                    conn.close()
+                finished(job_id, result.rows, result.raw_rows)
+        else:
+            # Spawned, not forked: the GUI process has Qt and socket threads
+            context = multiprocessing.get_context("spawn")
+            with context.Manager() as manager, \
+                    ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=context) as pool:
+                progress_queue = manager.Queue() if progress else None
+                worker_cancel = manager.Event()
+                pending = {pool.submit(_run_slice, db_path, table, lower, upper, part, bucket_ms, part_format,
+                                       progress_queue, worker_cancel, job_id)
+                           for job_id, (table, lower, upper, part) in enumerate(jobs)}
+                try:
+                    while pending:
+                        completed, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                        check_cancel()
+                        while progress_queue is not None:
+                            try:
+                                report(*progress_queue.get_nowait())
+                            except Empty:
+                                break
+                        for future in completed:
+                            finished(*future.result())
+                except BaseException:
+                    # Queued slices never start, running ones stop at their next chunk
+                    worker_cancel.set()
+                    pool.shutdown(wait=True, cancel_futures=True)
+                    raise
+
+        results = []
+        for table in tables:
+            check_cancel()
+            path = os.path.join(output_folder, export_filename(table, start_time, end_time, format_name))
+            table_jobs = [job_id for job_id, job in enumerate(jobs) if job[0] == table]
+            written.append(path)
+            part_paths = [jobs[job_id][3] for job_id in table_jobs]
+            if format_name == "csv":
+                with open(path, "w", newline="") as out:
+                    csv.writer(out).writerow(table_columns(table))
+                    for part_path in part_paths:
+                        with open(part_path, "r", newline="") as part:
+                            shutil.copyfileobj(part, out)
+            else:
+                _join_parts(part_paths, format_name, path, table_columns(table))
+            rows = sum(done_rows[j][0] for j in table_jobs)
+            raw_rows = sum(done_rows[j][1] for j in table_jobs)
+            seconds = table_done[table] - table_started.get(table, started) if table in table_done else 0.0
+            results.append(ExportResult(table, path, rows, raw_rows, seconds))
+        return results
+    except BaseException:
+        for path in written:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
@@ -0,0 +1,314 @@
+import csv
+import os
+import shutil
+import tempfile
+import zipfile
+
+import numpy as np
+
+# Output formats of the export engine (Database/export_engine.py). Every sink
+# takes chunks of (times, values): epoch seconds and one array per column
+# (float64 with NaN for NULL, or object arrays of strings), and writes them as
+# they arrive. CSV keeps the millisecond text timestamps; the binary formats
+# store typed columns and the timestamp as int64 microseconds since the epoch.
+# pyarrow (Parquet, Feather) and h5py (HDF5) are only imported when used.
+
+
+class ExportFormatError(RuntimeError):
+    pass
+
+
+def _require(module, format_name):
+    try:
+        return __import__(module, fromlist=["_"])
+    except ImportError:
+        package = module.split(".")[0]
+        raise ExportFormatError(f"{format_name} export needs {package}: pip install {package}") from None
+
+
+def format_timestamps(times):
+    """Epoch seconds -> 'YYYY-MM-DD HH:MM:SS.mmm' strings, as the exports always had."""
+    if len(times) == 0:
+        return []
+    micros = np.round(np.asarray(times, dtype=float) * 1e6).astype("int64").astype("datetime64[us]")
+    return np.char.replace(np.datetime_as_string(micros, unit="ms"), "T", " ").tolist()
+
+
+def epoch_micros(times):
+    return np.round(np.asarray(times, dtype=float) * 1e6).astype("int64")
+
+
+class CsvSink:
+    """Writes exported chunks to a CSV file, NULL/NaN as empty fields."""
+    extension = ".csv"
+
+    def __init__(self, path, columns, header=True):
+        self.path = path
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        if header:
+            self._writer.writerow(columns)
+
+    def write(self, times, values):
+        fields = [format_timestamps(times)]
+        for column in values:
+            if column.dtype == object:
+                fields.append(column.tolist())
+            else:
+                cells = column.astype(object)
+                cells[np.isnan(column)] = None
+                fields.append(cells.tolist())
+        self._writer.writerows(zip(*fields))
+
+    def close(self):
+        self._file.close()
+
+    def abort(self):
+        """Close and delete a partially written file."""
+        self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class _ArrowSink:
+    """Shared by Parquet and Feather: every chunk becomes one Arrow record batch."""
+
+    def __init__(self, path, columns, text_columns, format_name):
+        self.pa = _require("pyarrow", format_name)
+        self.path = path
+        self.columns = columns
+        fields = [self.pa.field(columns[0], self.pa.timestamp("us"))]
+        for column in columns[1:]:
+            fields.append(self.pa.field(column, self.pa.string() if column in text_columns else self.pa.float64()))
+        self.schema = self.pa.schema(fields)
+        self._writer = None
+
+    def _batch(self, times, values):
+        arrays = [self.pa.array(epoch_micros(times), type=self.pa.timestamp("us"))]
+        for field, column in zip(list(self.schema)[1:], values):
+            if column.dtype == object:
+                arrays.append(self.pa.array(column.tolist(), type=field.type))
+            else:
+                arrays.append(self.pa.array(column, type=field.type, from_pandas=True))  # NaN -> null
+        return self.pa.record_batch(arrays, schema=self.schema)
+
+    def write(self, times, values):
+        if len(times):
+            self._writer.write_batch(self._batch(times, values))
+
+    def close(self):
+        self._writer.close()
+
+    def abort(self):
+        try:
+            self._writer.close()
+        finally:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+class ParquetSink(_ArrowSink):
+    extension = ".parquet"
+    compression = "zstd"
+
+    def __init__(self, path, columns, text_columns=()):
+        super().__init__(path, columns, text_columns, "Parquet")
+        parquet = _require("pyarrow.parquet", "Parquet")
+        self._writer = parquet.ParquetWriter(path, self.schema, compression=self.compression)
+
+
+class FeatherSink(_ArrowSink):
+    """Feather v2, i.e. the Arrow IPC file format."""
+    extension = ".feather"
+    compression = "zstd"
+
+    def __init__(self, path, columns, text_columns=()):
+        super().__init__(path, columns, text_columns, "Feather")
+        ipc = _require("pyarrow.ipc", "Feather")
+        options = ipc.IpcWriteOptions(compression=self.compression)
+        self._writer = ipc.new_file(path, self.schema, options=options)
+
+
+class Hdf5Sink:
+    """One resizable, gzip-compressed dataset per column; the timestamp is int64 µs."""
+    extension = ".h5"
+
+    def __init__(self, path, columns, text_columns=()):
+        h5py = _require("h5py", "HDF5")
+        self.path = path
+        self.rows = 0
+        self._file = h5py.File(path, "w")
+        self._datasets = []
+        for i, column in enumerate(columns):
+            if i == 0:
+                dtype = "int64"
+            elif column in text_columns:
+                dtype = h5py.string_dtype()
+            else:
+                dtype = "float64"
+            dataset = self._file.create_dataset(column, shape=(0,), maxshape=(None,), dtype=dtype,
+                                                chunks=(65536,), compression="gzip", compression_opts=4)
+            self._datasets.append(dataset)
+        self._datasets[0].attrs["unit"] = "microseconds since 1970-01-01"
+
+    def write(self, times, values):
+        n = len(times)
+        if not n:
+            return
+        for dataset, data in zip(self._datasets, [epoch_micros(times)] + list(values)):
+            dataset.resize((self.rows + n,))
+            dataset[self.rows:] = ["" if v is None else v for v in data] if data.dtype == object else data
+        self.rows += n
+
+    def close(self):
+        self._file.close()
+
+    def abort(self):
+        try:
+            self._file.close()
+        finally:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+class NpzSink:
+    """
+    A NumPy .npz archive, one array per column (timestamp as datetime64[us]).
+    np.savez needs whole arrays, so columns are streamed to raw temp files and
+    copied into the archive at close(). Text columns (the config, repeated on
+    every row of the merged table) are stored as int32 codes into a small
+    lookup of their distinct values and expanded chunk by chunk at close();
+    NULL becomes ''.
+    """
+    extension = ".npz"
+    COPY_ROWS = 1 << 16  # Rows per chunk when expanding text codes
+
+    def __init__(self, path, columns, text_columns=()):
+        self.path = path
+        self.columns = columns
+        self.rows = 0
+        self._tmp_dir = tempfile.mkdtemp(prefix=".npz_", dir=os.path.dirname(os.path.abspath(path)))
+        self._dtypes = []
+        self._files = []
+        self._labels = {}  # Text column index -> {value: code}
+        for i, column in enumerate(columns):
+            if column in text_columns:
+                self._dtypes.append(np.dtype("int32"))
+                self._labels[i] = {}
+            else:
+                self._dtypes.append(np.dtype("datetime64[us]") if i == 0 else np.dtype("float64"))
+            self._files.append(open(os.path.join(self._tmp_dir, f"{i}.raw"), "wb"))
+
+    def write(self, times, values):
+        for i, data in enumerate([epoch_micros(times)] + list(values)):
+            if i in self._labels:
+                labels = self._labels[i]
+                data = np.fromiter((labels.setdefault("" if v is None else str(v), len(labels)) for v in data),
+                                   dtype="int32", count=len(data))
+            self._files[i].write(np.ascontiguousarray(data, dtype=self._dtypes[i]).tobytes())
+        self.rows += len(times)
+
+    def close(self):
+        try:
+            with zipfile.ZipFile(self.path, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+                for i, column in enumerate(self.columns):
+                    self._files[i].close()
+                    with archive.open(f"{column}.npy", "w", force_zip64=True) as member, \
+                            open(self._files[i].name, "rb") as raw:
+                        if i in self._labels:
+                            self._write_text(member, raw, list(self._labels[i]))
+                        else:
+                            self._write_header(member, self._dtypes[i])
+                            shutil.copyfileobj(raw, member, 1 << 20)
+        finally:
+            self._cleanup()
+
+    def _write_header(self, member, dtype):
+        header = {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (self.rows,)}
+        np.lib.format.write_array_header_2_0(member, header)
+
+    def _write_text(self, member, raw, labels):
+        width = max([len(label) for label in labels] + [1])
+        lookup = np.array(labels or [""], dtype=f"<U{width}")
+        self._write_header(member, lookup.dtype)
+        while True:
+            codes = np.frombuffer(raw.read(4 * self.COPY_ROWS), dtype="int32")
+            if not len(codes):
+                break
+            member.write(lookup[codes].tobytes())
+
+    def abort(self):
+        self._cleanup()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _cleanup(self):
+        for f in self._files:
+            f.close()
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+
+class PartSink:
+    """
+    Intermediate slice file of a parallel binary export: consecutive np.save()
+    records (times, then each column), replayed in order into the final sink.
+    """
+    extension = ".part"
+
+    def __init__(self, path, columns, text_columns=()):
+        self.path = path
+        self._file = open(path, "wb")
+
+    def write(self, times, values):
+        if len(times):
+            np.save(self._file, times)
+            for column in values:
+                np.save(self._file, column, allow_pickle=column.dtype == object)
+
+    def close(self):
+        self._file.close()
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def read_part(path, n_values):
+    """Chunks written by PartSink, as (times, values)."""
+    with open(path, "rb") as f:
+        while True:
+            try:
+                times = np.load(f)
+            except EOFError:
+                return
+            yield times, [np.load(f, allow_pickle=True) for _ in range(n_values)]
+
+
+# Name -> sink class, CSV first as the default
+EXPORT_FORMATS = {
+    "csv": CsvSink,
+    "parquet": ParquetSink,
+    "feather": FeatherSink,
+    "hdf5": Hdf5Sink,
+    "npz": NpzSink,
+}
+FORMAT_LABELS = {"csv": "CSV", "parquet": "Parquet", "feather": "Feather", "hdf5": "HDF5", "npz": "NumPy (.npz)"}
+FORMAT_MODULES = {"parquet": "pyarrow.parquet", "feather": "pyarrow.ipc", "hdf5": "h5py"}
+
+
+def check_format(format_name):
+    """Fail early, before any data is read, on an unknown format or a missing library."""
+    if format_name not in EXPORT_FORMATS:
+        raise ExportFormatError(f"Unknown export format: {format_name} (one of {', '.join(EXPORT_FORMATS)})")
+    if format_name in FORMAT_MODULES:
+        _require(FORMAT_MODULES[format_name], FORMAT_LABELS[format_name])
+    return EXPORT_FORMATS[format_name]
+
+
+def make_sink(format_name, path, columns, text_columns=(), header=True):
+    if format_name == "csv":
+        return CsvSink(path, columns, header)
+    if format_name == "part":
+        return PartSink(path, columns, text_columns)
+    return check_format(format_name)(path, columns, text_columns)
@@ -0,0 +1,119 @@
+import json
+import os
+
+import numpy as np
+
+MM_TO_IN = 1 / 25.4
+
+# Set to a JSON file (same layout as DEFAULT_RIG) to use another fixture
+GEOMETRY_ENV = "LOG_RIG_GEOMETRY"
+
+# Load cell positions in inches, origin at LC6 (see the layout sketch in
+# ui/plotter.py), and the axis each cell measures along
+DEFAULT_RIG = {
+    "name": "LOG test rig",
+    "load_cells": [
+        {"name": "LC1", "axis": "z", "x": -330 * MM_TO_IN, "y": 181 * MM_TO_IN},
+        {"name": "LC2", "axis": "y", "x": -257 * MM_TO_IN, "y": -187 * MM_TO_IN},
+        {"name": "LC3", "axis": "z", "x": 0.0, "y": -181 * MM_TO_IN},
+        {"name": "LC4", "axis": "y", "x": 257 * MM_TO_IN, "y": -187 * MM_TO_IN},
+        {"name": "LC5", "axis": "z", "x": 330 * MM_TO_IN, "y": 181 * MM_TO_IN},
+        {"name": "LC6", "axis": "x", "x": 0.0, "y": 0.0},
+    ],
+}
+
+# Columns of RigGeometry.wrench() and RigGeometry.mechanics()
+WRENCH_COLUMNS = ["Fx", "Fy", "Fz", "Mx", "My", "Mz"]
+MECHANICS_COLUMNS = WRENCH_COLUMNS + ["F", "CoPx", "CoPy"]
+FX, FY, FZ, MX, MY, MZ, F_MAG, COP_X, COP_Y = range(len(MECHANICS_COLUMNS))
+
+MIN_COP_FZ = 1.0  # lbf, below this the center of pressure is undefined (NaN)
+
+
+class RigGeometry:
+    """
+    Load cell layout of a fixture and the forces and moments it implies.
+
+    Every cell measures a force along one axis at a point (x, y) of the plate
+    plane. The net force and the moments about the origin are linear in the
+    cell loads, so they are a single (N, 6) @ (6, 6) product:
+        Mx = sum(Fz_i * y_i), My = -sum(Fz_i * x_i), Mz = sum(Fy_i * x_i - Fx_i * y_i)
+
+    All methods take one sample (6 loads) or an (N, 6) array and return a
+    row or an array with one row per sample. Missing (NaN) loads count as 0.
+    """
+
+    AXES = ("x", "y", "z")
+
+    def __init__(self, load_cells, name="custom"):
+        if len(load_cells) != 6:
+            raise ValueError(f"Expected 6 load cells, got {len(load_cells)}")
+        self.name = name
+        self.load_cells = [dict(cell) for cell in load_cells]
+        self.names = [cell["name"] for cell in self.load_cells]
+        self.axes = [cell["axis"].lower() for cell in self.load_cells]
+        unknown = [axis for axis in self.axes if axis not in self.AXES]
+        if unknown:
+            raise ValueError(f"Unknown load cell axis: {', '.join(unknown)}")
+        self.positions = np.array([[cell["x"], cell["y"]] for cell in self.load_cells], dtype=float)
+
+        self.matrix = np.zeros((6, 6))
+        for i, (axis, (x, y)) in enumerate(zip(self.axes, self.positions)):
+            if axis == "x":
+                self.matrix[i, FX] = 1.0
+                self.matrix[i, MZ] = -y
+            elif axis == "y":
+                self.matrix[i, FY] = 1.0
+                self.matrix[i, MZ] = x
+            else:
+                self.matrix[i, FZ] = 1.0
+                self.matrix[i, MX] = y
+                self.matrix[i, MY] = -x
+
+    @classmethod
+    def from_dict(cls, rig):
+        return cls(rig["load_cells"], rig.get("name", "custom"))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def cells(self, axis):
+        """Indices of the cells measuring along `axis`."""
+        return [i for i, a in enumerate(self.axes) if a == axis]
+
+    def wrench(self, loads):
+        """[Fx, Fy, Fz, Mx, My, Mz] per sample."""
+        return np.nan_to_num(np.asarray(loads, dtype=float)) @ self.matrix
+
+    def mechanics(self, loads, min_fz=MIN_COP_FZ):
+        """
+        MECHANICS_COLUMNS per sample: the wrench, the force vector magnitude
+        and the center of pressure of the vertical load (NaN when |Fz| is
+        below `min_fz`).
+        """
+        wrench = self.wrench(loads)
+        fz = wrench[..., FZ]
+        magnitude = np.sqrt(np.sum(wrench[..., :3] ** 2, axis=-1))
+        loaded = np.abs(fz) >= min_fz
+        safe_fz = np.where(loaded, fz, 1.0)
+        cop_x = np.where(loaded, -wrench[..., MY] / safe_fz, np.nan)
+        cop_y = np.where(loaded, wrench[..., MX] / safe_fz, np.nan)
+        return np.concatenate([wrench, np.stack([magnitude, cop_x, cop_y], axis=-1)], axis=-1)
+
+
+def load_rig():
+    """The fixture from $LOG_RIG_GEOMETRY if set, the LOG test rig otherwise."""
+    path = os.environ.get(GEOMETRY_ENV)
+    if path:
+        try:
+            rig = RigGeometry.load(path)
+            print(f"[Mechanics] Loaded rig geometry '{rig.name}' from {path}")
+            return rig
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[Mechanics] ⚠️ Could not load rig geometry from {path}: {e}. Using the default rig.")
+    return RigGeometry.from_dict(DEFAULT_RIG)
+
+
+RIG = load_rig()
@@ -0,0 +1,86 @@
+import datetime
+import json
+import socket
+import time
+
+from PyQt5.QtCore import QThread
+from comms.status_server import DAEMON_STATUS_HOST, DAEMON_STATUS_PORT
+
+class DaemonViewerThread(QThread):
+    """
+    Attaches the GUI to a running acquisition daemon: reads its status socket
+    and re-emits the messages on the GUI's ParserEmitter, so the main window,
+    plots and moment map show the daemon's data. Read-only, zeroing and
+    triggering stay with the daemon.
+    """
+
+    def __init__(self, emitter, host=DAEMON_STATUS_HOST, port=DAEMON_STATUS_PORT):
+        super().__init__()
+        self.emitter = emitter
+        self.host = host
+        self.port = port
+        self.running = True
+        self.s = None
+        self.load_offsets = [0.0] * 6  # Offsets the daemon applies, for the contact loss check
+
+    def run(self):
+        while self.running:
+            try:
+                self.s = socket.create_connection((self.host, self.port), timeout=3)
+                self.s.settimeout(1)
+                self.emitter.log_message.emit(f"🔗 Attached to daemon at {self.host}:{self.port}.")
+                self._read_loop()
+            except OSError as e:
+                if self.running:
+                    self.emitter.log_message.emit(f"Daemon status socket error: {e}")
+            finally:
+                if self.s:
+                    self.s.close()
+                    self.s = None
+                if self.running:
+                    self.emitter.disconnected.emit(False)
+                    time.sleep(1)  # Delay before retry
+
+    def _read_loop(self):
+        buffer = ""
+        while self.running:
+            try:
+                chunk = self.s.recv(65536).decode("utf-8", errors="ignore")
+            except socket.timeout:
+                continue
+            if not chunk:
+                raise ConnectionResetError("Daemon closed the status socket.")
+            buffer += chunk
+            while "\n" in buffer:
+                line, buffer = buffer.split("\n", 1)
+                try:
+                    self.handle_message(json.loads(line))
+                except (ValueError, KeyError) as e:
+                    print(f"[DaemonViewer] Bad status message: {e}")
+
+    def handle_message(self, message):
+        kind = message["type"]
+        if kind == "data":
+            self.load_offsets = message["load_offsets"]
+            self.emitter.new_data.emit(message["timestamp"], message["loads"], message["accels"],
+                                       message["accel_on"], message["accel_stale"])
+        elif kind == "sps":
+            self.emitter.update_sps.emit(message["lc_sps"], message["accel_sps"], message["stable"])
+        elif kind == "connected":
+            self.emitter.disconnected.emit(message["connected"])
+        elif kind == "trigger":
+            # Same signal the in-process TeensySocketThread emits, loads the pre-trigger plot
+            when = datetime.datetime.strptime(message["timestamp"], "%Y-%m-%d %H:%M:%S.%f")
+            self.emitter.trigger_started.emit(when)
+        elif kind == "log":
+            self.emitter.log_message.emit(f"[daemon] {message['message']}")
+
+    def stop(self):
+        self.running = False
+        if self.s:
+            try:
+                self.s.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.quit()
+        self.wait()
@@ -0,0 +1,37 @@
+import threading
+
+class Signal:
+    """
+    Minimal stand-in for a pyqtSignal: connect() callbacks, emit() calls them
+    directly in the emitting thread, so slots must be thread-safe.
+    """
+
+    def __init__(self):
+        self._slots = []
+        self._lock = threading.Lock()
+
+    def connect(self, slot):
+        with self._lock:
+            self._slots.append(slot)
+
+    def disconnect(self, slot):
+        with self._lock:
+            self._slots.remove(slot)
+
+    def emit(self, *args):
+        with self._lock:
+            slots = list(self._slots)
+        for slot in slots:
+            slot(*args)
+
+
+class HeadlessEmitter:
+    """Same signals as ParserEmitter, without Qt, for the acquisition daemon."""
+
+    def __init__(self):
+        self.new_data = Signal()         # timestamp, loads, accels, accel_on, accel_stale
+        self.update_sps = Signal()       # lc_sps, accel_sps, sys_stable
+        self.trigger_started = Signal()  # datetime
+        self.disconnected = Signal()     # connected
+        self.log_message = Signal()      # message
+        self.teensy_reset = Signal()
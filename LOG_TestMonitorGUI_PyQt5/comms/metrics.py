@@ -0,0 +1,253 @@
+import collections
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT_ENV = "LOG_METRICS_PORT"  # Port of the localhost /metrics endpoint, 0 disables it
+DEFAULT_METRICS_PORT = 9105
+
+# Histogram buckets in seconds, from sub-millisecond draws to multi-second queries
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + list(extra or ())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in items) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        return self._value
+
+    def samples(self, name, labels):
+        return [(f"{name}_total{_format_labels(labels)}", self._value)]
+
+
+class Gauge:
+    """Set explicitly, or read from `fn` when collected (e.g. a queue depth)."""
+    kind = "gauge"
+
+    def __init__(self, fn=None):
+        self._value = 0.0
+        self.fn = fn
+
+    def set(self, value):
+        self._value = value
+
+    def set_function(self, fn):
+        self.fn = fn
+
+    @property
+    def value(self):
+        if self.fn is not None:
+            try:
+                return float(self.fn())
+            except Exception:
+                return math.nan
+        return self._value
+
+    def samples(self, name, labels):
+        return [(f"{name}{_format_labels(labels)}", self.value)]
+
+
+class Histogram:
+    """
+    Cumulative buckets for Prometheus, plus the last `window` observations
+    for the percentiles shown in the diagnostics panel.
+    """
+    kind = "histogram"
+
+    def __init__(self, buckets=LATENCY_BUCKETS, window=500):
+        self.buckets = tuple(buckets) + (math.inf,)
+        self._counts = [0] * len(self.buckets)
+        self._sum = 0.0
+        self._count = 0
+        self._recent = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+            self._sum += value
+            self._count += 1
+            self._recent.append(value)
+
+    @property
+    def count(self):
+        return self._count
+
+    def percentile(self, q):
+        with self._lock:
+            recent = sorted(self._recent)
+        if not recent:
+            return math.nan
+        return recent[min(len(recent) - 1, int(q / 100 * len(recent)))]
+
+    def samples(self, name, labels):
+        with self._lock:
+            counts, total, count = list(self._counts), self._sum, self._count
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            lines.append((f"{name}_bucket{_format_labels(labels, [('le', _format_value(bound))])}", cumulative))
+        lines.append((f"{name}_sum{_format_labels(labels)}", total))
+        lines.append((f"{name}_count{_format_labels(labels)}", count))
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Process-wide set of named metrics. counter(), gauge() and histogram()
+    return the existing metric for a (name, labels) pair or create it, so
+    instrumented code can simply ask for its metric where it needs it.
+    """
+
+    def __init__(self, prefix="log_"):
+        self.prefix = prefix
+        self._metrics = {}  # (name, labels) -> metric
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, labels, **kwargs):
+        key = (self.prefix + name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            metric = self._metrics.get(key)
+            if metric is None:
+                metric = self._metrics[key] = cls(**kwargs)
+                self._help.setdefault(key[0], help_text)
+        return metric
+
+    def counter(self, name, help_text="", labels=None):
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text="", labels=None, fn=None):
+        gauge = self._get(Gauge, name, help_text, labels)
+        if fn is not None:
+            gauge.set_function(fn)
+        return gauge
+
+    def histogram(self, name, help_text="", labels=None, buckets=LATENCY_BUCKETS):
+        return self._get(Histogram, name, help_text, labels, buckets=buckets)
+
+    def items(self):
+        """[(name, labels, metric)] sorted by name, for the diagnostics panel."""
+        with self._lock:
+            return [(name, dict(labels), metric) for (name, labels), metric in sorted(self._metrics.items())]
+
+    def render_prometheus(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        last_name = None
+        for name, labels, metric in self.items():
+            if name != last_name:
+                lines.append(f"# HELP {name} {self._help.get(name, '')}")
+                lines.append(f"# TYPE {name} {metric.kind}")
+                last_name = name
+            for sample, value in metric.samples(name, labels.items()):
+                lines.append(f"{sample} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus_file(self, path):
+        """For node_exporter's textfile collector: written to a temp file, then renamed."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood stderr
+
+
+class MetricsServer:
+    """Serves REGISTRY on http://127.0.0.1:<port>/metrics from a daemon thread."""
+
+    def __init__(self, port=DEFAULT_METRICS_PORT, host="127.0.0.1"):
+        self.host = host
+        self.port = port
+        self._server = None
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True).start()
+        print(f"[Metrics] Serving http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def start_metrics_server(default_port=DEFAULT_METRICS_PORT):
+    """Start the endpoint on $LOG_METRICS_PORT (or `default_port`), None when disabled or the port is taken."""
+    try:
+        port = int(os.environ.get(METRICS_PORT_ENV, default_port))
+    except ValueError:
+        print(f"[Metrics] ⚠️ Invalid {METRICS_PORT_ENV}, metrics endpoint disabled")
+        return None
+    if port == 0:
+        return None
+    server = MetricsServer(port)
+    try:
+        server.start()
+    except OSError as e:
+        print(f"[Metrics] ⚠️ Could not serve metrics on port {port}: {e}")
+        return None
+    return server
+
+
+class RateTracker:
+    """Per-second rate of counters between two calls, for the diagnostics panel."""
+
+    def __init__(self):
+        self._last = {}
+
+    def rate(self, key, value, now=None):
+        now = time.monotonic() if now is None else now
+        previous = self._last.get(key)
+        self._last[key] = (now, value)
+        if previous is None or now <= previous[0]:
+            return math.nan
+        return (value - previous[1]) / (now - previous[0])
@@ -0,0 +1,203 @@
+import collections
+import datetime
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+PROFILE_ENV = "LOG_PROFILE"                  # Set to 1 to profile from startup until exit
+PROFILE_INTERVAL_ENV = "LOG_PROFILE_INTERVAL_MS"
+DEFAULT_INTERVAL_MS = 10                     # ~100 samples/s per thread, a few % of one core
+TRACEMALLOC_FRAMES = 1                       # Only the allocating line, keeps tracemalloc cheap
+
+PROFILE_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Database", "Profiles"))
+
+# (file, function) of the frame a thread loops in -> subsystem name in the profiles
+THREAD_ENTRY_POINTS = {
+    ("teensy_client.py", "_recv_loop"): "socket",
+    ("teensy_client.py", "emit_loop"): "emit",
+    ("teensy_client.py", "_db_writer_loop"): "db_writer",
+    ("teensy_client.py", "run"): "socket",  # Between connection attempts
+    ("query_service.py", "_worker_loop"): "query_worker",
+    ("daemon_viewer.py", "_read_loop"): "daemon_viewer",
+    ("log_pipeline.py", "_writer_loop"): "log_writer",
+    ("status_server.py", "_accept_loop"): "status_server",
+    ("status_server.py", "_send_loop"): "status_server",
+}
+
+# Path fragment of an allocating file -> subsystem, first match wins
+ALLOCATION_SUBSYSTEMS = [
+    ("comms", "ingest"),
+    ("Database", "database"),
+    ("ui", "ui"),
+    ("matplotlib", "matplotlib"),
+    ("PyQt5", "qt"),
+    ("sqlite3", "sqlite"),
+    ("numpy", "numpy"),
+    ("pandas", "pandas"),
+]
+
+
+def thread_subsystem(frame, thread_name):
+    """Name a sampled thread by the loop it runs, since QThreads have no Python name."""
+    while frame is not None:
+        key = (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name)
+        if key in THREAD_ENTRY_POINTS:
+            return THREAD_ENTRY_POINTS[key]
+        frame = frame.f_back
+    return thread_name
+
+
+def allocation_subsystem(filename):
+    if filename.startswith("<frozen importlib"):
+        return "imports"  # Modules loaded while profiling, e.g. matplotlib for a first plot window
+    parts = filename.replace("\\", "/").split("/")
+    for fragment, subsystem in ALLOCATION_SUBSYSTEMS:
+        if fragment in parts:
+            return subsystem
+    return "other"
+
+
+def collapse_stack(frame):
+    """Outermost first, as flamegraph.pl and speedscope expect."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of every thread with sys._current_frames() from a
+    background thread and counts them as collapsed stacks, one root per
+    subsystem (gui, socket, emit, db_writer, query_worker...). While running,
+    tracemalloc tracks allocations; stop() writes a timestamped pair of files:
+
+      profile_<time>.folded       flamegraph.pl / speedscope input
+      allocations_<time>.txt      allocation growth and current size per subsystem
+    """
+
+    def __init__(self, interval_ms=DEFAULT_INTERVAL_MS, output_dir=PROFILE_DIR):
+        self.interval = interval_ms / 1000.0
+        self.output_dir = output_dir
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self.started_at = None
+        self._running = False
+        self._thread = None
+        self._own_tracemalloc = False
+        self._baseline = None
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self):
+        if self._running:
+            return
+        self.stacks.clear()
+        self.samples = 0
+        self.started_at = datetime.datetime.now()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._own_tracemalloc = True
+        self._baseline = tracemalloc.take_snapshot()
+        self._running = True
+        self._thread = threading.Thread(target=self._sample_loop, name="SamplingProfiler", daemon=True)
+        self._thread.start()
+        print(f"[Profiler] ▶️ Sampling every {self.interval * 1000:.0f} ms")
+
+    def stop(self):
+        """Stop sampling and write the profile files, returns their paths."""
+        if not self._running:
+            return None
+        self._running = False
+        self._thread.join(timeout=2)
+        snapshot = tracemalloc.take_snapshot()
+        if self._own_tracemalloc:
+            tracemalloc.stop()
+            self._own_tracemalloc = False
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = self.started_at.strftime("%Y%m%d_%H%M%S")
+        profile_path = os.path.join(self.output_dir, f"profile_{stamp}.folded")
+        alloc_path = os.path.join(self.output_dir, f"allocations_{stamp}.txt")
+        self.write_folded(profile_path)
+        self.write_allocations(alloc_path, snapshot)
+        self._baseline = None
+        print(f"[Profiler] ⏹️ {self.samples} samples written to {profile_path}")
+        return profile_path, alloc_path
+
+    def _sample_loop(self):
+        own_ident = threading.get_ident()
+        main_ident = threading.main_thread().ident
+        while self._running:
+            t0 = time.perf_counter()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                if ident == main_ident:
+                    root = "gui"
+                else:
+                    root = thread_subsystem(frame, names.get(ident, f"thread-{ident}"))
+                self.stacks[f"{root};{collapse_stack(frame)}"] += 1
+            self.samples += 1
+            time.sleep(max(0.0, self.interval - (time.perf_counter() - t0)))
+
+    def write_folded(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def subsystem_samples(self):
+        """Samples per thread subsystem, to see at a glance who was busy."""
+        totals = collections.Counter()
+        for stack, count in self.stacks.items():
+            totals[stack.split(";", 1)[0]] += count
+        return totals
+
+    def write_allocations(self, path, snapshot, top=10):
+        growth = collections.Counter()
+        current = collections.Counter()
+        by_line = collections.defaultdict(list)
+        for stat in snapshot.compare_to(self._baseline, "lineno"):
+            frame = stat.traceback[0]
+            subsystem = allocation_subsystem(frame.filename)
+            growth[subsystem] += stat.size_diff
+            current[subsystem] += stat.size
+            by_line[subsystem].append(stat)
+
+        duration = (datetime.datetime.now() - self.started_at).total_seconds()
+        with open(path, "w") as f:
+            f.write(f"Profile started {self.started_at:%Y-%m-%d %H:%M:%S}, {duration:.1f} s, "
+                    f"{self.samples} samples\n\n")
+            f.write("Thread samples per subsystem\n")
+            for subsystem, count in self.subsystem_samples().most_common():
+                f.write(f"  {subsystem:<16} {count}\n")
+            f.write("\nAllocated memory per subsystem   (growth while profiling / currently allocated)\n")
+            for subsystem, size in current.most_common():
+                f.write(f"  {subsystem:<16} {growth[subsystem] / 1024:+10.1f} KiB  {size / 1024:10.1f} KiB\n")
+            for subsystem, _ in growth.most_common():
+                stats = sorted(by_line[subsystem], key=lambda s: s.size_diff, reverse=True)[:top]
+                f.write(f"\nTop growth in {subsystem}\n")
+                for stat in stats:
+                    frame = stat.traceback[0]
+                    f.write(f"  {stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocks  "
+                            f"{frame.filename}:{frame.lineno}\n")
+
+
+def profiler_from_env():
+    """A started profiler when LOG_PROFILE=1, otherwise None."""
+    if os.environ.get(PROFILE_ENV) != "1":
+        return None
+    try:
+        interval_ms = float(os.environ.get(PROFILE_INTERVAL_ENV, DEFAULT_INTERVAL_MS))
+    except ValueError:
+        interval_ms = DEFAULT_INTERVAL_MS
+    profiler = SamplingProfiler(interval_ms)
+    profiler.start()
+    return profiler
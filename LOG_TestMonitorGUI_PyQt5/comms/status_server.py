@@ -0,0 +1,154 @@
+import json
+import queue
+import socket
+import threading
+
+DAEMON_STATUS_HOST = "127.0.0.1"
+DAEMON_STATUS_PORT = 5055
+STATE_TYPES = ("data", "sps", "connected")  # Replayed to late viewers, events ("log", "trigger") are not
+
+class StatusClient:
+    """
+    One attached viewer: a bounded queue of encoded lines and a sender thread
+    that does the (blocking) socket writes, so publishing never waits on a
+    viewer. A viewer whose queue fills up is too slow and is disconnected.
+    """
+
+    SEND_TIMEOUT = 1.0  # A client that cannot take a message within this is dropped
+    QUEUE_SIZE = 2048   # Lines, a few seconds of data frames
+
+    def __init__(self, sock, address, on_closed):
+        self.sock = sock
+        self.address = address
+        self.sock.settimeout(self.SEND_TIMEOUT)
+        self._queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._on_closed = on_closed
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._send_loop, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def offer(self, line):
+        """Queue a line without blocking; False if the client was closed or is too far behind."""
+        if self._closed.is_set():
+            return False
+        try:
+            self._queue.put_nowait(line)
+            return True
+        except queue.Full:
+            self.close("too slow")
+            return False
+
+    def _send_loop(self):
+        while not self._closed.is_set():
+            line = self._queue.get()
+            if line is None:
+                break
+            try:
+                self.sock.sendall(line)
+            except OSError:
+                self.close("send failed")
+                break
+
+    def close(self, reason=None):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        try:
+            self._queue.put_nowait(None)  # Wake the sender
+        except queue.Full:
+            pass
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        self._on_closed(self, reason)
+
+
+class StatusServer:
+    """
+    Local status socket of the acquisition daemon. Every connected client
+    receives newline-delimited JSON messages ({"type": "data" | "sps" | "log" |
+    "connected" | "trigger", ...}). A client that connects later first gets
+    the latest message of each state type (STATE_TYPES), so a viewer attaching
+    mid-run shows the current state right away. Events only go to the clients
+    connected when they happen. Clients only listen, nothing they send is read.
+
+    publish() is called from the ingest threads and only queues the message
+    for each client (see StatusClient); no socket I/O happens on the caller.
+    """
+
+    def __init__(self, host=DAEMON_STATUS_HOST, port=DAEMON_STATUS_PORT):
+        self.host = host
+        self.port = port
+        self._clients = []
+        self._latest = {}
+        self._lock = threading.Lock()
+        self._running = False
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((self.host, self.port))
+        self._server.listen()
+        self._server.settimeout(1)
+        self._running = True
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._thread.start()
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                sock, address = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            client = StatusClient(sock, address, self._client_closed)
+            with self._lock:
+                for message in self._latest.values():
+                    client.offer(self._encode(message))
+                self._clients.append(client)
+            client.start()
+            print(f"[StatusServer] Viewer attached from {address[0]}:{address[1]}")
+
+    def _client_closed(self, client, reason):
+        with self._lock:
+            if client not in self._clients:
+                return
+            self._clients.remove(client)
+        if reason:
+            print(f"[StatusServer] Viewer {client.address[0]}:{client.address[1]} detached ({reason})")
+
+    @staticmethod
+    def _encode(message):
+        return (json.dumps(message) + "\n").encode("utf-8")
+
+    def publish(self, message):
+        line = self._encode(message)
+        with self._lock:
+            if message["type"] in STATE_TYPES:
+                self._latest[message["type"]] = message
+            clients = list(self._clients)
+        for client in clients:
+            client.offer(line)
+
+    @property
+    def client_count(self):
+        with self._lock:
+            return len(self._clients)
+
+    def stop(self):
+        self._running = False
+        if self._server:
+            self._server.close()
+        if self._thread:
+            self._thread.join(timeout=2)
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            client.close()
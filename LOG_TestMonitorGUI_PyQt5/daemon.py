@@ -0,0 +1,224 @@
+#  python3 daemon.py 192.168.1.232 --trigger threshold 50
+
+import datetime
+import os
+import signal
+import sys
+import threading
+import time
+
+from Database.db import initialize_db
+from comms.headless_emitter import HeadlessEmitter
+from comms.metrics import REGISTRY, MetricsServer, DEFAULT_METRICS_PORT
+from comms.profiler import SamplingProfiler, profiler_from_env, PROFILE_ENV
+from comms.status_server import StatusServer, DAEMON_STATUS_PORT
+from comms.teensy_client import TeensyClient
+from ui.log_pipeline import LogWriter
+
+TEENSY_PORT = 5000
+HEARTBEAT_S = 60  # How often the daemon logs that it is alive and how much it stored
+METRICS_FILE_S = 15  # How often --metrics-file is rewritten
+
+def print_usage():
+    print(f"""
+daemon.py
+
+Headless acquisition: connect to the Teensy, load the stored zero offsets,
+apply the trigger and log to the database, without the GUI. Status goes to
+a log file and to a local status socket the GUI can attach to as a viewer
+("Attach to Daemon").
+
+USAGE:
+  python3 daemon.py IP [options]
+
+OPTIONS:
+  --port N              Teensy port (default: {TEENSY_PORT})
+  --status-port N       Local status socket port (default: {DAEMON_STATUS_PORT})
+  --log FILE            Log file (default: Database/daemon_log.txt)
+  --metrics-port N      Prometheus /metrics port on 127.0.0.1, 0 disables it (default: {DEFAULT_METRICS_PORT})
+  --metrics-file FILE   Also write the metrics to FILE every {METRICS_FILE_S} s, for node_exporter's
+                        textfile collector (FILE should end in .prom)
+  --no-offsets          Start with zero offsets instead of the last stored ones
+  --trigger MODE VALUE  Only log around trigger events, MODE is threshold or delta (lbf)
+  --settings MODE SPS   Teensy settings resent after a Teensy reset,
+                        MODE is continuous or single-shot (default: continuous 800)
+  -h, --help            Show this help message
+
+PROFILING:
+  {PROFILE_ENV}=1 profiles from startup until exit, or send SIGUSR1 to start and
+  stop profiling a running daemon (kill -USR1 <pid>). Profiles go to Database/Profiles.
+""")
+
+def settings_command(conv_mode, sps):
+    # Same command as the GUI's Teensy Settings dialog, all load cells enabled
+    return f"SET {0 if conv_mode == 'single-shot' else 1} {sps} " + " ".join(["1"] * 6)
+
+def run_daemon(ip, port, status_port, log_path, load_offsets, trigger, settings, metrics_port=DEFAULT_METRICS_PORT,
+               metrics_file=None):
+    log_writer = LogWriter(log_path)
+    status = StatusServer(port=status_port)
+    metrics = MetricsServer(metrics_port) if metrics_port else None
+    profiler = profiler_from_env() or SamplingProfiler()
+    emitter = HeadlessEmitter()
+    stop_event = threading.Event()
+    stored = {"loads": 0}
+
+    def log(message):
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        log_writer.write(f"[{timestamp}] {message}")
+        status.publish({"type": "log", "message": message})
+
+    def on_data(timestamp, loads, accels, accel_on, accel_stale):
+        stored["loads"] += 1
+        status.publish({"type": "data", "timestamp": timestamp, "loads": loads, "accels": accels,
+                        "accel_on": int(accel_on), "accel_stale": int(accel_stale),
+                        "load_offsets": client.load_offsets})
+
+    def on_sps(lc_sps, accel_sps, sys_stable):
+        status.publish({"type": "sps", "lc_sps": lc_sps, "accel_sps": accel_sps, "stable": sys_stable})
+
+    def on_connection(connected):
+        status.publish({"type": "connected", "connected": connected})
+
+    def on_trigger(when):
+        status.publish({"type": "trigger", "timestamp": when.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]})
+
+    def on_reset():
+        client.send_command(settings)
+        log(f"Resent Teensy settings: {settings}")
+
+    emitter.log_message.connect(log)
+    emitter.new_data.connect(on_data)
+    emitter.update_sps.connect(on_sps)
+    emitter.disconnected.connect(on_connection)
+    emitter.trigger_started.connect(on_trigger)
+    emitter.teensy_reset.connect(on_reset)
+
+    try:
+        status.start()
+    except OSError as e:
+        print(f"❌ Status socket 127.0.0.1:{status_port} unavailable: {e}")
+        log_writer.close()
+        return 1
+    if metrics:
+        try:
+            metrics.start()
+        except OSError as e:
+            print(f"⚠️ Metrics port 127.0.0.1:{metrics_port} unavailable, continuing without it: {e}")
+            metrics = None
+
+    client = TeensyClient(ip, port, emitter)
+    if load_offsets:
+        client.load_last_offsets()
+    if trigger:
+        client.trigger_enabled = True
+        client.trigger_mode, client.trigger_value = trigger
+        log(f"Trigger enabled: {client.trigger_mode} at {client.trigger_value} lbf")
+
+    def request_stop(signum, frame):
+        log(f"🛑 Signal {signum} received, stopping.")
+        stop_event.set()
+
+    def toggle_profiling(signum, frame):
+        # Only flag it, the profile files are written from the main loop
+        profile_toggle.set()
+
+    profile_toggle = threading.Event()
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, toggle_profiling)
+
+    client_thread = threading.Thread(target=client.run, daemon=True)
+    client_thread.start()
+    log(f"🚀 Daemon started: Teensy {ip}:{port}, status socket 127.0.0.1:{status_port}, pid {os.getpid()}")
+    print(f"🚀 Logging to {log_path}, status on 127.0.0.1:{status_port}. Ctrl+C to stop.")
+
+    def write_metrics_file():
+        try:
+            REGISTRY.write_prometheus_file(metrics_file)
+        except OSError as e:
+            print(f"⚠️ Could not write metrics to {metrics_file}: {e}")
+
+    last_heartbeat = last_metrics_file = time.time()
+    while not stop_event.wait(1.0):
+        if metrics_file and time.time() - last_metrics_file >= METRICS_FILE_S:
+            write_metrics_file()
+            last_metrics_file = time.time()
+        if profile_toggle.is_set():
+            profile_toggle.clear()
+            if profiler.running:
+                log(f"⏹️ Profile written: {', '.join(profiler.stop())}")
+            else:
+                profiler.start()
+                log("▶️ Profiling started, send SIGUSR1 again to stop and write it.")
+        if time.time() - last_heartbeat >= HEARTBEAT_S:
+            log(f"💓 {stored['loads']} readings in the last {HEARTBEAT_S} s, {status.client_count} viewers attached")
+            stored["loads"] = 0
+            last_heartbeat = time.time()
+
+    client.stop()
+    client_thread.join(timeout=10)
+    if profiler.running:
+        log(f"⏹️ Profile written: {', '.join(profiler.stop())}")
+    log("🏁 Daemon stopped.")
+    status.stop()
+    if metrics:
+        metrics.stop()
+    if metrics_file:
+        write_metrics_file()
+    log_writer.close()
+    return 0
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args or "-h" in args or "--help" in args:
+        print_usage()
+        sys.exit(0)
+
+    ip = args[0]
+    port = TEENSY_PORT
+    status_port = DAEMON_STATUS_PORT
+    metrics_port = DEFAULT_METRICS_PORT
+    metrics_file = None
+    log_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Database", "daemon_log.txt")
+    load_offsets = True
+    trigger = None
+    settings = settings_command("continuous", "800")
+
+    try:
+        options = args[1:]
+        while options:
+            opt = options.pop(0)
+            if opt == "--port":
+                port = int(options.pop(0))
+            elif opt == "--status-port":
+                status_port = int(options.pop(0))
+            elif opt == "--metrics-port":
+                metrics_port = int(options.pop(0))
+            elif opt == "--metrics-file":
+                metrics_file = os.path.expanduser(options.pop(0))
+            elif opt == "--log":
+                log_path = os.path.expanduser(options.pop(0))
+            elif opt == "--no-offsets":
+                load_offsets = False
+            elif opt == "--trigger":
+                mode = options.pop(0).lower()
+                if mode not in ("threshold", "delta"):
+                    raise ValueError(f"Unknown trigger mode: {mode}")
+                trigger = (mode.capitalize(), float(options.pop(0)))
+            elif opt == "--settings":
+                conv_mode = options.pop(0).lower()
+                if conv_mode not in ("continuous", "single-shot"):
+                    raise ValueError(f"Unknown conversion mode: {conv_mode}")
+                settings = settings_command(conv_mode, int(options.pop(0)))
+            else:
+                raise ValueError(f"Unknown option: {opt}")
+    except (ValueError, IndexError) as e:
+        print(f"❌ {e}")
+        print_usage()
+        sys.exit(1)
+
+    initialize_db()
+    sys.exit(run_daemon(ip, port, status_port, log_path, load_offsets, trigger, settings, metrics_port,
+                        metrics_file))
@@ -1,18 +1,34 @@
+import time
+_started = time.perf_counter()
+
 import os
 os.environ["QT_QPA_PLATFORM"] = "xcb"
 os.environ["QT_SCALE_FACTOR"] = "1.5"
 
+import multiprocessing
 import sys
-from PyQt5.QtWidgets import QApplication
-from ui.main_window import MainWindow
-from Database.db import initialize_db
+from ui.startup_report import StartupReport
+
+startup = StartupReport(_started)
+with startup.timed("import PyQt5"):
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QTimer
+with startup.timed("import ui.main_window"):
+    from ui.main_window import MainWindow
+with startup.timed("import Database.db"):
+    from Database.db import initialize_db
 
 def main():
-    initialize_db()
-    app = QApplication(sys.argv)
-    window = MainWindow()
+    with startup.timed("initialize_db()"):
+        initialize_db()
+    with startup.timed("QApplication()"):
+        app = QApplication(sys.argv)
+    with startup.timed("MainWindow()"):
+        window = MainWindow()
     window.show()
+    QTimer.singleShot(0, startup.finish)  # First event loop turn, the window is on screen
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Export worker processes in the PyInstaller bundle
     main()
@@ -0,0 +1,56 @@
+import datetime
+import math
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# Modules are imported from the application root (Database.*, ui.*, comms.*), as main.py runs them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Database import db
+
+START = datetime.datetime(2025, 7, 15, 9, 59, 56)  # The sample range crosses the 10:00 hour boundary
+SECONDS = 8
+SPS = 400
+
+
+def stamp(dt):
+    return dt.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+@pytest.fixture
+def sample_db(tmp_path, monkeypatch):
+    """
+    A small data_log.db: SECONDS of load cells at SPS from START, the
+    accelerometer on every 8th sample with a one second gap, and offset and
+    config events before and inside the range. Returns the database path.
+    """
+    path = str(tmp_path / "data_log.db")
+    monkeypatch.setattr(db, "get_db_path", lambda: path)
+    db.initialize_db()
+
+    loads, accels = [], []
+    for i in range(SECONDS * SPS):
+        t = START + datetime.timedelta(seconds=i / SPS)
+        loads.append((stamp(t), *[math.sin(2 * math.pi * 5 * i / SPS) * 10 + k for k in range(6)]))
+        if i % 8 == 0 and not 2 * SPS <= i < 3 * SPS:
+            accels.append((stamp(t), math.sin(i / 100), 0.1, 1.0))
+    loads[10] = (loads[10][0], None, *loads[10][2:])  # One NULL reading
+
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO load_cells (timestamp, lc1, lc2, lc3, lc4, lc5, lc6) VALUES (?,?,?,?,?,?,?)", loads)
+    conn.executemany("INSERT INTO accelerometer (timestamp, ax, ay, az) VALUES (?,?,?,?)", accels)
+    conn.executemany(
+        "INSERT INTO load_cell_zero_offsets (timestamp, lc1_offset, lc2_offset, lc3_offset, lc4_offset, lc5_offset, lc6_offset) "
+        "VALUES (?,?,?,?,?,?,?)",
+        [("2025-07-15 09:00:00.000", 1, 2, 3, 4, 5, 6), ("2025-07-15 09:59:58.500", 7, 7, 7, 7, 7, 7)])
+    conn.executemany("INSERT INTO accelerometer_zero_offsets (timestamp, ax_offset, ay_offset, az_offset) VALUES (?,?,?,?)",
+                     [("2025-07-15 10:00:01.000", 0.5, 0.5, 0.5)])
+    conn.executemany("INSERT INTO log_config (timestamp, wheel_type, depth, feed_rate, pitch) VALUES (?,?,?,?,?)",
+                     [("2025-07-15 09:30:00.000", "60/40", 1.0, 2.0, 3.0),
+                      ("2025-07-15 10:00:02.000", None, 4.0, 5.0, 6.0)])
+    conn.commit()
+    conn.close()
+    return path
@@ -0,0 +1,27 @@
+import numpy as np
+
+from Database.alignment import ACCEL_TOLERANCE_S, accel_tolerance, asof_align, asof_indices
+
+
+def test_asof_indices_takes_latest_at_or_before_within_tolerance():
+    other = np.array([1.0, 2.0, 3.0])
+    times = np.array([0.5, 1.0, 1.05, 1.5, 2.09, 3.0, 10.0])
+    assert asof_indices(times, other, 0.1).tolist() == [-1, 0, 0, -1, 1, 2, -1]
+    assert asof_indices(times, other, np.inf).tolist() == [-1, 0, 0, 0, 1, 2, 2]
+
+
+def test_asof_indices_with_no_other_samples():
+    assert asof_indices(np.array([1.0, 2.0]), np.empty(0), np.inf).tolist() == [-1, -1]
+
+
+def test_asof_align_fills_unmatched_rows_with_nan():
+    other_times = np.array([1.0, 2.0])
+    other_values = np.array([[10.0, 11.0], [20.0, 21.0]])
+    aligned = asof_align(np.array([0.0, 1.01, 2.5]), other_times, other_values, 0.1)
+    assert np.array_equal(aligned, np.array([[np.nan, np.nan], [10.0, 11.0], [np.nan, np.nan]]), equal_nan=True)
+
+
+def test_accel_tolerance_allows_half_a_bucket():
+    assert accel_tolerance(0) == ACCEL_TOLERANCE_S
+    assert accel_tolerance(100) == ACCEL_TOLERANCE_S
+    assert accel_tolerance(1000) == 0.5
@@ -0,0 +1,56 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from Database.averaging import bucketed_select, choose_bucket_ms, datetime_to_epoch, is_finer
+from conftest import START, SECONDS, SPS
+
+COLUMNS = ["timestamp", "lc1", "lc2", "lc3", "lc4", "lc5", "lc6"]
+END = START.replace(hour=10, minute=0, second=4)
+
+
+def fetch(path, bucket_ms):
+    conn = sqlite3.connect(path)
+    try:
+        return np.array(conn.execute(bucketed_select("load_cells", COLUMNS, bucket_ms), (START, END)).fetchall(),
+                        dtype=float)
+    finally:
+        conn.close()
+
+
+def test_raw_select_returns_epoch_seconds(sample_db):
+    rows = fetch(sample_db, 0)
+    assert len(rows) == SECONDS * SPS
+    assert rows[0, 0] == pytest.approx(datetime_to_epoch(START))
+    assert np.allclose(np.diff(rows[:, 0]), 1 / SPS, atol=1e-3)  # Stamps are stored to the millisecond
+
+
+@pytest.mark.parametrize("bucket_ms", [10, 100, 500, 1000])
+def test_bucketed_select_averages_fixed_epoch_buckets(sample_db, bucket_ms):
+    raw = fetch(sample_db, 0)
+    rows = fetch(sample_db, bucket_ms)
+
+    buckets = np.round(raw[:, 0] * 1000).astype("int64") // bucket_ms
+    expected = []
+    for bucket in np.unique(buckets):
+        values = raw[buckets == bucket, 1:]
+        expected.append([(bucket * bucket_ms + bucket_ms / 2) / 1000] + list(np.nanmean(values, axis=0)))
+    assert np.allclose(rows, np.array(expected), equal_nan=True)
+
+
+@pytest.mark.parametrize("span_ms, max_points, expected", [
+    (1000, 800, 0),            # 800 raw rows fit
+    (10_000, 2000, 10),        # 8000 raw rows do not, 1000 buckets of 10 ms do
+    (600_000, 2000, 500),      # 10 minutes: 6000 of 100 ms, 1200 of 500 ms
+    (86_400_000, 2000, 1000),  # Nothing fits, the coarsest bucket
+])
+def test_choose_bucket_ms(span_ms, max_points, expected):
+    assert choose_bucket_ms(span_ms, max_points) == expected
+
+
+def test_is_finer():
+    assert is_finer(0, 100)
+    assert is_finer(10, 100)
+    assert not is_finer(100, 100)
+    assert not is_finer(10, 0)
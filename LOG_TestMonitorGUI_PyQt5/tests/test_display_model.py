@@ -0,0 +1,38 @@
+from ui.display_model import AXIAL_CELLS, LOAD_CELLS, DisplayModel, format_readings
+
+
+def test_only_changed_values_reach_their_widgets():
+    model = DisplayModel()
+    calls = []
+    for key in ("a", "b"):
+        model.bind(key, lambda value, key=key: calls.append((key, value)))
+
+    assert model.apply({"a": 1, "b": 2}) == 2
+    assert model.apply({"a": 1, "b": 3}) == 1
+    assert model.apply({"a": 1, "b": 3}) == 0
+    assert calls == [("a", 1), ("b", 2), ("b", 3)]
+
+
+def test_invalidate_forces_the_next_update():
+    model = DisplayModel()
+    calls = []
+    model.bind("a", calls.append)
+    model.apply({"a": 1})
+    model.invalidate("a")
+    model.apply({"a": 1})
+    model.invalidate()
+    model.apply({"a": 1})
+    assert calls == [1, 1, 1]
+
+
+def test_format_readings_flags_contact_loss_on_axial_cells_only():
+    offsets = [5.0] * 6
+    loads = [-6.0] * 6
+    values = format_readings(loads, [0.0, 0.0, 1.0], True, offsets)
+    for i, lc in enumerate(LOAD_CELLS):
+        assert values[f"{lc}.contact_lost"] == (i in AXIAL_CELLS)
+    assert values["accel_Z"] == "Z: +1.00 g"
+
+    values = format_readings(loads, [], False, [0.0] * 6)
+    assert not any(values[f"{lc}.contact_lost"] for lc in LOAD_CELLS)
+    assert values["accel_X"] == "X: ---"
@@ -0,0 +1,175 @@
+import csv
+import datetime
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pytest
+
+from Database import export_engine
+from Database.alignment import accel_tolerance
+from Database.averaging import bucketed_select
+from Database.export_engine import (
+    EXPORT_TABLES, MERGED, MERGED_COLUMNS, BucketAverager, ExportCancelled, export_tables, iter_chunks
+)
+from Database.export_formats import format_timestamps
+from Database.mechanics import RIG
+from conftest import START, SECONDS
+
+END = START + datetime.timedelta(seconds=SECONDS)
+TABLES = list(EXPORT_TABLES)
+
+
+def read_csv(path):
+    with open(path, newline="") as f:
+        return list(csv.reader(f))
+
+
+def sql_rows(path, table, bucket_ms):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(bucketed_select(table, EXPORT_TABLES[table], bucket_ms), (START, END)).fetchall()
+    finally:
+        conn.close()
+
+
+def as_csv(rows):
+    """SQL rows formatted the way CsvSink writes them."""
+    times = format_timestamps([row[0] for row in rows])
+    return [[t] + ["" if v is None else v if isinstance(v, str) else str(float(v)) for v in row[1:]]
+            for t, row in zip(times, rows)]
+
+
+def csv_numbers(rows):
+    return np.array([[np.nan if v == "" else float(v) for v in row[1:]] for row in rows])
+
+
+@pytest.mark.parametrize("chunk_rows", [7, 100, 100000])
+@pytest.mark.parametrize("bucket_ms", [10, 100, 1000])
+def test_bucket_averager_matches_sql_averaging(sample_db, bucket_ms, chunk_rows):
+    conn = sqlite3.connect(sample_db)
+    try:
+        chunks = list(iter_chunks(conn, "load_cells", EXPORT_TABLES["load_cells"], START, END, bucket_ms, chunk_rows))
+    finally:
+        conn.close()
+    times = np.concatenate([c[0] for c in chunks])
+    values = np.column_stack([np.concatenate([c[1][i] for c in chunks]) for i in range(6)])
+    expected = np.array(sql_rows(sample_db, "load_cells", bucket_ms), dtype=float)
+    assert np.allclose(times, expected[:, 0])
+    assert np.allclose(values, expected[:, 1:], equal_nan=True)
+    assert sum(c[2] for c in chunks) == len(sql_rows(sample_db, "load_cells", 0))
+
+
+def test_bucket_averager_carries_the_open_bucket():
+    averager = BucketAverager(1000)
+    t, v = averager.feed(np.array([0.1, 0.2, 1.1]), np.array([[1.0], [3.0], [5.0]]))
+    assert t.tolist() == [0.5] and v.tolist() == [[2.0]]
+    t, v = averager.feed(np.array([1.2]), np.array([[np.nan]]))
+    assert len(t) == 0
+    t, v = averager.finish()
+    assert t.tolist() == [1.5] and v.tolist() == [[5.0]]
+
+
+@pytest.mark.parametrize("bucket_ms", [0, 100])
+def test_csv_export_matches_the_sql_query(sample_db, tmp_path, bucket_ms):
+    results = export_tables(sample_db, TABLES, START, END, str(tmp_path), bucket_ms, workers=1)
+    for table, result in zip(TABLES, results):
+        rows = read_csv(result.path)
+        assert rows[0] == EXPORT_TABLES[table]
+        sampled = table in ("load_cells", "accelerometer")
+        expected = as_csv(sql_rows(sample_db, table, bucket_ms if sampled else 0))
+        assert result.rows == len(rows) - 1 == len(expected)
+        if bucket_ms and sampled:
+            # numpy and SQLite sum the bucket in a different order, the last digit may differ
+            assert [row[0] for row in rows[1:]] == [row[0] for row in expected]
+            assert np.allclose(csv_numbers(rows[1:]), csv_numbers(expected), rtol=1e-12, equal_nan=True)
+        else:
+            assert rows[1:] == expected
+
+
+@pytest.mark.parametrize("format_name", ["csv", "npz"])
+def test_one_and_several_workers_write_identical_files(sample_db, tmp_path, format_name):
+    tables = TABLES + [MERGED]
+    outputs = []
+    for workers in (1, 3):
+        folder = tmp_path / f"workers_{workers}"
+        folder.mkdir()
+        results = export_tables(sample_db, tables, START, END, str(folder), 10, workers=workers,
+                                slice_name="hour", format_name=format_name)
+        outputs.append(results)
+        assert sorted(os.listdir(folder)) == sorted(os.path.basename(r.path) for r in results)  # No leftover parts
+
+    for single, pooled in zip(*outputs):
+        assert (single.rows, single.raw_rows) == (pooled.rows, pooled.raw_rows)
+        if format_name == "csv":
+            assert read_csv(single.path) == read_csv(pooled.path)
+        else:
+            a, b = np.load(single.path), np.load(pooled.path)
+            assert a.files == b.files
+            for name in a.files:
+                assert np.array_equal(a[name], b[name], equal_nan=a[name].dtype.kind == "f")
+
+
+def expected_merged(path, bucket_ms):
+    """Brute-force as-of join of the merged table, row by row."""
+    def rows(table, lower=datetime.datetime(2000, 1, 1)):
+        conn = sqlite3.connect(path)
+        try:
+            bucket = bucket_ms if table in ("load_cells", "accelerometer") else 0
+            return conn.execute(bucketed_select(table, EXPORT_TABLES[table], bucket), (lower, END)).fetchall()
+        finally:
+            conn.close()
+
+    tolerance = accel_tolerance(bucket_ms)
+    accel = rows("accelerometer")
+    events = [rows(table) for table in export_engine.MERGED_EVENTS]
+    expected = []
+    for load in rows("load_cells", START):
+        t = load[0]
+        loads = [np.nan if v is None else v for v in load[1:]]
+        match = [a for a in accel if a[0] <= t and t - a[0] <= tolerance]
+        row = [t] + loads + (list(match[-1][1:]) if match else [np.nan] * 3) + list(RIG.wrench(loads))
+        for event_rows in events:
+            active = [e for e in event_rows if e[0] <= t]
+            width = len(event_rows[0]) - 1
+            row += list(active[-1][1:]) if active else [None] * width
+        expected.append(row)
+    return expected
+
+
+@pytest.mark.parametrize("bucket_ms", [0, 500])
+def test_merged_export_is_an_asof_join(sample_db, tmp_path, bucket_ms):
+    result, = export_tables(sample_db, [MERGED], START, END, str(tmp_path), bucket_ms, workers=1, format_name="npz")
+    data = np.load(result.path)
+    assert data.files == MERGED_COLUMNS
+
+    expected = expected_merged(sample_db, bucket_ms)
+    assert len(data["timestamp"]) == len(expected)
+    micros = data["timestamp"].astype("int64")
+    assert np.array_equal(micros, np.round(np.array([row[0] for row in expected]) * 1e6).astype("int64"))
+    for i, column in enumerate(MERGED_COLUMNS[1:], start=1):
+        column_values = [row[i] for row in expected]
+        if column == "wheel_type":
+            assert data[column].tolist() == ["" if v is None else v for v in column_values]
+        else:
+            assert np.allclose(data[column], np.array(column_values, dtype=float), equal_nan=True), column
+
+    # The accelerometer gap leaves NaNs, the events before START are carried in
+    assert np.isnan(data["ax"]).any()
+    assert data["lc1_offset"][0] == 1.0 and data["lc1_offset"][-1] == 7.0
+
+
+def test_cancel_removes_written_files(sample_db, tmp_path):
+    folder = tmp_path / "export"
+    folder.mkdir()
+    cancel = threading.Event()
+
+    def progress(table, done, total):
+        if done:
+            cancel.set()
+
+    with pytest.raises(ExportCancelled):
+        export_tables(sample_db, TABLES + [MERGED], START, END, str(folder), workers=1,
+                      progress=progress, cancel=cancel)
+    assert os.listdir(folder) == []
@@ -0,0 +1,88 @@
+import csv
+
+import numpy as np
+import pytest
+
+from Database.export_formats import ExportFormatError, check_format, make_sink, read_part
+
+COLUMNS = ["timestamp", "depth", "wheel_type"]
+TEXT = {"wheel_type"}
+CHUNKS = [
+    (np.array([1752573600.0, 1752573600.0025]), [np.array([1.5, np.nan]), np.array(["60/40", None], dtype=object)]),
+    (np.empty(0), [np.empty(0), np.empty(0, dtype=object)]),
+    (np.array([1752573601.5]), [np.array([3.0]), np.array(["70/30"], dtype=object)]),
+]
+MICROS = [1752573600000000, 1752573600002500, 1752573601500000]
+
+
+def write(format_name, path):
+    sink = make_sink(format_name, str(path), COLUMNS, TEXT)
+    for times, values in CHUNKS:
+        sink.write(times, values)
+    sink.close()
+
+
+def test_csv_round_trip(tmp_path):
+    path = tmp_path / "out.csv"
+    write("csv", path)
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows == [COLUMNS,
+                    ["2025-07-15 10:00:00.000", "1.5", "60/40"],
+                    ["2025-07-15 10:00:00.002", "", ""],
+                    ["2025-07-15 10:00:01.500", "3.0", "70/30"]]
+
+
+def test_npz_round_trip(tmp_path):
+    path = tmp_path / "out.npz"
+    write("npz", path)
+    data = np.load(path)
+    assert data["timestamp"].astype("int64").tolist() == MICROS
+    assert np.array_equal(data["depth"], [1.5, np.nan, 3.0], equal_nan=True)
+    assert data["wheel_type"].tolist() == ["60/40", "", "70/30"]  # NULL is '', not 'None'
+
+
+@pytest.mark.parametrize("format_name", ["parquet", "feather"])
+def test_arrow_round_trip(tmp_path, format_name):
+    pytest.importorskip("pyarrow")
+    import pyarrow.feather
+    import pyarrow.parquet
+    path = tmp_path / f"out.{format_name}"
+    write(format_name, path)
+    table = pyarrow.parquet.read_table(path) if format_name == "parquet" else pyarrow.feather.read_table(path)
+    assert table.column_names == COLUMNS
+    assert table.column("timestamp").cast("int64").to_pylist() == MICROS
+    assert table.column("depth").to_pylist() == [1.5, None, 3.0]
+    assert table.column("wheel_type").to_pylist() == ["60/40", None, "70/30"]
+
+
+def test_hdf5_round_trip(tmp_path):
+    h5py = pytest.importorskip("h5py")
+    path = tmp_path / "out.h5"
+    write("hdf5", path)
+    with h5py.File(path, "r") as f:
+        assert f["timestamp"][:].tolist() == MICROS
+        assert np.array_equal(f["depth"][:], [1.5, np.nan, 3.0], equal_nan=True)
+        assert [v.decode() for v in f["wheel_type"][:]] == ["60/40", "", "70/30"]
+
+
+def test_part_files_replay_their_chunks(tmp_path):
+    path = tmp_path / "out.part"
+    write("part", path)
+    chunks = list(read_part(str(path), len(COLUMNS) - 1))
+    assert len(chunks) == 2  # Empty chunks are not written
+    assert chunks[1][0].tolist() == [1752573601.5]
+    assert chunks[0][1][1].tolist() == ["60/40", None]
+
+
+def test_abort_removes_the_partial_file(tmp_path):
+    path = tmp_path / "out.npz"
+    sink = make_sink("npz", str(path), COLUMNS, TEXT)
+    sink.write(*CHUNKS[0])
+    sink.abort()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ExportFormatError):
+        check_format("xlsx")
@@ -0,0 +1,27 @@
+from ui.frame_stats import FrameStats, RefreshScheduler
+
+
+def measured(transform_ms, draw_ms, query_ms, frames=20):
+    stats = FrameStats()
+    for _ in range(frames):
+        stats.add("transform", transform_ms)
+        stats.add("draw", draw_ms)
+        stats.add("query", query_ms)
+    return stats
+
+
+def test_slow_queries_do_not_stretch_the_refresh_interval():
+    stats = measured(transform_ms=5, draw_ms=20, query_ms=3000)  # Queued behind an export
+    assert stats.frame_cost() == 25
+    assert RefreshScheduler(cpu_budget=0.25).interval_ms(500, stats) == 500
+
+
+def test_costly_frames_stretch_the_interval_up_to_the_maximum():
+    scheduler = RefreshScheduler(cpu_budget=0.25, max_interval_ms=5000)
+    assert scheduler.interval_ms(500, measured(transform_ms=30, draw_ms=220, query_ms=1)) == 1000
+    assert scheduler.interval_ms(500, measured(transform_ms=500, draw_ms=2000, query_ms=1)) == 5000
+
+
+def test_interval_waits_for_enough_frames():
+    stats = measured(transform_ms=500, draw_ms=2000, query_ms=1, frames=RefreshScheduler.MIN_SAMPLES - 1)
+    assert RefreshScheduler().interval_ms(500, stats) == 500
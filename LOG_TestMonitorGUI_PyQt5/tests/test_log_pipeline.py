@@ -0,0 +1,25 @@
+from ui.log_pipeline import MessageCoalescer
+
+
+def test_repeats_within_the_window_are_counted_and_summarised():
+    coalescer = MessageCoalescer(window_s=10)
+    assert coalescer.submit("Data loss: 12 samples missing", now=0.0)
+    assert not coalescer.submit("Data loss: 7 samples missing", now=1.0)
+    assert not coalescer.submit("Data loss: 3 samples missing", now=2.0)
+    assert coalescer.flush(now=5.0) == []
+    assert coalescer.flush(now=10.0) == ["Data loss ×2 in last 10 s (latest: Data loss: 3 samples missing)"]
+    assert coalescer.flush(now=20.0) == []
+
+
+def test_messages_with_other_text_are_not_coalesced():
+    coalescer = MessageCoalescer(window_s=10)
+    assert coalescer.submit("Connected to 192.168.1.232", now=0.0)
+    assert coalescer.submit("Zeroed load cells", now=0.5)
+
+
+def test_a_new_window_shows_the_message_and_reports_the_old_one():
+    coalescer = MessageCoalescer(window_s=10)
+    coalescer.submit("Bad line 1", now=0.0)
+    coalescer.submit("Bad line 2", now=1.0)
+    assert coalescer.submit("Bad line 3", now=11.0)
+    assert coalescer.flush(now=12.0) == ["Bad line 2 ×1 in last 10 s"]
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from Database.mechanics import (
+    DEFAULT_RIG, FX, FY, FZ, MX, MY, MZ, F_MAG, COP_X, COP_Y, MECHANICS_COLUMNS, RigGeometry
+)
+
+RIG = RigGeometry.from_dict(DEFAULT_RIG)
+
+
+def unit_load(cell, value=1.0):
+    loads = np.zeros(6)
+    loads[cell] = value
+    return loads
+
+
+def test_vertical_cell_gives_fz_and_moments_from_its_position():
+    for cell in RIG.cells("z"):
+        x, y = RIG.positions[cell]
+        wrench = RIG.wrench(unit_load(cell, 2.0))
+        assert wrench[FZ] == 2.0 and wrench[FX] == 0.0 and wrench[FY] == 0.0
+        assert wrench[MX] == pytest.approx(2.0 * y)
+        assert wrench[MY] == pytest.approx(-2.0 * x)
+        assert wrench[MZ] == 0.0
+
+
+def test_horizontal_cells_give_shear_and_mz():
+    for cell in RIG.cells("x") + RIG.cells("y"):
+        x, y = RIG.positions[cell]
+        wrench = RIG.wrench(unit_load(cell))
+        if RIG.axes[cell] == "x":
+            assert wrench[FX] == 1.0 and wrench[MZ] == pytest.approx(-y)
+        else:
+            assert wrench[FY] == 1.0 and wrench[MZ] == pytest.approx(x)
+        assert wrench[FZ] == wrench[MX] == wrench[MY] == 0.0
+
+
+def test_wrench_is_vectorized_and_counts_nan_as_zero():
+    loads = np.random.default_rng(1).normal(size=(50, 6))
+    loads[3, 2] = np.nan
+    rows = RIG.wrench(loads)
+    assert rows.shape == (50, 6)
+    for i in range(50):
+        assert np.allclose(rows[i], RIG.wrench(np.nan_to_num(loads[i])))
+
+
+def test_mechanics_magnitude_and_center_of_pressure():
+    # Equal vertical loads on every z cell put the centre of pressure at their centroid
+    loads = np.zeros(6)
+    loads[RIG.cells("z")] = 10.0
+    row = RIG.mechanics(loads)
+    assert len(row) == len(MECHANICS_COLUMNS)
+    assert row[F_MAG] == pytest.approx(30.0)
+    centroid = RIG.positions[RIG.cells("z")].mean(axis=0)
+    assert row[COP_X] == pytest.approx(centroid[0])
+    assert row[COP_Y] == pytest.approx(centroid[1])
+
+
+def test_center_of_pressure_is_nan_without_vertical_load():
+    row = RIG.mechanics(unit_load(RIG.cells("x")[0], 50.0))
+    assert np.isnan(row[COP_X]) and np.isnan(row[COP_Y])
+
+
+def test_invalid_geometry_is_rejected():
+    with pytest.raises(ValueError):
+        RigGeometry(DEFAULT_RIG["load_cells"][:5])
+    cells = [dict(cell) for cell in DEFAULT_RIG["load_cells"]]
+    cells[0]["axis"] = "w"
+    with pytest.raises(ValueError):
+        RigGeometry(cells)
@@ -0,0 +1,26 @@
+import numpy as np
+
+from ui.plot_data import PlotDataModel
+
+
+def test_live_window_is_trimmed_by_time_span_not_point_count():
+    data = PlotDataModel(initial_capacity=4)
+    t = 1000.0
+    for _ in range(120):  # One minute at a 0.5 s tick
+        t += 0.5
+        data.append(t, np.zeros(6), max_age=60)
+    for _ in range(10):  # The tick stretches to 2 s, the older points stay
+        t += 2.0
+        data.append(t, np.zeros(6), max_age=60)
+
+    assert data.times[-1] - data.times[0] <= 60
+    assert data.times[0] == t - 60
+    assert len(data) == 10 + 81
+
+
+def test_append_without_max_age_keeps_everything():
+    data = PlotDataModel(initial_capacity=4)
+    for i in range(50):
+        data.append(float(i), np.full(6, i), accel=[0.0, 0.0, 1.0])
+    assert len(data) == 50
+    assert data.loads[-1, 0] == 49 and data.accel[-1, 2] == 1.0
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from ui.spectral import StreamingSpectrum
+
+FS = 800.0
+
+
+def sine(seconds, freq=60.0, amplitude=2.0, start=1.75e9):
+    t = start + np.arange(int(seconds * FS)) / FS
+    return t, amplitude * np.sin(2 * np.pi * freq * t)
+
+
+def test_psd_peak_and_power_of_a_known_sinusoid():
+    t, x = sine(30, freq=62.5, amplitude=2.0)  # 62.5 Hz falls exactly on a bin of nperseg 512
+    stream = StreamingSpectrum(FS, 512, 0.5, max_segments=None)
+    stream.push(t, x)
+    freqs, psd = stream.psd()
+    assert freqs[np.argmax(psd)] == pytest.approx(62.5)
+    # Parseval: the PSD integrates to the signal variance, A² / 2
+    assert np.sum(psd) * stream.resolution == pytest.approx(2.0 ** 2 / 2, rel=0.02)
+
+
+def test_chunked_pushes_match_a_single_push():
+    t, x = sine(20)
+    whole = StreamingSpectrum(FS, 256, 0.75, max_segments=None)
+    whole.push(t, x)
+    chunked = StreamingSpectrum(FS, 256, 0.75, max_segments=None)
+    for i in range(0, len(t), 333):
+        chunked.push(t[i:i + 333], x[i:i + 333])
+    assert len(chunked) == len(whole)
+    assert np.allclose(chunked.psd()[1], whole.psd()[1])
+    assert np.allclose(chunked.spectrogram()[2], whole.spectrogram()[2])
+
+
+def test_segments_across_a_gap_are_skipped():
+    t, x = sine(10)
+    gap = slice(4000, 4400)
+    stream = StreamingSpectrum(FS, 512, 0.5, max_segments=None)
+    stream.push(np.delete(t, gap), np.delete(x, gap))
+    segment_times = stream.spectrogram()[0]
+    assert not np.any((segment_times > t[3800]) & (segment_times < t[4600]))
+
+
+def test_live_mode_keeps_only_the_last_segments():
+    t, x = sine(30)
+    stream = StreamingSpectrum(FS, 512, 0.5, max_segments=20)
+    for i in range(0, len(t), 400):
+        stream.push(t[i:i + 400], x[i:i + 400])
+    segment_times, _, spectra = stream.spectrogram()
+    assert len(stream) == 20 and spectra.shape[0] == 20
+    assert segment_times[-1] == pytest.approx(t[-1] - 256 / FS, abs=0.5)
+    assert np.all(np.diff(segment_times) > 0)
+
+
+def test_range_mode_merges_columns_but_keeps_every_segment_in_the_psd():
+    t, x = sine(60)
+    full = StreamingSpectrum(FS, 256, 0.5, max_segments=None, max_columns=100000)
+    capped = StreamingSpectrum(FS, 256, 0.5, max_segments=None, max_columns=64)
+    for stream in (full, capped):
+        stream.push(t, x)
+    assert len(capped) == len(full)
+    assert capped.spectrogram()[2].shape[0] <= 64
+    assert np.allclose(capped.psd()[1], full.psd()[1])
+    assert np.all(np.diff(capped.spectrogram()[0]) > 0)
+
+
+def test_mesh_keeps_columns_at_their_time_after_a_gap():
+    t, x = sine(20)
+    gap = slice(6000, 8000)  # 2.5 s without samples
+    stream = StreamingSpectrum(FS, 256, 0.5, max_segments=None)
+    stream.push(np.delete(t, gap), np.delete(x, gap))
+    segment_times, _, _ = stream.spectrogram()
+    edges, freq_edges, power = stream.spectrogram_mesh()
+
+    assert len(edges) == power.shape[0] + 1 and len(freq_edges) == power.shape[1] + 1
+    assert np.all(np.diff(edges) > 0)
+    blank = np.flatnonzero(np.isnan(power).all(axis=1))
+    assert len(blank) == 1 and power.shape[0] == len(segment_times) + 1
+    # The blank column covers the gap, every other column is centred on its segment time
+    assert edges[blank[0]] <= t[gap.start] and edges[blank[0] + 1] >= t[gap.stop - 1]
+    centres = np.delete((edges[:-1] + edges[1:]) / 2, blank)
+    assert np.allclose(centres, segment_times, atol=1 / FS)
+
+
+def test_mesh_of_merged_columns_has_no_blank_columns_without_gaps():
+    t, x = sine(60)
+    stream = StreamingSpectrum(FS, 256, 0.5, max_segments=None, max_columns=50)
+    for i in range(0, len(t), 1000):
+        stream.push(t[i:i + 1000], x[i:i + 1000])
+    edges, _, power = stream.spectrogram_mesh()
+    assert not np.isnan(power).any()
+    assert edges[0] < t[0] + 128 / FS and edges[-1] > t[-1] - 128 / FS  # First and last segment centres
@@ -0,0 +1,59 @@
+import json
+import socket
+import time
+
+import pytest
+
+from comms.status_server import StatusServer
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def server():
+    server = StatusServer(port=free_port())
+    server.start()
+    yield server
+    server.stop()
+
+
+def attach(server, expected_clients):
+    sock = socket.create_connection((server.host, server.port), timeout=3)
+    deadline = time.monotonic() + 3
+    while server.client_count < expected_clients:
+        assert time.monotonic() < deadline, "viewer was not accepted"
+        time.sleep(0.01)
+    return sock, sock.makefile("r", encoding="utf-8")
+
+
+def read_until(reader, kind):
+    messages = []
+    while not messages or messages[-1]["type"] != kind:
+        messages.append(json.loads(reader.readline()))
+    return messages
+
+
+def test_late_viewer_gets_the_latest_state_but_no_past_events(server):
+    early, early_reader = attach(server, 1)
+    server.publish({"type": "connected", "connected": True})
+    server.publish({"type": "sps", "lc_sps": 400, "accel_sps": 50, "stable": True})
+    server.publish({"type": "trigger", "timestamp": "2025-07-15 10:00:00.000"})
+    server.publish({"type": "log", "message": "Trigger"})
+    server.publish({"type": "sps", "lc_sps": 401, "accel_sps": 50, "stable": True})
+
+    late, late_reader = attach(server, 2)
+    server.publish({"type": "log", "message": "after attach"})
+    try:
+        live = [json.loads(early_reader.readline())["type"] for _ in range(6)]
+        assert live == ["connected", "sps", "trigger", "log", "sps", "log"]
+        replayed = read_until(late_reader, "log")
+        assert sorted(m["type"] for m in replayed[:-1]) == ["connected", "sps"]
+        assert [m["lc_sps"] for m in replayed if m["type"] == "sps"] == [401]
+        assert replayed[-1]["message"] == "after attach"
+    finally:
+        early.close()
+        late.close()
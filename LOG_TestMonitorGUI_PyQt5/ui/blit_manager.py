@@ -0,0 +1,62 @@
+class BlitManager:
+    """
+    Redraw only a few fast-changing artists (plot lines, cursors) on top of a
+    cached background of everything else (axes, ticks, grid, legend).
+
+    The background is captured by drawing the figure once with the managed
+    artists hidden. Any other full draw (resize, toolbar zoom/pan, layout
+    change) invalidates it and the next update() captures it again. The managed
+    artists stay regular, non-animated artists, so toolbar "Save" and savefig
+    still render them.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self._artists = []
+        self._background = None
+        self._capturing = False
+        self.full_draws = 0  # Background captures, shown in the plot stats overlay
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def set_artists(self, artists):
+        self._artists = list(artists)
+        self._background = None
+
+    def invalidate(self):
+        """Force the next update() to recapture the background, e.g. after changing limits."""
+        self._background = None
+
+    def _on_draw(self, event):
+        if not self._capturing:
+            self._background = None
+
+    def _capture_background(self):
+        visible = [a.get_visible() for a in self._artists]
+        for artist in self._artists:
+            artist.set_visible(False)
+
+        self._capturing = True
+        try:
+            self.canvas.draw()
+        finally:
+            self._capturing = False
+            for artist, was_visible in zip(self._artists, visible):
+                artist.set_visible(was_visible)
+
+        self._background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self.full_draws += 1
+
+    def update(self):
+        if self._background is None:
+            self._capture_background()
+        else:
+            self.canvas.restore_region(self._background)
+
+        figure = self.canvas.figure
+        for artist in self._artists:
+            if artist.get_visible():
+                figure.draw_artist(artist)
+
+        # No flush_events() here: on Qt, blit() repaints synchronously and
+        # processing events would re-enter the plot refresh slots.
+        self.canvas.blit(figure.bbox)
@@ -0,0 +1,109 @@
+import math
+import os
+
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView, QLabel, QPushButton
+)
+from PyQt5.QtCore import Qt, QTimer
+from comms.metrics import REGISTRY, RateTracker
+
+DIAGNOSTICS_REFRESH_MS = 1000
+COLUMNS = ["Metric", "Labels", "Value", "Rate /s", "p50", "p95"]
+
+def _cell(value, scale=1.0, unit=""):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "—"
+    return f"{value * scale:.2f}{unit}"
+
+class DiagnosticsWindow(QWidget):
+    """
+    Live view of the pipeline metrics in comms/metrics.py: counters with
+    their rate, gauges, and p50/p95 of the latency histograms (in ms).
+    The same values are served to Prometheus on /metrics. "Start Profiling"
+    samples every thread's stack and tracks allocations until stopped, then
+    writes the profile files (see comms/profiler.py).
+    """
+
+    def __init__(self, metrics_server=None, profiler=None):
+        super().__init__()
+        self.setWindowTitle("Pipeline Diagnostics")
+        self.resize(760, 420)
+        self.rates = RateTracker()
+        self.profiler = profiler
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+
+        if metrics_server:
+            endpoint = f"Prometheus endpoint: http://{metrics_server.host}:{metrics_server.port}/metrics"
+        else:
+            endpoint = "Prometheus endpoint disabled"
+        self.profile_btn = QPushButton()
+        self.profile_btn.clicked.connect(self.toggle_profiling)
+        self.profile_btn.setEnabled(profiler is not None)
+        self.profile_label = QLabel("")
+        self.profile_label.setTextInteractionFlags(Qt.TextSelectableByMouse)  # Paths can be copied
+        self.update_profile_button()
+
+        profile_layout = QHBoxLayout()
+        profile_layout.addWidget(self.profile_btn)
+        profile_layout.addWidget(self.profile_label, 1)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.table)
+        layout.addWidget(QLabel(endpoint))
+        layout.addLayout(profile_layout)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start(DIAGNOSTICS_REFRESH_MS)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def update_profile_button(self):
+        running = self.profiler is not None and self.profiler.running
+        self.profile_btn.setText("Stop Profiling" if running else "Start Profiling")
+        if running:
+            self.profile_label.setText(f"Profiling since {self.profiler.started_at:%H:%M:%S}...")
+
+    def toggle_profiling(self):
+        if self.profiler.running:
+            profile_path, alloc_path = self.profiler.stop()
+            self.profile_label.setText(f"Saved {os.path.basename(profile_path)} and "
+                                       f"{os.path.basename(alloc_path)} in {os.path.dirname(profile_path)}")
+        else:
+            self.profiler.start()
+        self.update_profile_button()
+
+    def refresh(self):
+        rows = []
+        for name, labels, metric in REGISTRY.items():
+            label_text = ", ".join(f"{k}={v}" for k, v in labels.items())
+            key = (name, label_text)
+            if metric.kind == "counter":
+                rate = self.rates.rate(key, metric.value)
+                rows.append([name, label_text, f"{metric.value:.0f}", _cell(rate), "", ""])
+            elif metric.kind == "gauge":
+                rows.append([name, label_text, _cell(metric.value), "", "", ""])
+            else:
+                rate = self.rates.rate(key, metric.count)
+                rows.append([name, label_text, f"{metric.count} obs", _cell(rate),
+                             _cell(metric.percentile(50), 1000, " ms"), _cell(metric.percentile(95), 1000, " ms")])
+
+        self.table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, text in enumerate(row):
+                item = self.table.item(r, c)
+                if item is None:
+                    self.table.setItem(r, c, QTableWidgetItem(text))
+                elif item.text() != text:
+                    item.setText(text)
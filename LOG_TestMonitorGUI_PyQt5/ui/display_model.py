@@ -0,0 +1,100 @@
+from Database.mechanics import RIG, FX, FY, FZ, MX, MY, MZ, F_MAG
+from comms.metrics import REGISTRY
+
+LOAD_CELLS = ["LC1", "LC2", "LC3", "LC4", "LC5", "LC6"]
+LC_AXES = {lc: axis.upper() for lc, axis in zip(LOAD_CELLS, RIG.axes)}
+AXIAL_CELLS = RIG.cells("z")  # Contact is lost when the load drops below minus the preload
+
+# Net force label -> (mechanics column, arrow axis)
+NET_FORCES = {
+    "Fx": (FX, "X"),
+    "Fy": (FY, "Y"),
+    "Fz": (FZ, "Z"),
+}
+MOMENTS = {"X": MX, "Y": MY, "Z": MZ}
+
+ACCEL_AXES = ["X", "Y", "Z"]
+
+_UNSET = object()
+
+# Rate shown in Diagnostics: how many widgets the main window actually touches
+WIDGET_UPDATES = REGISTRY.counter("gui_widget_updates", "Main window widgets updated by the display model")
+
+def format_force(value, axis):
+    if axis == "X":
+        arrow = "→" if value >= 0 else "←"
+    elif axis == "Y":
+        arrow = "↓" if value >= 0 else "↑"
+    elif axis == "Z":
+        arrow = "▼" if value >= 0 else "▲"
+    return f"{value:+.3f} {arrow}"
+
+def format_readings(loads, accels, accel_on, load_offsets):
+    """Everything the main window shows for one reading, as display key -> value."""
+    values = {}
+    for i, lc in enumerate(LOAD_CELLS):
+        values[lc] = f"{lc}:\n {format_force(loads[i], LC_AXES[lc])}"
+        preload = load_offsets[i]
+        values[f"{lc}.contact_lost"] = i in AXIAL_CELLS and preload != 0.0 and loads[i] < -preload
+
+    values["accel_led"] = "green" if accel_on else "red"
+    if accel_on:
+        values["accel_title"] = "Acceleration (g)"
+        for i, axis in enumerate(ACCEL_AXES):
+            values[f"accel_{axis}"] = f"{axis}: {accels[i]:+.2f} g"
+    else:
+        values["accel_title"] = "Acceleration (Unavailable)"
+        for axis in ACCEL_AXES:
+            values[f"accel_{axis}"] = f"{axis}: ---"
+
+    mechanics = RIG.mechanics(loads)
+    for key, (column, axis) in NET_FORCES.items():
+        values[key] = f"{key}: {format_force(mechanics[column], axis)} lbf"
+    values["magnitude"] = f"Vector Magnitude: {mechanics[F_MAG]:.2f} lbf"
+    for axis, column in MOMENTS.items():
+        values[f"Moment_{axis}"] = f"Moment {axis}: {mechanics[column]:.2f} lbf-in"
+    return values
+
+def set_style_state(widget, name, value):
+    """
+    Switch a widget between styles declared once in a stylesheet through a
+    dynamic property selector, e.g. QLabel[contactLost="true"]. Re-polishing
+    one widget is much cheaper than parsing a new stylesheet for it.
+    """
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+
+class DisplayModel:
+    """
+    Remembers the value shown for every bound display key and only calls the
+    key's setter when a new value differs, so unchanged widgets are never
+    touched (no relayout, no repaint, no restyle).
+    """
+
+    def __init__(self):
+        self._setters = {}
+        self._shown = {}
+
+    def bind(self, key, setter):
+        self._setters[key] = setter
+
+    def invalidate(self, key=None):
+        """Forget what is shown, e.g. after a widget was changed outside the model."""
+        if key is None:
+            self._shown.clear()
+        else:
+            self._shown.pop(key, None)
+
+    def apply(self, values):
+        """Push changed values to their widgets, returns how many were updated."""
+        changed = 0
+        for key, value in values.items():
+            if self._shown.get(key, _UNSET) == value:
+                continue
+            self._setters[key](value)
+            self._shown[key] = value
+            changed += 1
+        WIDGET_UPDATES.inc(changed)
+        return changed
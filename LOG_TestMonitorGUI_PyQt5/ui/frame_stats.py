@@ -0,0 +1,102 @@
+import collections
+import math
+
+import numpy as np
+
+# Stages of one plot frame, timed in milliseconds
+STAGES = ("query", "transform", "draw")
+# Stages that run on the GUI thread. "query" is submit-to-callback latency on the
+# worker pool (queueing behind historical and export jobs included), not GUI work.
+GUI_STAGES = ("transform", "draw")
+
+
+class FrameStats:
+    """Rolling per-stage frame times (ms) over the last `window` frames."""
+
+    def __init__(self, window=120):
+        self.samples = {stage: collections.deque(maxlen=window) for stage in STAGES}
+
+    def add(self, stage, ms):
+        self.samples[stage].append(ms)
+
+    def count(self, stage):
+        return len(self.samples[stage])
+
+    def percentile(self, stage, q):
+        samples = self.samples[stage]
+        return float(np.percentile(samples, q)) if samples else 0.0
+
+    def frame_cost(self, q=95):
+        """GUI cost of one frame in ms, summing the GUI stage percentiles (conservative)."""
+        return sum(self.percentile(stage, q) for stage in GUI_STAGES)
+
+    def clear(self, stage=None):
+        for name in ([stage] if stage else STAGES):
+            self.samples[name].clear()
+
+    def summary(self):
+        lines = [
+            f"{stage:<9} p50 {self.percentile(stage, 50):6.1f}  p95 {self.percentile(stage, 95):6.1f} ms"
+            for stage in STAGES
+        ]
+        return "\n".join(lines)
+
+
+class RefreshScheduler:
+    """
+    Picks the live refresh interval and the line decimation from measured
+    frame times, so plotting stays within `cpu_budget` (fraction of one core).
+
+    Decimation is adjusted first: when drawing takes more than its share of
+    the budget the number of drawn points is halved, and doubled again once
+    drawing is cheap. Whatever the frame still costs on the GUI thread then
+    stretches the refresh interval beyond the base interval if needed. Query
+    latency is not budgeted, a slow query only delays its own tick (pending
+    live queries are coalesced by the QueryService).
+    """
+
+    MIN_SAMPLES = 10          # Frames measured before acting on the stats
+    INTERVAL_STEP_MS = 100    # Round intervals up to avoid jitter
+
+    def __init__(self, cpu_budget=0.25, max_interval_ms=5000, min_draw_points=500):
+        self.cpu_budget = cpu_budget
+        self.max_interval_ms = max_interval_ms
+        self.min_draw_points = min_draw_points
+        self.max_draw_points = None  # None = draw every point
+
+    def reset(self):
+        self.max_draw_points = None
+
+    def interval_ms(self, base_ms, stats):
+        if stats.count("draw") < self.MIN_SAMPLES:
+            return base_ms
+        needed = stats.frame_cost() / self.cpu_budget
+        interval = math.ceil(needed / self.INTERVAL_STEP_MS) * self.INTERVAL_STEP_MS
+        return int(min(max(base_ms, interval), max(base_ms, self.max_interval_ms)))
+
+    def update_decimation(self, stats, n_points, base_ms):
+        """Returns True when the decimation level changed."""
+        if stats.count("draw") < self.MIN_SAMPLES:
+            return False
+
+        draw_budget = base_ms * self.cpu_budget / 2  # Half the budget goes to drawing
+        draw_p95 = stats.percentile("draw", 95)
+        drawn = n_points if self.max_draw_points is None else min(n_points, self.max_draw_points)
+        previous = self.max_draw_points
+
+        if draw_p95 > draw_budget and drawn > self.min_draw_points:
+            self.max_draw_points = max(self.min_draw_points, drawn // 2)
+        elif self.max_draw_points is not None and draw_p95 < draw_budget / 3:
+            self.max_draw_points *= 2
+            if self.max_draw_points >= n_points:
+                self.max_draw_points = None
+
+        if self.max_draw_points != previous:
+            stats.clear("draw")  # Old draw times were measured at the old level
+            return True
+        return False
+
+    def stride(self, n_points):
+        if self.max_draw_points is None or n_points <= self.max_draw_points:
+            return 1
+        return math.ceil(n_points / self.max_draw_points)
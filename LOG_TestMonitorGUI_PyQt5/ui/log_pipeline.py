@@ -0,0 +1,136 @@
+import os
+import re
+import threading
+import time
+from queue import Queue, Empty, Full
+
+LOG_MAX_BYTES = 5 * 1024 * 1024   # Rotate sys_log.txt past this size
+LOG_BACKUPS = 3                   # sys_log.txt.1 .. sys_log.txt.3 are kept
+COALESCE_WINDOW_S = 10            # Repeats of a message within this window are counted, not shown
+
+class LogWriter:
+    """
+    Appends log lines to a file from a background thread.
+
+    write() only queues the line. The writer thread collects whatever is
+    queued (up to BATCH_SIZE lines or BATCH_TIMEOUT seconds) and appends it
+    with a single open/write, then rotates the file once it passes
+    `max_bytes`. If the queue is full, lines are dropped and counted rather
+    than blocking the caller.
+    """
+
+    BATCH_SIZE = 200
+    BATCH_TIMEOUT = 0.5  # seconds
+
+    def __init__(self, path, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.dropped = 0
+        self.queue = Queue(maxsize=10000)
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+
+    def write(self, line):
+        try:
+            self.queue.put_nowait(line)
+        except Full:
+            self.dropped += 1
+
+    def close(self, timeout=2.0):
+        """Write what is still queued and stop the thread."""
+        self.queue.put(None)
+        self._thread.join(timeout)
+
+    def _writer_loop(self):
+        batch = []
+        last_batch_time = time.time()
+        running = True
+
+        while running:
+            try:
+                line = self.queue.get(timeout=self.BATCH_TIMEOUT)
+                if line is None:
+                    running = False  # Clean shutdown, flush below
+                else:
+                    batch.append(line)
+            except Empty:
+                pass
+
+            if batch and (not running or len(batch) >= self.BATCH_SIZE
+                          or time.time() - last_batch_time > self.BATCH_TIMEOUT):
+                self._write_batch(batch)
+                batch.clear()
+                last_batch_time = time.time()
+
+    def _write_batch(self, batch):
+        if self.dropped:
+            batch.append(f"[LogWriter] {self.dropped} log lines dropped, queue was full")
+            self.dropped = 0
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(batch) + "\n")
+            if os.path.getsize(self.path) >= self.max_bytes:
+                self._rotate()
+        except OSError as e:
+            print(f"[LogWriter] ⚠️ Could not write {self.path}: {e}")
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{i}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+class MessageCoalescer:
+    """
+    Collapses repeated messages for the console. Messages that only differ in
+    their numbers ("Data loss: 12 samples missing at 1752...") share a
+    signature. The first one is shown, further ones within `window_s` are
+    only counted, and flush() turns the count into one summary line such as
+    "Data loss ×37 in last 10 s".
+    """
+
+    _NUMBER = re.compile(r"[-+]?\d+(\.\d+)?")
+
+    def __init__(self, window_s=COALESCE_WINDOW_S):
+        self.window_s = window_s
+        self._open = {}  # signature -> [window start, repeat count, latest message]
+        self._ended = []  # Summaries of windows closed by submit(), returned by the next flush()
+
+    def signature(self, message):
+        return self._NUMBER.sub("#", message)
+
+    def submit(self, message, now=None):
+        """Returns True when the message should be shown now."""
+        now = time.monotonic() if now is None else now
+        key = self.signature(message)
+        entry = self._open.get(key)
+        if entry is None or now - entry[0] >= self.window_s:
+            if entry is not None and entry[1]:
+                self._ended.append(self._summary(entry[1], entry[2]))
+            self._open[key] = [now, 0, message]
+            return True
+        entry[1] += 1
+        entry[2] = message
+        return False
+
+    def flush(self, now=None):
+        """Summary lines for the windows that have ended."""
+        now = time.monotonic() if now is None else now
+        summaries, self._ended = self._ended, []
+        for key, (start, count, latest) in list(self._open.items()):
+            if now - start < self.window_s:
+                continue
+            del self._open[key]
+            if count:
+                summaries.append(self._summary(count, latest))
+        return summaries
+
+    def _summary(self, count, latest):
+        head = latest.split(":")[0]
+        summary = f"{head} ×{count} in last {self.window_s:.0f} s"
+        if head != latest:
+            summary += f" (latest: {latest})"
+        return summary
@@ -2,29 +2,25 @@ from PyQt5.QtWidgets import (
     QMainWindow, QLabel, QPushButton, QLineEdit,
     QVBoxLayout, QHBoxLayout, QWidget, QGridLayout, 
     QFrame, QSizePolicy, QMessageBox, QCheckBox,
-    QComboBox, QTextEdit
+    QComboBox, QPlainTextEdit
 )
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QColor, QPalette
 from comms.teensy_socket import TeensySocketThread
 from comms.parser_emitter import ParserEmitter
+from comms.daemon_viewer import DaemonViewerThread
+from comms.metrics import start_metrics_server
+from comms.profiler import SamplingProfiler, profiler_from_env
 from PyQt5.QtCore import QTimer, QTime
-from ui.plotter import PlotWindow
-# from ui.moment_map import MomentMapWidget
-from Database.export_data import DataExportDialog as Data
+from ui.log_pipeline import LogWriter, MessageCoalescer
+from ui.display_model import DisplayModel, LOAD_CELLS, ACCEL_AXES, format_readings, set_style_state
 from ui.teensy_settings_dialog import TeensySettingsDialog
 import os
 import datetime
 import sys
 
-def format_force(value, axis):
-    if axis == "X":
-        arrow = "→" if value >= 0 else "←"
-    elif axis == "Y":
-        arrow = "↓" if value >= 0 else "↑"
-    elif axis == "Z":
-        arrow = "▼" if value >= 0 else "▲"
-    return f"{value:+.3f} {arrow}"
+DISPLAY_REFRESH_MS = 100  # Label refresh period, independent of how fast readings arrive
+CONSOLE_MAX_LINES = 500   # Oldest console lines are dropped past this
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -35,9 +31,15 @@ class MainWindow(QMainWindow):
         self.port = 5000
 
         self.plot_windows = []
-        self.export_data_window = Data()
+        self.moment_map = None
+        self.moment_map_feeder = None
+        self.export_data_window = None  # Built on first use, like the plot windows (matplotlib, pandas)
+        self.diagnostics_window = None
+        self.metrics_server = start_metrics_server()
+        self.profiler = profiler_from_env() or SamplingProfiler()  # Started from Diagnostics otherwise
 
         self.socket_thread = None
+        self.daemon_viewer = None
         self.signal_emitter = ParserEmitter()
         self.signal_emitter.new_data.connect(self.update_display)
         self.signal_emitter.update_sps.connect(self.update_sps_display)
@@ -70,6 +72,8 @@ class MainWindow(QMainWindow):
         frame.setLineWidth(3)
         frame.setLayout(grid)
         frame.setFixedSize(600, 180)
+        # Contact loss style, switched per label through the contactLost property
+        frame.setStyleSheet('QLabel[contactLost="true"] { color: red; border: 2px solid red; }')
 
         # Create the forces container widget
         forces_container = QWidget()
@@ -158,6 +162,8 @@ class MainWindow(QMainWindow):
         # self.ip_input = QLineEdit("10.130.91.42")
         self.connect_btn = QPushButton("Connect")
         self.connect_btn.clicked.connect(self.toggle_connection)
+        self.attach_btn = QPushButton("Attach to Daemon")
+        self.attach_btn.clicked.connect(self.toggle_daemon_viewer)
         self.status_led = QLabel()
         self.status_led.setFixedSize(20, 20)
         self.update_led("red")
@@ -186,6 +192,7 @@ class MainWindow(QMainWindow):
         conn_layout.addWidget(QLabel("IP:"))
         conn_layout.addWidget(self.ip_input)
         conn_layout.addWidget(self.connect_btn)
+        conn_layout.addWidget(self.attach_btn)
         conn_layout.addWidget(QLabel("Status:"))
         conn_layout.addWidget(self.status_led)
         # conn_layout.addWidget(self.load_offsets_checkbox)
@@ -209,6 +216,15 @@ class MainWindow(QMainWindow):
         self.plot_btn = QPushButton("Open Plotter")
         self.plot_btn.clicked.connect(self.show_plot_window)
 
+        self.spectrum_btn = QPushButton("Open Spectrum")
+        self.spectrum_btn.clicked.connect(self.show_spectrum_window)
+
+        self.moment_map_btn = QPushButton("Open Moment Map")
+        self.moment_map_btn.clicked.connect(self.show_moment_map)
+
+        self.diagnostics_btn = QPushButton("Diagnostics")
+        self.diagnostics_btn.clicked.connect(self.show_diagnostics_window)
+
         self.export_data_btn = QPushButton("Export Data")
         self.export_data_btn.clicked.connect(self.show_export_data_window)
 
@@ -226,9 +242,12 @@ class MainWindow(QMainWindow):
         zero_grid.addWidget(self.clear_zero_lc_btn, 0, 1)
         zero_grid.addWidget(self.zero_accel_btn, 0, 2)
         zero_grid.addWidget(self.clear_zero_accel_btn, 0, 3)
+        zero_grid.addWidget(self.spectrum_btn, 1, 0)
         zero_grid.addWidget(self.plot_btn, 1, 1)
         zero_grid.addWidget(self.export_data_btn, 1, 2)
         zero_grid.addWidget(self.teensy_settings_btn, 1, 3)
+        zero_grid.addWidget(self.moment_map_btn, 2, 0)
+        zero_grid.addWidget(self.diagnostics_btn, 2, 1)
 
 
         legend = QLabel("Arrows indicate direction of applied force. X: ←→ , Y: ↑↓ , Z: ▼ (down) ▲ (up)")
@@ -279,8 +298,9 @@ class MainWindow(QMainWindow):
         net_force_grid.addWidget(self.net_force_labels['Moment_Z'], 3, 2)
 
         # Console output
-        self.console_output = QTextEdit()
+        self.console_output = QPlainTextEdit()
         self.console_output.setReadOnly(True)
+        self.console_output.setMaximumBlockCount(CONSOLE_MAX_LINES)
         self.console_output.setStyleSheet("""
             background-color: #FFFFFF;
             color: #000000;
@@ -320,6 +340,36 @@ class MainWindow(QMainWindow):
         
         self.sys_log_path = os.path.join(base_dir, "..", "Database", "sys_log.txt")
 
+        # Every message goes to the log file from a background thread, repeats are coalesced on the console
+        self.log_writer = LogWriter(self.sys_log_path)
+        self.log_coalescer = MessageCoalescer()
+        self.log_flush_timer = QTimer(self)
+        self.log_flush_timer.timeout.connect(self.flush_coalesced_logs)
+        self.log_flush_timer.start(1000)
+
+        # Readings are stored as they arrive and shown by the display timer
+        self.latest_reading = None
+        self.display = DisplayModel()
+        self.bind_display()
+        self.display_timer = QTimer(self)
+        self.display_timer.timeout.connect(self.refresh_display)
+        self.display_timer.start(DISPLAY_REFRESH_MS)
+
+    def bind_display(self):
+        for lc in LOAD_CELLS:
+            label = self.labels[lc]
+            self.display.bind(lc, label.setText)
+            self.display.bind(f"{lc}.contact_lost",
+                              lambda lost, label=label: set_style_state(label, "contactLost", lost))
+        self.display.bind("accel_led", self.update_accel_led)
+        self.display.bind("accel_title", self.accel_title.setText)
+        for axis in ACCEL_AXES:
+            self.display.bind(f"accel_{axis}", self.accel_labels[axis].setText)
+            self.display.bind(f"Moment_{axis}", self.net_force_labels[f"Moment_{axis}"].setText)
+        for key in ("Fx", "Fy", "Fz"):
+            self.display.bind(key, self.net_force_labels[key].setText)
+        self.display.bind("magnitude", self.total_force_label.setText)
+
     def teensy_resend_settings(self):
         if self.socket_thread:
             settings = self.saved_teensy_settings
@@ -340,13 +390,20 @@ class MainWindow(QMainWindow):
             self.saved_teensy_settings = dlg.get_teensy_settings()
 
     def log_message(self, message):
-        # Update UI console output
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_entry = f"[{timestamp}] {message}"
-        self.console_output.append(log_entry)
+        self.log_writer.write(log_entry)
+
+        # Update UI console output, unless the same message was just shown
+        if self.log_coalescer.submit(message):
+            self.console_output.appendPlainText(log_entry)
 
-        with open(self.sys_log_path, "a") as f:
-            f.write(log_entry + "\n")
+    def flush_coalesced_logs(self):
+        summaries = self.log_coalescer.flush()
+        if summaries:
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            for summary in summaries:
+                self.console_output.appendPlainText(f"[{timestamp}] {summary}")
 
     def handle_disconnection(self, connected):
         if not connected:
@@ -354,12 +411,14 @@ class MainWindow(QMainWindow):
             self.connect_btn.setText("Connect")
             self.update_led("red")
             self.update_accel_led("red")
+            self.display.invalidate("accel_led")
             self.update_trigger_widget_states()
         else:
             self.log_message("🔗 Connected signal received.")
             self.connect_btn.setText("Disconnect")
             self.update_led("green")
             self.update_accel_led("green")
+            self.display.invalidate("accel_led")
             self.update_trigger_widget_states()
 
     def update_trigger_widget_states(self):
@@ -393,15 +452,44 @@ class MainWindow(QMainWindow):
             self.log_message("Trigger disabled")
 
     def show_plot_window(self):
+        from ui.plotter import PlotWindow
         plot_window = PlotWindow(self.signal_emitter)
         self.plot_windows.append(plot_window)
         plot_window.show()
 
+    def show_spectrum_window(self):
+        from ui.spectrum_window import SpectrumWindow
+        spectrum_window = SpectrumWindow()
+        self.plot_windows.append(spectrum_window)
+        spectrum_window.show()
+
+    def show_moment_map(self):
+        # One map, fed while visible; closing it only hides it
+        if self.moment_map is None:
+            from ui.moment_map import MomentMapWidget
+            from ui.moment_map_feeder import MomentMapFeeder
+            self.moment_map = MomentMapWidget()
+            self.moment_map_feeder = MomentMapFeeder(self.signal_emitter, self.moment_map)
+        self.moment_map.show()
+        self.moment_map.raise_()
+        self.moment_map.activateWindow()
+
     def show_export_data_window(self):
+        if self.export_data_window is None:
+            from Database.export_data import DataExportDialog
+            self.export_data_window = DataExportDialog()
         self.export_data_window.show()
         self.export_data_window.raise_()
         self.export_data_window.activateWindow()
 
+    def show_diagnostics_window(self):
+        if self.diagnostics_window is None:
+            from ui.diagnostics_window import DiagnosticsWindow
+            self.diagnostics_window = DiagnosticsWindow(self.metrics_server, self.profiler)
+        self.diagnostics_window.show()
+        self.diagnostics_window.raise_()
+        self.diagnostics_window.activateWindow()
+
     def zero_loads(self):
         if self.socket_thread:
             reply = QMessageBox.question(self, "Confirm Zero Loads",
@@ -452,9 +540,11 @@ class MainWindow(QMainWindow):
             self.connect_btn.setText("Connect")
             self.update_led("red")
             self.update_accel_led("red")
+            self.display.invalidate("accel_led")
             self.update_lc_sps_led("red")
             self.update_trigger_widget_states()
             self.load_offsets_checkbox.setEnabled(True)
+            self.attach_btn.setEnabled(True)
         else:
             ip = self.ip_input.text().strip()
             if not ip:
@@ -474,12 +564,33 @@ class MainWindow(QMainWindow):
             self.connect_btn.setText("Disconnect")
             self.update_led("green")
             self.load_offsets_checkbox.setEnabled(False)
+            self.attach_btn.setEnabled(False)
 
             # if self.load_offsets_checkbox.isChecked():
             self.socket_thread.load_last_offsets()
 
             self.update_trigger_settings()
 
+    def toggle_daemon_viewer(self):
+        # Viewer of a running daemon.py: its data is shown, the Teensy stays connected to the daemon
+        if self.daemon_viewer:
+            self.daemon_viewer.stop()
+            self.daemon_viewer = None
+            self.log_message("🔌 Detached from daemon.")
+            self.attach_btn.setText("Attach to Daemon")
+            self.connect_btn.setText("Connect")
+            self.connect_btn.setEnabled(True)
+            self.update_led("red")
+            self.update_accel_led("red")
+            self.display.invalidate("accel_led")
+            self.update_lc_sps_led("red")
+        else:
+            self.daemon_viewer = DaemonViewerThread(self.signal_emitter)
+            self.daemon_viewer.start()
+            self.attach_btn.setText("Detach from Daemon")
+            self.connect_btn.setEnabled(False)
+            self.update_led("yellow")
+
     def update_lc_sps_led(self, color):
         palette = self.lc_sps_led.palette()
         palette.setColor(QPalette.Window, QColor(color))
@@ -492,125 +603,20 @@ class MainWindow(QMainWindow):
         self.accel_led.setAutoFillBackground(True)
         self.accel_led.setPalette(palette)
 
-    def compute_moments_from_loads(self, loads):
-        """
-        Compute Mx, My, and Mz from raw load cell force readings.
-        Uses correct positions and force contributions based on physical layout.
-        Positive directions:
-            - Fx: right (LC6)
-            - Fy: down (LC2, LC4)
-            - Fz: down (LC1, LC3, LC5)
-            - Mx: about X (rotation in Y-Z plane)
-            - My: about Y (rotation in X-Z plane)
-            - Mz: about Z (rotation in X-Y plane)
-        """
-        mm_to_in = 1 / 25.4
-        positions = {
-            0: (-330 * mm_to_in, 181 * mm_to_in),  # LC1 (Fz)
-            2: (0,            -181 * mm_to_in),    # LC3 (Fz)
-            4: (330 * mm_to_in, 181 * mm_to_in),   # LC5 (Fz)
-            1: (-257 * mm_to_in, -187 * mm_to_in), # LC2 (Fy)
-            3: (257 * mm_to_in, -187 * mm_to_in),  # LC4 (Fy)
-        }
-
-        # Mx: from Z-forces at y-offsets
-        mx = (
-            loads[0] * positions[0][1] +  # F1 * y1
-            loads[2] * positions[2][1] +  # F3 * y3
-            loads[4] * positions[4][1]    # F5 * y5
-        )
-
-        # My: from Z-forces at x-offsets (negated)
-        my = -(
-            loads[0] * positions[0][0] +  # -F1 * x1
-            loads[2] * positions[2][0] +  # -F3 * x3 (0)
-            loads[4] * positions[4][0]    # -F5 * x5
-        )
-
-        # Mz: from Y-forces at x-offsets
-        mz = (
-            loads[1] * positions[1][0] +  # F2 * x2
-            loads[3] * positions[3][0]    # F4 * x4
-        )
-
-        return mx, my, mz
-
     def update_display(self, timestamp, loads, accels, accel_on, accel_status):
-        if self.socket_thread is None:
+        if self.socket_thread is None and self.daemon_viewer is None:
             return
-        
-        axis_map = {
-            "LC1": "Z", "LC2": "Y", "LC3": "Z",
-            "LC4": "Y", "LC5": "Z", "LC6": "X",
-        }
+        self.latest_reading = (loads, accels, accel_on)
 
-        for i, lc in enumerate(["LC1", "LC2", "LC3", "LC4", "LC5", "LC6"]):
-            axis = axis_map[lc]
-            force_val = loads[i]
-            label_text = f"{lc}:\n {format_force(force_val, axis)}"
-
-            # Contact loss detection for Z-axis cells with non-zero preload
-            if lc in ["LC1", "LC3", "LC5"]:
-                preload = self.socket_thread.load_offsets[i]
-                if preload != 0.0 and force_val < -preload:
-                    # Contact lost → highlight red
-                    self.labels[lc].setStyleSheet("color: red; border: 2px solid red;")
-                else:
-                    # Normal style
-                    self.labels[lc].setStyleSheet("color: black; border: none;")
-            else:
-                # Other load cells, no contact check
-                self.labels[lc].setStyleSheet("color: black; border: none;")
-
-            self.labels[lc].setText(label_text)
-
-        # for i, lc in enumerate(["LC1", "LC2", "LC3", "LC4", "LC5", "LC6"]):
-        #     axis = axis_map[lc]
-        #     force_val = loads[i]
-        #     self.labels[lc].setText(f"{lc}:\n {format_force(force_val, axis)}")
-
-        # Acceleration LED and values
-        accel_color = "green" if accel_on else "red"
-        if self.socket_thread:
-            self.update_accel_led(accel_color)
-
-        if accel_on:
-            self.accel_title.setText("Acceleration (g)")
-            for i, axis in enumerate(["X", "Y", "Z"]):
-                self.accel_labels[axis].setText(f"{axis}: {accels[i]:+.2f} g")
-        else:
-            self.accel_title.setText("Acceleration (Unavailable)")
-            for axis in ["X", "Y", "Z"]:
-                self.accel_labels[axis].setText(f"{axis}: ---")
-
-        # Force breakdown
-        force_map = {
-            "Fx": ([5], "X"),
-            "Fy": ([1, 3], "Y"),
-            "Fz": ([0, 2, 4], "Z")
-        }
-
-        fx_value = sum(loads[i] for i in force_map["Fx"][0])
-        fy_net = sum(loads[i] for i in force_map["Fy"][0])
-        fz_sum = sum(loads[i] for i in force_map["Fz"][0])
-
-        for label_key, (indices, axis_for_arrow) in force_map.items():
-            vals = [loads[i] for i in indices]
-            net_force = sum(vals)
-            self.net_force_labels[label_key].setText(
-                f"{label_key}: {format_force(net_force, axis_for_arrow)} lbf"
-            )
-
-        # Vector magnitude
-        import math
-        vector_magnitude = math.sqrt(fx_value**2 + fy_net**2 + fz_sum**2)
-        self.total_force_label.setText(f"Vector Magnitude: {vector_magnitude:.2f} lbf")
+    def refresh_display(self):
+        source = self.socket_thread or self.daemon_viewer
+        if self.latest_reading is None or source is None:
+            return
+        loads, accels, accel_on = self.latest_reading
+        self.latest_reading = None
 
-        # Compute moments from loads
-        moment_x, moment_y, moment_z = self.compute_moments_from_loads(loads)
-        self.net_force_labels['Moment_X'].setText(f"Moment X: {moment_x:.2f} lbf-in")
-        self.net_force_labels['Moment_Y'].setText(f"Moment Y: {moment_y:.2f} lbf-in")
-        self.net_force_labels['Moment_Z'].setText(f"Moment Z: {moment_z:.2f} lbf-in")
+        values = format_readings(loads, accels, accel_on, source.load_offsets)
+        self.display.apply(values)
 
     def update_sps_display(self, lc_sps, accel_sps, sys_stable):
         if sys_stable:
@@ -630,5 +636,19 @@ class MainWindow(QMainWindow):
         if self.socket_thread and self.socket_thread.isRunning():
             self.log_message("🛑 Window closed — stopping socket thread...")
             self.socket_thread.stop()
+        if self.daemon_viewer:
+            self.daemon_viewer.stop()
+        if self.moment_map_feeder:
+            self.moment_map_feeder.stop()
+            self.moment_map.close()
+        if self.diagnostics_window:
+            self.diagnostics_window.close()
+        if self.export_data_window:
+            self.export_data_window.cancel_export()  # Removes the partial files of a running export
+        if self.metrics_server:
+            self.metrics_server.stop()
+        if self.profiler.running:
+            self.profiler.stop()
+        self.log_writer.close()
         event.accept()
 
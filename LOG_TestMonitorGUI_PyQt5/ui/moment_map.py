@@ -1,12 +1,18 @@
 import numpy as np
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel
 from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, pyqtSignal
 from matplotlib.figure import Figure
 import matplotlib.gridspec as gridspec
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from ui.blit_manager import BlitManager
+from Database.mechanics import RIG, FX, FY, FZ, MX, MY, MZ, COP_X, COP_Y
+
+MAP_MARGIN_IN = 1.5  # Space shown around the outermost load cells
 
 class MomentMapWidget(QWidget):
+    visibility_changed = pyqtSignal(bool)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Live Moment Map")
@@ -26,6 +32,10 @@ class MomentMapWidget(QWidget):
         self.info_label.setMinimumHeight(30)
         layout.addWidget(self.info_label)
 
+        self.rate_label = QLabel("-- FPS")
+        self.rate_label.setAlignment(Qt.AlignRight)
+        layout.addWidget(self.rate_label)
+
         gs = gridspec.GridSpec(2, 2, figure=self.fig, height_ratios=[0.05, 1])
         self.axs = [
             self.fig.add_subplot(gs[1, 0]),
@@ -36,12 +46,16 @@ class MomentMapWidget(QWidget):
             self.fig.add_subplot(gs[0, 1])
         ]
 
-        self.X, self.Y = np.meshgrid(np.linspace(0, 21, 30), np.linspace(0, 12, 20))
+        # Map of the plate in rig coordinates (inches, origin at LC6)
+        (x_min, y_min), (x_max, y_max) = RIG.positions.min(axis=0), RIG.positions.max(axis=0)
+        self.extent = (x_min - MAP_MARGIN_IN, x_max + MAP_MARGIN_IN, y_min - MAP_MARGIN_IN, y_max + MAP_MARGIN_IN)
+        self.X, self.Y = np.meshgrid(np.linspace(*self.extent[:2], 30), np.linspace(*self.extent[2:], 20))
         self.Tau_x = np.zeros_like(self.X)
         self.Tau_y = np.zeros_like(self.X)
         self.Tau_z = np.zeros_like(self.X)
         self.U = np.zeros_like(self.X)
         self.V = np.zeros_like(self.Y)
+        self.basis = self._build_basis()
 
         for ax in self.axs:
             ax.set_xlabel("X")
@@ -51,18 +65,29 @@ class MomentMapWidget(QWidget):
         self.levels_xy = np.linspace(0, 10, 20)
         self.levels_z = np.linspace(-10, 10, 20)
 
-        self.im1 = self.axs[0].contourf(self.X, self.Y, np.zeros_like(self.X), levels=self.levels_xy, cmap='coolwarm')
-        self.im2 = self.axs[1].contourf(self.X, self.Y, np.zeros_like(self.X), levels=self.levels_z, cmap='coolwarm')
+        # Images and quivers are created once, updates only replace their data
+        self.im1 = self.axs[0].imshow(np.zeros_like(self.X), extent=self.extent, origin='lower',
+                                      cmap='coolwarm', interpolation='bilinear',
+                                      vmin=self.levels_xy[0], vmax=self.levels_xy[-1])
+        self.im2 = self.axs[1].imshow(np.zeros_like(self.X), extent=self.extent, origin='lower',
+                                      cmap='coolwarm', interpolation='bilinear',
+                                      vmin=self.levels_z[0], vmax=self.levels_z[-1])
 
         self.cbar1 = self.fig.colorbar(self.im1, cax=self.cbar_axes[0], orientation='horizontal')
         self.cbar2 = self.fig.colorbar(self.im2, cax=self.cbar_axes[1], orientation='horizontal')
         self._style_colorbars()
 
-        self.quiv1 = self.axs[0].quiver(self.X, self.Y, np.zeros_like(self.X), np.zeros_like(self.Y),
+        # Arrows on every other grid point, a full grid of arrows costs more to draw than the images
+        self.arrow_grid = (slice(None, None, 2), slice(None, None, 2))
+        q = self.arrow_grid
+        self.quiv1 = self.axs[0].quiver(self.X[q], self.Y[q], np.zeros_like(self.X[q]), np.zeros_like(self.Y[q]),
                                         scale=100, color='black', alpha=0.1)
-        self.quiv2 = self.axs[1].quiver(self.X, self.Y, np.zeros_like(self.X), np.zeros_like(self.Y),
+        self.quiv2 = self.axs[1].quiver(self.X[q], self.Y[q], np.zeros_like(self.X[q]), np.zeros_like(self.Y[q]),
                                         scale=50, color='k', alpha=0.1)
 
+        self.axs[0].set_title("Moment X/Y Magnitude + Direction")
+        self.axs[1].set_title("Moment Z + Lateral Forces")
+
         self._prev_max_tau_mag = 10
         self._prev_max_tau_z = 10
         self.counter1 = 0
@@ -75,6 +100,10 @@ class MomentMapWidget(QWidget):
         self._noise_report_interval = 50  # How often to print stats
 
 
+        # Only the images and quivers change per update, axes and colorbars are blitted from cache
+        self.blitter = BlitManager(self.canvas)
+        self.blitter.set_artists([self.im1, self.im2, self.quiv1, self.quiv2])
+
         self.canvas.draw()
 
     def _style_colorbars(self):
@@ -83,34 +112,33 @@ class MomentMapWidget(QWidget):
         self.cbar1.ax.locator_params(nbins=5)
         self.cbar2.ax.locator_params(nbins=5)
 
-    def update_forces(self, fx_vals, fy_vals, fz_vals):
-        pos_fx = np.array([[10, 6]])
-        pos_fy = np.array([[18, 3.5], [3, 3.5]])
-        pos_fz = np.array([[20.25, 11.25], [10.5, 0.75], [0.75, 11.25]])
-
-        self.Tau_x.fill(0)
-        self.Tau_y.fill(0)
-        self.Tau_z.fill(0)
-        self.U.fill(0)
-        self.V.fill(0)
-
-        fx_vals = np.nan_to_num(fx_vals)
-        fy_vals = np.nan_to_num(fy_vals)
-        fz_vals = np.nan_to_num(fz_vals)
+    def _build_basis(self):
+        """
+        Fields are linear in the loads: basis[i] holds the Tau_x, Tau_y, Tau_z,
+        U and V grids for a unit load on cell i of the rig, so an update is a
+        single tensordot of the six loads with this array.
+        """
+        basis = np.zeros((6, 5) + self.X.shape)
+        for i, (axis, (px, py)) in enumerate(zip(RIG.axes, RIG.positions)):
+            if axis == "x":
+                basis[i, 2] = -(self.Y - py)
+                basis[i, 3] = 1
+            elif axis == "y":
+                basis[i, 2] = self.X - px
+                basis[i, 4] = 1
+            else:
+                basis[i, 0] = self.Y - py
+                basis[i, 1] = -(self.X - px)
+        return basis
 
-        for (px, py), fz in zip(pos_fz, fz_vals):
-            dx = self.Y - py
-            dy = self.X - px
-            self.Tau_x += dx * fz
-            self.Tau_y -= dy * fz
+    def show_rate(self, fps, dropped):
+        self.rate_label.setText(f"{fps:.1f} FPS, {dropped} frames skipped")
 
-        for (px, py), fx in zip(pos_fx, fx_vals):
-            self.Tau_z += -(self.Y - py) * fx
-            self.U += fx
+    def update_loads(self, loads):
+        """Update from one LC1..LC6 reading, as emitted by ParserEmitter.new_data."""
+        forces = np.nan_to_num(np.asarray(loads, dtype=float))
 
-        for (px, py), fy in zip(pos_fy, fy_vals):
-            self.Tau_z += (self.X - px) * fy
-            self.V += fy
+        self.Tau_x, self.Tau_y, self.Tau_z, self.U, self.V = np.tensordot(forces, self.basis, axes=1)
 
         tau_mag = np.sqrt(self.Tau_x ** 2 + self.Tau_y ** 2)
         max_tau_mag = max(np.nanmax(tau_mag), 1e-6)
@@ -198,54 +226,32 @@ class MomentMapWidget(QWidget):
             else:
                 self._z_shrink_count = 0
 
-        self.im1.remove()
-        self.im2.remove()
-
-        self.im1 = self.axs[0].contourf(self.X, self.Y, tau_mag, levels=self.levels_xy, cmap='coolwarm')
-        self.im2 = self.axs[1].contourf(self.X, self.Y, self.Tau_z, levels=self.levels_z, cmap='coolwarm')
+        self.im1.set_data(tau_mag)
+        self.im2.set_data(self.Tau_z)
 
+        # The colorbars follow their image's limits, they are never rebuilt
         if levels_xy_changed:
             self.counter1 += 1
             print(f"[MomentMap] Levels for XY changed {self.counter1} times, updating.")
-            self.cbar_axes[0].cla()
-            self.cbar1 = self.fig.colorbar(self.im1, cax=self.cbar_axes[0], orientation='horizontal')
-            self._style_colorbars()
-        else:
-            self.cbar1.update_normal(self.im1)
+            self.im1.set_clim(self.levels_xy[0], self.levels_xy[-1])
+            self.blitter.invalidate()
 
         if levels_z_changed:
             self.counter2 += 1
             print(f"[MomentMap] Levels for Z changed {self.counter2} times, updating.")
-            self.cbar_axes[1].cla()
-            self.cbar2 = self.fig.colorbar(self.im2, cax=self.cbar_axes[1], orientation='horizontal')
-            self._style_colorbars()
-        else:
-            self.cbar2.update_normal(self.im2)
-
-        self.quiv1.remove()
-        self.quiv2.remove()
-        self.quiv1 = self.axs[0].quiver(self.X, self.Y, self.Tau_y, self.Tau_x, scale=100, color='black', alpha=0.1)
-        self.quiv2 = self.axs[1].quiver(self.X, self.Y, self.U, self.V, scale=50, color='k', alpha=0.1)
-
-        self.axs[0].set_title("Moment X/Y Magnitude + Direction")
-        self.axs[1].set_title("Moment Z + Lateral Forces")
-
-        self.canvas.draw_idle()
+            self.im2.set_clim(self.levels_z[0], self.levels_z[-1])
+            self.blitter.invalidate()
 
-        Fz_total = sum(fz_vals)
-        Fx_total = sum(fx_vals)
-        Fy_total = sum(fy_vals)
+        self.quiv1.set_UVC(self.Tau_y[self.arrow_grid], self.Tau_x[self.arrow_grid])
+        self.quiv2.set_UVC(self.U[self.arrow_grid], self.V[self.arrow_grid])
 
-        tau_x_total = sum((y - 6) * fz for (x, y), fz in zip(pos_fz, fz_vals))
-        tau_y_total = -sum((x - 10.5) * fz for (x, y), fz in zip(pos_fz, fz_vals))
-        tau_z_total = sum(
-            x * fy - y * fx
-            for (x, y), fx, fy in zip([*pos_fx, *pos_fy], fx_vals + [0], [0] + fy_vals)
-        )
+        self.blitter.update()
 
+        m = RIG.mechanics(forces)
+        cop = "---" if np.isnan(m[COP_X]) else f"({m[COP_X]:.2f}, {m[COP_Y]:.2f})"
         info = (
-            f"Fx: {Fx_total:.2f}  Fy: {Fy_total:.2f}  Fz: {Fz_total:.2f} | "
-            f"τx: {tau_x_total:.2f}  τy: {tau_y_total:.2f}  τz: {tau_z_total:.2f}"
+            f"Fx: {m[FX]:.2f}  Fy: {m[FY]:.2f}  Fz: {m[FZ]:.2f} | "
+            f"τx: {m[MX]:.2f}  τy: {m[MY]:.2f}  τz: {m[MZ]:.2f} | CoP: {cop}"
         )
         self.info_label.setText(info)
 
@@ -278,9 +284,13 @@ class MomentMapWidget(QWidget):
         #         print(f"[MomentMap] τz mean: {mean_z:.2f}, std: {std_z:.2f}, rel std: {rel_std_z:.2f}%")
 
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.visibility_changed.emit(True)
+
     def hideEvent(self, event):
-        print("[MomentMap] Window hidden — moment map updates paused.")
-        event.accept()
+        super().hideEvent(event)
+        self.visibility_changed.emit(False)
 
     def closeEvent(self, event):
         print("[MomentMap] Window closed — moment map updates stopped.")
@@ -0,0 +1,108 @@
+import time
+
+from PyQt5.QtCore import QObject, QTimer
+
+MAX_FPS = 20                # Upper bound on moment map renders per second
+FPS_REPORT_INTERVAL_S = 1.0
+
+class MomentMapFeeder(QObject):
+    """
+    Feeds ParserEmitter.new_data into a MomentMapWidget without ever queueing
+    renders behind each other.
+
+    Only the latest frame is kept: a frame arriving while a render is pending
+    or running replaces the previous one, which is counted as dropped. Renders
+    are scheduled on a single-shot timer, at most `max_fps` per second, so the
+    signal handler itself returns immediately. While the widget is hidden
+    frames are only stored, and the latest one is drawn when it is shown again.
+    """
+
+    def __init__(self, emitter, widget, max_fps=MAX_FPS):
+        super().__init__(widget)
+        self.emitter = emitter
+        self.widget = widget
+        self.min_interval_s = 1.0 / max_fps
+
+        self.latest_loads = None
+        self.in_flight = False
+        self.paused = not widget.isVisible()
+        self.last_render = 0.0
+
+        self.rendered = 0
+        self.dropped = 0
+        self.fps = 0.0
+        self._window_start = time.perf_counter()
+        self._window_rendered = 0
+        self._window_dropped = 0
+
+        self.render_timer = QTimer(self)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.timeout.connect(self.render)
+
+        self.emitter.new_data.connect(self.on_new_data)
+        self.widget.visibility_changed.connect(self.on_visibility_changed)
+
+    def on_new_data(self, timestamp, loads, accels, accel_on, accel_stale):
+        if self.latest_loads is not None and (self.in_flight or self.paused):
+            self.dropped += 1
+            self._window_dropped += 1
+        self.latest_loads = loads
+        if not self.paused:
+            self.schedule()
+
+    def schedule(self):
+        if self.in_flight or self.latest_loads is None:
+            return
+        self.in_flight = True
+        wait_s = self.min_interval_s - (time.perf_counter() - self.last_render)
+        self.render_timer.start(max(0, int(wait_s * 1000)))
+
+    def render(self):
+        loads, self.latest_loads = self.latest_loads, None
+        if loads is None or self.paused:
+            self.in_flight = False
+            return
+        try:
+            self.widget.update_loads(loads)
+        finally:
+            self.last_render = time.perf_counter()
+            self.in_flight = False
+        self.rendered += 1
+        self._window_rendered += 1
+        self.report_fps()
+
+        # A frame arrived during the render: draw it next, respecting the rate limit
+        if self.latest_loads is not None:
+            self.schedule()
+
+    def report_fps(self):
+        now = time.perf_counter()
+        elapsed = now - self._window_start
+        if elapsed < FPS_REPORT_INTERVAL_S:
+            return
+        self.fps = self._window_rendered / elapsed
+        self.widget.show_rate(self.fps, self._window_dropped)
+        self._window_start = now
+        self._window_rendered = 0
+        self._window_dropped = 0
+
+    def on_visibility_changed(self, visible):
+        self.paused = not visible
+        if self.paused:
+            self.render_timer.stop()
+            self.in_flight = False
+            print("[MomentMap] Window hidden — moment map updates paused.")
+        else:
+            self._window_start = time.perf_counter()
+            self._window_rendered = 0
+            self._window_dropped = 0
+            print("[MomentMap] Window shown — moment map updates resumed.")
+            self.schedule()
+
+    def stop(self):
+        self.render_timer.stop()
+        try:
+            self.emitter.new_data.disconnect(self.on_new_data)
+        except TypeError:
+            pass  # Already disconnected
+        print(f"[MomentMap] Feeder stopped — {self.rendered} frames rendered, {self.dropped} dropped.")
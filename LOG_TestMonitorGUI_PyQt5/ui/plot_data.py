@@ -0,0 +1,231 @@
+import numpy as np
+import matplotlib.dates as mdates
+import matplotlib.ticker as ticker
+
+from Database.averaging import EPOCH
+from Database.mechanics import RIG, WRENCH_COLUMNS
+
+# Raw load cells followed by the derived columns
+CHANNELS = ["F1", "F2", "F3", "F4", "F5", "F6"] + WRENCH_COLUMNS
+ACCEL_CHANNELS = ["ax", "ay", "az"]
+
+# Every series a plot can show, in PlotDataModel.columns() order
+SERIES = CHANNELS + ACCEL_CHANNELS
+
+# Plot selector entry -> (series labels, y axis label)
+PLOT_TYPES = {
+    "Fx/Fy/Fz vs Time": (["Fx", "Fy", "Fz"], "Force (lbf)"),
+    "Mx/My/Mz vs Time": (["Mx", "My", "Mz"], "Moment (lbf-in)"),
+    "All Load Cells (F1–F6) vs Time": ([f"F{i+1}" for i in range(6)], "Force (lbf)"),
+    "Axial Loads (Z: F1, F3, F5) vs Time": (["F1", "F3", "F5"], "Force (lbf)"),
+    "Lateral Loads (Y: F2, F4) vs Time": (["F2", "F4"], "Force (lbf)"),
+    "F6 (X) vs Time": (["F6"], "Force (lbf)"),
+    "Accelerometer (ax/ay/az) vs Time": (ACCEL_CHANNELS, "Acceleration (g)"),
+}
+ACCEL_Y_LABEL = "Acceleration (g)"
+
+# Offset between naive epoch seconds and matplotlib date numbers (days)
+_EPOCH_DATENUM = mdates.date2num(EPOCH)
+
+
+def format_msec(x, pos=None):
+    dt = mdates.num2date(x)
+    return dt.strftime("%H:%M:%S.") + f"{int(dt.microsecond/10000):02d}"
+
+
+def adds_accel_panel(plot_type, with_accel):
+    # Accelerometer plot types already show the accel axes
+    return with_accel and not any(label in ACCEL_CHANNELS for label in PLOT_TYPES[plot_type][0])
+
+
+def plot_labels(plot_type, with_accel=False):
+    """Series drawn for a plot type, with the accelerometer axes appended when requested."""
+    labels = list(PLOT_TYPES[plot_type][0])
+    return labels + ACCEL_CHANNELS if adds_accel_panel(plot_type, with_accel) else labels
+
+
+def needs_accel(plot_type, with_accel=False):
+    return any(label in ACCEL_CHANNELS for label in plot_labels(plot_type, with_accel))
+
+
+def build_plot_axes(figure, plot_type, mode_number, with_accel=False):
+    """
+    Lay out an empty figure for a PLOT_TYPES entry, shared by the plot window
+    and the batch renderer: one axis with every series (mode 1) or one subplot
+    per series on a shared time axis (mode 2). with_accel adds the
+    accelerometer axes below, on the same time axis.
+    Returns (axes, lines, axis_series) with empty lines in plot_labels()
+    order, axis_series listing the series indices drawn on each axis.
+    """
+    labels, y_label = PLOT_TYPES[plot_type]
+    accel_panel = adds_accel_panel(plot_type, with_accel)
+
+    if mode_number == 1:
+        if accel_panel:
+            ax, accel_ax = figure.subplots(nrows=2, sharex=True, gridspec_kw={"height_ratios": [3, 1]})
+            axes = [ax, accel_ax]
+        else:
+            ax = figure.add_subplot(111)
+            axes = [ax]
+        lines = [ax.plot([], [], label=label)[0] for label in labels]
+        axis_series = [list(range(len(labels)))]
+        ax.set_ylabel(y_label)
+        ax.legend(fontsize=7)
+    else:
+        rows = len(labels) + (1 if accel_panel else 0)
+        axes = figure.subplots(nrows=rows, sharex=True)
+        axes = list(axes) if rows > 1 else [axes]
+        lines = []
+        for i, label in enumerate(labels):
+            color = f"C{i}"  # Keep the single plot colours
+            lines.append(axes[i].plot([], [], label=label, color=color)[0])
+            axes[i].set_ylabel(label)
+            axes[i].legend(fontsize=7)
+        axis_series = [[i] for i in range(len(labels))]
+
+    if accel_panel:
+        # Accelerometer axes share one panel in both modes
+        accel_ax = axes[-1]
+        first = len(lines)
+        lines += [accel_ax.plot([], [], label=label, color=f"C{6 + i}")[0] for i, label in enumerate(ACCEL_CHANNELS)]
+        axis_series.append(list(range(first, first + len(ACCEL_CHANNELS))))
+        accel_ax.set_ylabel(ACCEL_Y_LABEL)
+        accel_ax.legend(fontsize=7)
+
+    for ax in axes:
+        ax.grid(True)
+        ax.tick_params(labelsize=8)
+        ax.xaxis_date()
+        ax.xaxis.set_major_formatter(ticker.FuncFormatter(format_msec))
+    axes[-1].set_xlabel("Time")
+    figure.autofmt_xdate()
+
+    return axes, lines, axis_series
+
+
+def epoch_to_datenum(seconds):
+    return np.asarray(seconds, dtype=float) / 86400.0 + _EPOCH_DATENUM
+
+
+def datenum_to_epoch(datenum):
+    return (datenum - _EPOCH_DATENUM) * 86400.0
+
+
+class PlotDataModel:
+    """
+    Column-oriented buffer of plot samples: times as naive epoch seconds, the
+    six load cells as an (N, 6) array and the accelerometer axes aligned to
+    the same times as an (N, 3) array (NaN when not loaded).
+
+    Live appends go into a preallocated array that is compacted in place when
+    it fills up, so the current window is always a contiguous view (no copies
+    per frame). Derived forces and moments are one matrix product of the loads
+    against the rig geometry (RIG.wrench) and are cached until the samples change.
+    """
+
+    def __init__(self, initial_capacity=1024):
+        self._times = np.empty(initial_capacity)
+        self._loads = np.empty((initial_capacity, 6))
+        self._accel = np.full((initial_capacity, 3), np.nan)
+        self._start = 0
+        self._end = 0
+        self._version = 0
+        self._cache_version = -1
+        self._columns = None
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def times(self):
+        return self._times[self._start:self._end]
+
+    @property
+    def loads(self):
+        return self._loads[self._start:self._end]
+
+    @property
+    def accel(self):
+        return self._accel[self._start:self._end]
+
+    def time_nums(self):
+        return epoch_to_datenum(self.times)
+
+    def latest_time(self):
+        return self._times[self._end - 1] if len(self) else None
+
+    def covers(self, t):
+        return len(self) > 0 and self.times[0] <= t <= self.times[-1]
+
+    def nearest_index(self, t):
+        """Index of the sample closest to epoch time t, by binary search on the sorted times."""
+        times = self.times
+        i = int(np.searchsorted(times, t))
+        if i == 0:
+            return 0
+        if i == len(times):
+            return len(times) - 1
+        return i if times[i] - t < t - times[i - 1] else i - 1
+
+    def clear(self):
+        self._start = self._end = 0
+        self._version += 1
+
+    def set_data(self, times, loads, accel=None):
+        times = np.asarray(times, dtype=float)
+        loads = np.asarray(loads, dtype=float).reshape(-1, 6)
+        capacity = max(2 * len(times), 1024)
+        self._times = np.empty(capacity)
+        self._loads = np.empty((capacity, 6))
+        self._accel = np.full((capacity, 3), np.nan)
+        self._times[:len(times)] = times
+        self._loads[:len(times)] = loads
+        if accel is not None:
+            self._accel[:len(times)] = np.asarray(accel, dtype=float).reshape(-1, 3)
+        self._start, self._end = 0, len(times)
+        self._version += 1
+
+    def append(self, t, loads, max_age=None, accel=None):
+        """Append one sample; with `max_age` (seconds) samples older than t - max_age are dropped."""
+        if self._end == len(self._times):
+            self._make_room()
+
+        self._times[self._end] = t
+        self._loads[self._end] = loads
+        self._accel[self._end] = np.nan if accel is None else accel
+        self._end += 1
+
+        if max_age is not None:
+            self._start += int(np.searchsorted(self.times, t - max_age))
+        self._version += 1
+
+    def _make_room(self):
+        n = len(self)
+        if n * 2 > len(self._times):
+            # Mostly full, grow
+            times = np.empty(len(self._times) * 2)
+            loads = np.empty((len(self._times) * 2, 6))
+            accel = np.full((len(self._times) * 2, 3), np.nan)
+            times[:n] = self.times
+            loads[:n] = self.loads
+            accel[:n] = self.accel
+            self._times, self._loads, self._accel = times, loads, accel
+        else:
+            # Trimmed window, slide it back to the front
+            self._times[:n] = self.times
+            self._loads[:n] = self.loads
+            self._accel[:n] = self.accel
+        self._start, self._end = 0, n
+
+    def columns(self):
+        """(N, 15) array of SERIES: F1..F6, Fx, Fy, Fz, Mx, My, Mz, then ax, ay, az."""
+        if self._cache_version != self._version:
+            loads = self.loads
+            self._columns = np.hstack([loads, RIG.wrench(loads), self.accel])
+            self._cache_version = self._version
+        return self._columns
+
+    def series(self, labels):
+        """List of 1-D arrays, one per label in SERIES."""
+        columns = self.columns()
+        return [columns[:, SERIES.index(label)] for label in labels]
@@ -13,29 +13,42 @@
 # x = 0                         x = 16
 # y = 0
 
-import collections
 import matplotlib.dates as mdates
 import datetime
+import numpy as np
 
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
     QCheckBox, QComboBox, QDateTimeEdit, QLineEdit, QDialog,
     QGridLayout
 )
-from PyQt5.QtCore import QDateTime, QTimer, QThread
+from PyQt5.QtCore import QDateTime, QTimer
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas, NavigationToolbar2QT as NavigationToolbar
-from ui.sql_worker import SqlWorker
+from ui.sql_worker import query_range, query_range_with_accel, query_last_bucket
+from ui.query_service import QueryService, LANE_LIVE, LANE_HISTORICAL
 from comms.parser_emitter import ParserEmitter
 from ui.edit_params_dialog import EditParamsDialog
+from ui.blit_manager import BlitManager
+from ui.frame_stats import FrameStats, RefreshScheduler
+from comms.metrics import REGISTRY
 from Database.db import get_connection
+from Database.averaging import (
+    BUCKET_OPTIONS, bucket_ms_from_text, datetime_to_epoch, epoch_to_datetime, choose_bucket_ms, is_finer
+)
+from ui.plot_data import (
+    PlotDataModel, PLOT_TYPES, build_plot_axes, datenum_to_epoch, epoch_to_datenum, format_msec,
+    needs_accel, plot_labels
+)
 
 import matplotlib.ticker as ticker
 import time
 
-def format_msec(x, pos=None):
-    dt = mdates.num2date(x)
-    return dt.strftime("%H:%M:%S.") + f"{int(dt.microsecond/10000):02d}"
+DETAIL_MAX_POINTS = 4000    # Rows fetched for the visible window when zoomed in
+DETAIL_DEBOUNCE_MS = 300    # Wait for the zoom/pan to settle before querying
+PLOT_CPU_BUDGET = 0.25      # Fraction of one core the live plot may spend per refresh interval
+
+PLOT_DRAW_SECONDS = REGISTRY.histogram("plot_draw_seconds", "Time to draw one live plot frame")
 
 class PlotWindow(QWidget):
     def __init__(self, emitter: ParserEmitter):
@@ -47,11 +60,36 @@ class PlotWindow(QWidget):
         self.trigger_emitter.trigger_started.connect(self.load_pretrigger_plot_data)
         self.appending_live_data = False
 
-        self.x_data = collections.deque()
-        self.y_data = [collections.deque() for _ in range(6)]
+        # Samples as NumPy columns; forces/moments are derived from it on demand
+        self.data = PlotDataModel()
+        self.data_has_accel = False
+
+        # Finer-resolution samples for the zoomed-in window of a historical plot
+        self.detail = PlotDataModel()
+        self.detail_lines = []
+        self.detail_request = None
+        self.overview_bucket_ms = 0
+        self._auto_scaling = False
+        self.detail_timer = QTimer()
+        self.detail_timer.setSingleShot(True)
+        self.detail_timer.setInterval(DETAIL_DEBOUNCE_MS)
+        self.detail_timer.timeout.connect(self.request_detail)
 
         self.canvas = FigureCanvas(Figure(figsize=(6, 10)))
         self.toolbar = NavigationToolbar(self.canvas, self)
+        self.blitter = BlitManager(self.canvas)
+        self.canvas.mpl_connect("motion_notify_event", self.on_plot_hover)
+        self.canvas.mpl_connect("axes_leave_event", self.hide_readout)
+        self.cursor_lines = []
+        self.readout = None
+        self.readout_key = None
+        self.stats_text = None
+
+        # Per-frame query/transform/draw timings drive the refresh interval and decimation
+        self.frame_stats = FrameStats()
+        self.scheduler = RefreshScheduler(cpu_budget=PLOT_CPU_BUDGET)
+        self.draw_stride = 1
+        self._query_sent = None
 
         self.ax = self.canvas.figure.add_subplot(111)
         self.axis_labels = ["Z", "Y", "Z", "Y", "Z", "X"]
@@ -68,29 +106,18 @@ class PlotWindow(QWidget):
         self.live_timer = QTimer()
         self.live_timer.setInterval(500)
         self.live_timer.timeout.connect(self.request_latest_live_point)
+        self.base_interval_ms = 500
+        self.catch_up_mode = False
         self.live_mode = True
         self.live_window_minutes = 1
-        self.max_live_points = self.live_window_minutes * 60 * 2 
 
-        self.worker_thread = QThread()
-        self.worker = SqlWorker()
-        self.worker.moveToThread(self.worker_thread)
-        self.worker.data_ready.connect(self.on_data_ready)
-        self.worker.single_point_ready.connect(self.on_live_point_ready)
-        self.worker.error.connect(self.on_error)
-        self.worker_thread.start()
+        # Queries run on the worker pool shared by all plot windows
+        self.queries = QueryService.instance()
 
         # --- New UI controls ---
         self.plot_data_selector = QComboBox()
-        self.plot_data_selector.addItems([
-            "Fx/Fy/Fz vs Time",
-            "Mx/My/Mz vs Time",
-            "All Load Cells (F1–F6) vs Time",
-            "Axial Loads (Z: F1, F3, F5) vs Time",
-            "Lateral Loads (Y: F2, F4) vs Time",
-            "F6 (X) vs Time"
-        ])
-        self.plot_data_selector.currentIndexChanged.connect(lambda _: self.refresh_plot())
+        self.plot_data_selector.addItems(list(PLOT_TYPES))
+        self.plot_data_selector.currentIndexChanged.connect(lambda _: self.on_plot_options_changed())
 
         self.plot_mode_selector = QComboBox()
         self.plot_mode_selector.addItems(["Single Plot", "Subplots"])
@@ -98,7 +125,7 @@ class PlotWindow(QWidget):
         self.plot_mode_selector.currentIndexChanged.connect(lambda _: self.refresh_plot())
 
         self.smoothing_selector = QComboBox()
-        self.smoothing_selector.addItems(["1 (Raw)", "4", "16", "32", "64"])
+        self.smoothing_selector.addItems(list(BUCKET_OPTIONS))
         self.smoothing_selector.setCurrentIndex(0)
         self.smoothing_selector.currentTextChanged.connect(self.update_parameters)
 
@@ -142,6 +169,18 @@ class PlotWindow(QWidget):
         self.start_btn = QPushButton("Start")
         self.start_btn.clicked.connect(self.toggle_live_plotting)
 
+        self.readout_checkbox = QCheckBox("Readout")
+        self.readout_checkbox.setChecked(True)
+        self.readout_checkbox.toggled.connect(lambda _: self.hide_readout())
+
+        self.accel_checkbox = QCheckBox("Accel")
+        self.accel_checkbox.setChecked(False)
+        self.accel_checkbox.toggled.connect(lambda _: self.on_plot_options_changed())
+
+        self.stats_checkbox = QCheckBox("Stats")
+        self.stats_checkbox.setChecked(False)
+        self.stats_checkbox.toggled.connect(self.toggle_stats_overlay)
+
         live_control_layout = QHBoxLayout()
         live_control_layout.addWidget(self.live_checkbox)
         live_control_layout.addWidget(self.start_live_from_past_checkbox)
@@ -154,6 +193,9 @@ class PlotWindow(QWidget):
         live_control_layout.addWidget(QLabel("Smooth:"))
         live_control_layout.addWidget(self.smoothing_selector)
         live_control_layout.addWidget(self.start_btn)
+        live_control_layout.addWidget(self.accel_checkbox)
+        live_control_layout.addWidget(self.readout_checkbox)
+        live_control_layout.addWidget(self.stats_checkbox)
         live_control_layout.addStretch()
 
         self.start_time_edit = QDateTimeEdit(QDateTime.currentDateTime().addSecs(-600))
@@ -165,7 +207,7 @@ class PlotWindow(QWidget):
         self.end_time_edit.setCalendarPopup(True)
 
         self.averaging_selector = QComboBox()
-        self.averaging_selector.addItems(["1 (64 Hz)", "4 (16 Hz)", "16 (4 Hz)", "32 (2 Hz)", "64 (1 Hz)"])
+        self.averaging_selector.addItems(list(BUCKET_OPTIONS))
 
         self.plot_button = QPushButton("Plot")
         self.plot_button.clicked.connect(self.plot_historical)
@@ -189,7 +231,6 @@ class PlotWindow(QWidget):
         self.setLayout(layout)
 
         self.toggle_live_mode(self.live_mode)
-        self.catch_up_mode = False
 
     def update_parameters(self):
         self.update_plot_timer_interval()
@@ -236,218 +277,278 @@ class PlotWindow(QWidget):
     def load_pretrigger_plot_data(self, trigger_time):
         print(f"🔄 Trigger received at {trigger_time} — loading pre-trigger data...")
         pre_time = trigger_time - datetime.timedelta(seconds=10)
-        avg_n = int(self.smoothing_selector.currentText().split()[0])
+        bucket_ms = bucket_ms_from_text(self.smoothing_selector.currentText())
 
         self.appending_live_data = False  # 🚫 Block appending until preload finishes
         self.waiting_for_pretrigger_plot = True
         time.sleep(0.2)  # Give UI a moment to update
-        self.worker.query_range(pre_time, trigger_time, avg_n)
+        self.queries.submit(LANE_LIVE, self.range_query(), (pre_time, trigger_time, bucket_ms),
+                            self.on_data_ready, self.on_error, owner=self)
 
-    def update_plot_timer_interval(self):
-        smoothing_n = int(self.smoothing_selector.currentText().split()[0])
+    def wants_accel(self):
+        return needs_accel(self.plot_data_selector.currentText(), self.accel_checkbox.isChecked())
 
-        if smoothing_n <= 32:
-            interval = 500
+    def range_query(self):
+        # Loads and accelerometer are read together only when the plot shows accel axes
+        return query_range_with_accel if self.wants_accel() else query_range
+
+    def on_plot_options_changed(self):
+        if self.wants_accel() and not self.data_has_accel and not self.live_timer.isActive() and len(self.data):
+            self.plot_historical()  # Loaded without accelerometer data, fetch it along with the loads
         else:
-            interval = 1000
+            self.refresh_plot()
+
+    def update_plot_timer_interval(self):
+        # One live point per bucket, but never poll faster than 2 Hz
+        bucket_ms = bucket_ms_from_text(self.smoothing_selector.currentText())
+        self.base_interval_ms = max(500, bucket_ms)
+        self.apply_refresh_interval()
+
+    def apply_refresh_interval(self):
+        # Base interval, slowed down while catching up and stretched when frames cost too much
+        base_ms = max(self.base_interval_ms, 1000) if self.catch_up_mode else self.base_interval_ms
+        interval = self.scheduler.interval_ms(base_ms, self.frame_stats)
+        if interval != self.live_timer.interval():
+            self.live_timer.setInterval(interval)
+
+    def adapt_to_frame_times(self):
+        if self.scheduler.update_decimation(self.frame_stats, len(self.data), self.base_interval_ms):
+            print(f"[PlotWindow] Drawing at most {self.scheduler.max_draw_points or 'all'} points per line")
+        if self.live_timer.isActive():
+            self.apply_refresh_interval()
 
-        self.live_timer.setInterval(interval)
+    def toggle_stats_overlay(self, checked):
+        if self.stats_text is not None:
+            self.stats_text.set_visible(checked)
+            self.update_stats_overlay()
+            self.blitter.update()
 
-    def rebuild_plot_layout(self, plot_data, mode_number):
+    def update_stats_overlay(self):
+        if self.stats_text is None or not self.stats_text.get_visible():
+            return
+        decimation = f"1/{self.draw_stride}" if self.draw_stride > 1 else "off"
+        self.stats_text.set_text(
+            f"{self.frame_stats.summary()}\n"
+            f"interval {self.live_timer.interval()} ms  decimation {decimation}  "
+            f"full draws {self.blitter.full_draws}"
+        )
+
+    def rebuild_plot_layout(self, plot_data, mode_number, with_accel=False):
         self.canvas.figure.clf()
-        y_label = "Force (lbf)"
-
-        if plot_data == "Fx/Fy/Fz vs Time":
-            labels = ["Fx", "Fy", "Fz"]
-        elif plot_data == "Mx/My/Mz vs Time":
-            labels = ["Mx", "My", "Mz"]
-            y_label = "Moment (lbf-in)"
-        elif plot_data == "All Load Cells (F1–F6) vs Time":
-            labels = [f"F{i+1}" for i in range(6)]
-        elif plot_data == "Axial Loads (Z: F1, F3, F5) vs Time":
-            labels = ["F1", "F3", "F5"]
-        elif plot_data == "Lateral Loads (Y: F2, F4) vs Time":
-            labels = ["F2", "F4"]
-        elif plot_data == "F6 (X) vs Time":
-            labels = ["F6"]
-        else:
-            labels = []
-
-        if mode_number == 1:
-            self.ax = self.canvas.figure.add_subplot(111)
-            self.axes = [self.ax]
-            self.individual_lines = [
-                self.ax.plot([], [], label=label)[0] for label in labels
-            ]
-            self.ax.set_xlabel("Time")
-            self.ax.set_ylabel(y_label)
-            self.ax.legend(fontsize=7)
-            self.ax.grid(True)
-        else:
-            self.axes = self.canvas.figure.subplots(nrows=len(labels), sharex=True)
-            if len(labels) == 1:
-                self.axes = [self.axes]
-            self.ax = None
-            self.individual_lines = []
+        self.axes, self.individual_lines, self.axis_series = build_plot_axes(
+            self.canvas.figure, plot_data, mode_number, with_accel
+        )
+        self.ax = self.axes[0] if mode_number == 1 else None
+
+        # Detail lines overlay the overview with the same colours, kept out of the legend
+        self.detail_lines = [
+            line.axes.plot([], [], color=line.get_color(), linewidth=0.8, label="_detail")[0]
+            for line in self.individual_lines
+        ]
+        self.axes[0].callbacks.connect("xlim_changed", self.on_xlim_changed)
 
+        # Hover crosshair (one per axis, x in data / y in axes coordinates) and readout box
+        self.cursor_lines = [
+            ax.plot([], [], color="black", linewidth=0.6, linestyle="--",
+                    transform=ax.get_xaxis_transform(), label="_cursor")[0]
+            for ax in self.axes
+        ]
+        self.readout = self.canvas.figure.text(
+            0, 0, "", fontsize=7, family="monospace", va="top", multialignment="left", visible=False,
+            bbox=dict(boxstyle="round", facecolor="lightyellow", alpha=0.9)
+        )
+        self.readout_key = None
+
+        # Frame time overlay in the top right corner
+        self.stats_text = self.canvas.figure.text(
+            0.99, 0.99, "", fontsize=7, family="monospace", ha="right", va="top", multialignment="left",
+            visible=self.stats_checkbox.isChecked(),
+            bbox=dict(boxstyle="round", facecolor="white", alpha=0.8)
+        )
+
+        # Lines are redrawn by blitting, axes/grid/legend are only drawn on layout changes
+        self.blitter.set_artists(
+            self.individual_lines + self.detail_lines + self.cursor_lines + [self.readout, self.stats_text]
+        )
+        self.current_mode = (plot_data, mode_number, with_accel)
         self.canvas.draw()
         
     def check_lag_and_throttle(self):
-        latest_time = self.x_data[-1]
-        now = datetime.datetime.now()
-        lag_sec = (now - latest_time).total_seconds()
+        latest_time = self.data.latest_time()
+        now = datetime_to_epoch(datetime.datetime.now())
+        lag_sec = now - latest_time
 
         if lag_sec > 1.5:
             if not self.catch_up_mode:
                 print(f"⚠️ Lag: {lag_sec:.2f}s behind. Slowing refresh.")
                 self.catch_up_mode = True
-                self.live_timer.setInterval(1000)
+                self.apply_refresh_interval()
         else:
             if self.catch_up_mode:
                 print("✅ Caught up. Restoring normal refresh.")
                 self.catch_up_mode = False
-                self.update_plot_timer_interval()
-
-    def compute_moments(self):
-        """
-        Compute Mx, My, and Mz using corrected load cell positions and forces.
-        Positive directions:
-            - Fx: right (LC6)
-            - Fy: down (LC2, LC4)
-            - Fz: down (LC1, LC3, LC5)
-            - Mx: rotation about X (Y-Z plane)
-            - My: rotation about Y (X-Z plane)
-            - Mz: rotation about Z (X-Y plane)
-        """
-
-        # Positions in mm from origin at LC6 (converted to inches for moment units in lbf-in)
-        mm_to_in = 1 / 25.4
-        positions = {
-            0: (-330 * mm_to_in, 181 * mm_to_in),  # LC1 (Fz) 
-            2: (0,            -181 * mm_to_in),    # LC3 (Fz)
-            4: (330 * mm_to_in, 181 * mm_to_in),   # LC5 (Fz)
-            1: (-257 * mm_to_in, -187 * mm_to_in), # LC2 (Fy)
-            3: (257 * mm_to_in, -187 * mm_to_in),  # LC4 (Fy)
-        }
-
-        n = len(self.x_data)
-
-        # Forces for LC1, LC3, LC5 (Z-direction): compute Mx and My
-        moment_x = [
-            self.y_data[0][j] * positions[0][1] +  # F1 * y1
-            self.y_data[2][j] * positions[2][1] +  # F3 * y3
-            self.y_data[4][j] * positions[4][1]    # F5 * y5
-            for j in range(n)
-        ]
-
-        moment_y = [
-            -self.y_data[0][j] * positions[0][0] -  # -F1 * x1
-            self.y_data[2][j] * positions[2][0] -  # -F3 * x3 (which is 0)
-            self.y_data[4][j] * positions[4][0]     # -F5 * x5
-            for j in range(n)
-        ]
-
-        # Forces for LC2 and LC4 (Y-direction): compute Mz
-        moment_z = [
-            self.y_data[1][j] * positions[1][0] +  # F2 * x2
-            self.y_data[3][j] * positions[3][0]    # F4 * x4
-            for j in range(n)
-        ]
-
-        return moment_x, moment_y, moment_z
-
-    def prepare_force_data(self):
-        plot_data = self.plot_data_selector.currentText()
-
-        if plot_data == "Fx/Fy/Fz vs Time":
-            data_indices = {"Fx": [5], "Fy": [1, 3], "Fz": [0, 2, 4]}
-        elif plot_data == "All Load Cells (F1–F6) vs Time":
-            data_indices = {f"F{i+1}": [i] for i in range(6)}
-        elif plot_data == "Axial Loads (Z: F1, F3, F5) vs Time":
-            data_indices = {"F1": [0], "F3": [2], "F5": [4]}
-        elif plot_data == "Lateral Loads (Y: F2, F4) vs Time":
-            data_indices = {"F2": [1], "F4": [3]}
-        elif plot_data == "F6 (X) vs Time":
-            data_indices = {"F6": [5]}
-        else:
-            print("⚠️ Unknown plot type")
-            return [], []
-
-        labels = list(data_indices.keys())
-        data_series = [
-            [sum(self.y_data[k][j] for k in data_indices[label]) for j in range(len(self.x_data))]
-            for label in labels
-        ]
+                self.apply_refresh_interval()
 
-        return data_series, labels
-    
     def update_lines(self, time_data, data_series, labels):
-        if len(self.individual_lines) != len(labels):
-            print("⚠️ Mismatch detected. Removing old lines and rebuilding.")
-            for line in self.individual_lines:
-                line.remove()
-            self.individual_lines.clear()
-            self.ax.set_prop_cycle(None) # Reset color cycle
-
-            self.individual_lines = [
-                self.ax.plot([], [], label=label)[0] for label in labels
-            ]
-
+        # Lines and legend are built by rebuild_plot_layout, so the labels always match here.
+        # Long series are decimated to the number of points the scheduler can afford to draw.
+        self.draw_stride = self.scheduler.stride(len(time_data))
+        step = slice(None, None, self.draw_stride)
         for i, data in enumerate(data_series):
-            self.individual_lines[i].set_data(time_data, data)
-            self.individual_lines[i].set_label(labels[i])
+            self.individual_lines[i].set_data(time_data[step], data[step])
 
-    def update_subplots(self, time_data, data_series, labels):
-        for i, data in enumerate(data_series):
-            ax = self.axes[i]
-            ax.clear()
-            ax.plot(time_data, data, label=labels[i])
-            ax.set_ylabel(labels[i])
-            ax.legend(fontsize=7)
-            ax.grid(True)
-
-    def handle_axes_formatting(self, labels, mode, y_label):
-        if mode == "Single Plot":
-            self.ax.relim()
-            self.ax.autoscale_view()
-            self.ax.legend([line.get_label() for line in self.individual_lines[:len(labels)]])
-            self.ax.set_xlabel("Time")
-            self.ax.set_ylabel(y_label)
-            self.ax.grid(True)
-            self.ax.xaxis.set_major_formatter(ticker.FuncFormatter(format_msec))
-        else:
-            self.axes[-1].set_xlabel("Time")
-            self.axes[-1].xaxis.set_major_formatter(ticker.FuncFormatter(format_msec))
+    def rescale_if_needed(self, ax, time_nums, data_series):
+        """
+        Change the axis limits only when the data leaves them (or, for a
+        historical plot, fills less than half of them). Returns True when the
+        limits changed and the cached background has to be redrawn.
+        """
+        x0, x1 = time_nums[0], time_nums[-1]
+        values = np.asarray(data_series, dtype=float)
+        if not np.isfinite(values).any():
+            return False
+        y0, y1 = np.nanmin(values), np.nanmax(values)
 
-        self.canvas.figure.autofmt_xdate()
+        (cx0, cx1), (cy0, cy1) = ax.get_xlim(), ax.get_ylim()
+        changed = False
+
+        if self.live_timer.isActive():
+            # Scroll in steps of 10% of the live window instead of every tick
+            window = self.live_window_minutes * 60 / 86400
+            if x0 < cx0 or x1 > cx1:
+                ax.set_xlim(min(x0, x1 - window), x1 + 0.1 * window)
+                changed = True
+        elif x0 < cx0 or x1 > cx1 or (x1 - x0) < 0.5 * (cx1 - cx0):
+            pad = 0.5 / 86400 if x1 == x0 else 0
+            ax.set_xlim(x0 - pad, x1 + pad)
+            changed = True
+
+        if y0 < cy0 or y1 > cy1 or (y1 - y0) < 0.5 * (cy1 - cy0):
+            pad = max((y1 - y0) * 0.1, 0.5)
+            ax.set_ylim(y0 - pad, y1 + pad)
+            changed = True
+
+        return changed
 
     def refresh_plot(self):
-        if not self.x_data:
+        if not len(self.data):
             return
 
-        y_label = "Force (lbf)"
-        time_data = list(self.x_data)
-
         self.check_lag_and_throttle()
 
         plot_data = self.plot_data_selector.currentText()
         plot_mode = self.plot_mode_selector.currentText()
+        mode_number = 1 if plot_mode == "Single Plot" else 2
+        with_accel = self.accel_checkbox.isChecked()
+
+        # Full redraw only when the plot type, mode or accel panel changes
+        if getattr(self, 'current_mode', None) != (plot_data, mode_number, with_accel):
+            self.rebuild_plot_layout(plot_data, mode_number, with_accel)
+
+        frame_start = time.perf_counter()
+        labels = plot_labels(plot_data, with_accel)
+        data_series = self.data.series(labels)
+        time_nums = self.data.time_nums()
+        transform_done = time.perf_counter()
+
+        # Same path for both modes: lines are updated in place, each axis only
+        # rescales when its own series leave its limits (x is shared in subplots)
+        self.update_lines(time_nums, data_series, labels)
+
+        self.update_detail_lines()
+
+        rescaled = False
+        self._auto_scaling = True  # Not a user zoom, don't fetch detail for it
+        try:
+            for ax, indices in zip(self.axes, self.axis_series):
+                if self.rescale_if_needed(ax, time_nums, [data_series[i] for i in indices]):
+                    rescaled = True
+        finally:
+            self._auto_scaling = False
+
+        if rescaled:
+            self.blitter.invalidate()
+        self.update_stats_overlay()
+        self.blitter.update()
+
+        frame_end = time.perf_counter()
+        self.frame_stats.add("transform", (transform_done - frame_start) * 1000)
+        self.frame_stats.add("draw", (frame_end - transform_done) * 1000)
+        PLOT_DRAW_SECONDS.observe(frame_end - transform_done)
+        self.adapt_to_frame_times()
+
+    def on_xlim_changed(self, ax):
+        self.blitter.invalidate()  # Ticks moved, the cached background is stale
+
+        # Toolbar zoom/pan on a historical plot: refetch once the view settles
+        if self._auto_scaling or self.live_timer.isActive() or not len(self.data):
+            return
+        self.detail_timer.start()
 
-        if plot_data == "Mx/My/Mz vs Time":
-            moment_x, moment_y, moment_z = self.compute_moments()
-            data_series = [moment_x, moment_y, moment_z]
-            labels = ["Mx", "My", "Mz"]
-            y_label = "Moment (lbf-in)"
-        else:
-            data_series, labels = self.prepare_force_data()
+    def request_detail(self):
+        """
+        Fetch the visible window at the finest resolution that stays under
+        DETAIL_MAX_POINTS: raw rows for short spans, SQL time buckets otherwise.
+        The overview stays on screen until the detail arrives.
+        """
+        if self.live_timer.isActive() or not len(self.data):
+            return
 
-        if plot_mode == "Single Plot":
-            self.update_lines(time_data, data_series, labels)
-        else:
-            self.update_subplots(time_data, data_series, labels)
+        x0, x1 = self.axes[0].get_xlim()
+        t0, t1 = datenum_to_epoch(x0), datenum_to_epoch(x1)
+        bucket_ms = choose_bucket_ms((t1 - t0) * 1000, DETAIL_MAX_POINTS)
 
-        self.handle_axes_formatting(labels, plot_mode, y_label)
-        self.canvas.draw()
+        if not is_finer(bucket_ms, self.overview_bucket_ms):
+            # Zoomed back out, the overview is detailed enough
+            self.clear_detail()
+            self.blitter.update()
+            return
+
+        # Already loaded with a margin around the view, nothing to fetch
+        if self.detail_request:
+            loaded_t0, loaded_t1, loaded_bucket = self.detail_request
+            if loaded_bucket == bucket_ms and loaded_t0 <= t0 and t1 <= loaded_t1:
+                return
+
+        # Fetch a margin on both sides so small pans don't need another query
+        margin = (t1 - t0) * 0.25
+        request = (t0 - margin, t1 + margin, bucket_ms)
+        self.detail_request = request
+        self.queries.submit(
+            LANE_HISTORICAL, self.range_query(),
+            (epoch_to_datetime(request[0]), epoch_to_datetime(request[1]), bucket_ms),
+            lambda result: self.on_detail_ready(request, result), self.on_error, owner=self
+        )
+
+    def on_detail_ready(self, request, result):
+        if request != self.detail_request:
+            return  # The view moved on since this was requested
+
+        times, loads, *accel = result
+        self.detail.set_data(times, loads, accel[0] if accel else None)
+        print(f"[PlotWindow] Loaded {len(times)} detail points ({request[2]} ms buckets)")
+        self.update_detail_lines()
+        self.blitter.update()
+
+    def update_detail_lines(self):
+        has_detail = len(self.detail) > 0
+        for line in self.individual_lines:
+            line.set_alpha(0.3 if has_detail else None)
+        if not has_detail:
+            for line in self.detail_lines:
+                line.set_data([], [])
+            return
+
+        labels = plot_labels(self.plot_data_selector.currentText(), self.accel_checkbox.isChecked())
+        time_nums = self.detail.time_nums()
+        for line, data in zip(self.detail_lines, self.detail.series(labels)):
+            line.set_data(time_nums, data)
+
+    def clear_detail(self):
+        self.detail_timer.stop()
+        self.detail_request = None
+        self.detail.clear()
+        self.update_detail_lines()
 
     # def refresh_plot(self):
     #     plot_data = self.plot_data_selector.currentText()
@@ -558,20 +659,22 @@ class PlotWindow(QWidget):
 
     def plot_historical(self):
         # Clear plot buffers
-        self.x_data.clear()
-        self.y_data = [collections.deque() for _ in range(6)]
+        self.data.clear()
+        self.clear_detail()
 
         # Reset current mode to force layout rebuild
         self.current_mode = None
         plot_data = self.plot_data_selector.currentText()
         mode_number = 1 if self.plot_mode_selector.currentText() == "Single Plot" else 2
-        self.rebuild_plot_layout(plot_data, mode_number)
+        self.rebuild_plot_layout(plot_data, mode_number, self.accel_checkbox.isChecked())
 
         start_dt = self.start_time_edit.dateTime().toPyDateTime().replace(microsecond=0)
         end_dt = self.end_time_edit.dateTime().toPyDateTime().replace(microsecond=0)
-        avg_n = int(self.averaging_selector.currentText().split()[0])
+        bucket_ms = bucket_ms_from_text(self.averaging_selector.currentText())
+        self.overview_bucket_ms = bucket_ms
         self.appending_live_data = False  # Disable appending for historical plots
-        self.worker.query_range(start_dt, end_dt, avg_n)
+        self.queries.submit(LANE_HISTORICAL, self.range_query(), (start_dt, end_dt, bucket_ms),
+                            self.on_data_ready, self.on_error, owner=self)
 
     def toggle_live_mode(self, checked):
         self.live_mode = checked
@@ -609,14 +712,6 @@ class PlotWindow(QWidget):
         else:
             self.live_window_minutes = 1  # Default fallback
 
-        avg_n = int(self.smoothing_selector.currentText().split()[0])
-        if avg_n <= 16:
-            self.max_live_points = self.live_window_minutes * 60 * 4  # 4 Hz
-        elif avg_n <= 32:
-            self.max_live_points = self.live_window_minutes * 60 * 2
-        else:
-            self.max_live_points = self.live_window_minutes * 60 * 1
-
     def toggle_live_plotting(self):
         self.update_parameters()
 
@@ -634,14 +729,16 @@ class PlotWindow(QWidget):
             return
         
         # Clear plot buffers
-        self.x_data.clear()
-        self.y_data = [collections.deque() for _ in range(6)]
+        self.data.clear()
+        self.clear_detail()
+        self.frame_stats.clear()
+        self.scheduler.reset()
 
         # Reset current mode to force layout rebuild
         self.current_mode = None
         plot_data = self.plot_data_selector.currentText()
         mode_number = 1 if self.plot_mode_selector.currentText() == "Single Plot" else 2
-        self.rebuild_plot_layout(plot_data, mode_number)
+        self.rebuild_plot_layout(plot_data, mode_number, self.accel_checkbox.isChecked())
 
         self.appending_live_data = False  # Default to reset mode
 
@@ -649,13 +746,12 @@ class PlotWindow(QWidget):
             # Start from past — fetch history first
             start_dt = self.start_time_edit.dateTime().toPyDateTime()
             end_dt = datetime.datetime.now()
-            avg_n = int(self.smoothing_selector.currentText().split()[0])
+            bucket_ms = bucket_ms_from_text(self.smoothing_selector.currentText())
             self.appending_live_data = True  # Enable appending mode
-            self.worker.query_range(start_dt, end_dt, avg_n)
+            self.queries.submit(LANE_HISTORICAL, self.range_query(), (start_dt, end_dt, bucket_ms),
+                                self.on_data_ready, self.on_error, owner=self)
         else:
             # Start fresh live mode
-            # self.x_data.clear()
-            self.y_data = [collections.deque() for _ in range(6)]
             self.appending_live_data = True  # Enable appending mode for live updates
 
             # ⚠️ Do not preload any data — pretrigger data will be fetched when trigger fires
@@ -675,24 +771,28 @@ class PlotWindow(QWidget):
             print("⏳ Waiting for pre-trigger data, skipping live point request")
             return
 
-        avg_n = int(self.smoothing_selector.currentText().split()[0])
-        self.worker.query_last_n_samples(avg_n)
+        bucket_ms = bucket_ms_from_text(self.smoothing_selector.currentText())
+        self._query_sent = time.perf_counter()
+        self.queries.submit(LANE_LIVE, query_last_bucket, (bucket_ms, self.wants_accel()),
+                            self.on_live_point_ready, self.on_error, owner=self)
+
+    def on_live_point_ready(self, point):
+        if self._query_sent is not None:
+            self.frame_stats.add("query", (time.perf_counter() - self._query_sent) * 1000)
+            self._query_sent = None
+
+        if point is None:
+            return  # No data yet
+        t, values, accel = point
 
-    def on_live_point_ready(self, dt, values):
         # Skip if this is a repeat of the most recent timestamp
-        if self.x_data and dt <= self.x_data[-1]:
+        if len(self.data) and t <= self.data.latest_time():
             return
 
-        self.x_data.append(dt)
-        for i in range(6):
-            self.y_data[i].append(values[i])
-
-        # Only trim if we're not starting from past data
-        if not self.start_live_from_past_checkbox.isChecked():
-            while len(self.x_data) > self.max_live_points:
-                self.x_data.popleft()
-                for i in range(6):
-                    self.y_data[i].popleft()
+        # Only trim if we're not starting from past data. Trimmed by time span, as the
+        # scheduler changes the tick interval and with it the spacing of the points.
+        max_age = None if self.start_live_from_past_checkbox.isChecked() else self.live_window_minutes * 60
+        self.data.append(t, values, max_age, accel)
 
         self.refresh_plot()
 
@@ -713,15 +813,11 @@ class PlotWindow(QWidget):
 
         In all cases, we clear the plot buffers and load the data for a fresh plot.
         """
-        self.x_data.clear()
-        self.y_data = [collections.deque() for _ in range(6)]
-    
-        for dt, loads in data:
-            self.x_data.append(dt)
-            for i in range(6):
-                self.y_data[i].append(loads[i])
+        times, loads, *accel = data
+        self.data.set_data(times, loads, accel[0] if accel else None)
+        self.data_has_accel = bool(accel)
 
-        print(f"[PlotWindow] Loaded {len(data)} historical points")
+        print(f"[PlotWindow] Loaded {len(times)} historical points")
 
         # ✅ If waiting for pre-trigger plot, now enable live appending
         if getattr(self, 'waiting_for_pretrigger_plot', False):
@@ -735,17 +831,60 @@ class PlotWindow(QWidget):
         self.refresh_plot()
 
     def on_error(self, msg):
-        print(f"[SqlWorker] Error: {msg}")
+        print(f"[QueryService] Error: {msg}")
 
-    def connect_plot_events(self):
-        self.canvas.mpl_connect("button_press_event", self.on_plot_click)
+    def on_plot_hover(self, event):
+        if (not self.readout_checkbox.isChecked() or self.readout is None
+                or event.inaxes not in list(self.axes)):
+            return
+
+        t = datenum_to_epoch(event.xdata)
+        model = self.detail if self.detail.covers(t) else self.data
+        if not len(model):
+            return
 
-    def on_plot_click(self, event):
-        if event.inaxes and self.x_data:
-            click_time = mdates.num2date(event.xdata)
-            nearest_index = min(range(len(self.x_data)), key=lambda i: abs(self.x_data[i] - click_time))
-            y_vals = [self.y_data[i][nearest_index] for i in range(6)]
-            # print(f"Clicked near: {self.x_data[nearest_index]} -> {y_vals}")
+        index = model.nearest_index(t)
+        key = (id(model), index, event.x > self.canvas.figure.bbox.width / 2)
+        if key == self.readout_key:
+            return  # Same sample and side, nothing to redraw
+        self.readout_key = key
+
+        sample_t = model.times[index]
+        x = epoch_to_datenum(sample_t)
+        for line in self.cursor_lines:
+            line.set_data([x, x], [0, 1])
+            line.set_visible(True)
+
+        f1, f2, f3, f4, f5, f6, fx, fy, fz, mx, my, mz, ax, ay, az = model.columns()[index]
+        text = (
+            f"{epoch_to_datetime(sample_t).strftime('%H:%M:%S.%f')[:-3]}\n"
+            f"F1 {f1:+9.3f}  F2 {f2:+9.3f}\n"
+            f"F3 {f3:+9.3f}  F4 {f4:+9.3f}\n"
+            f"F5 {f5:+9.3f}  F6 {f6:+9.3f}\n"
+            f"Fx {fx:+9.3f}  Fy {fy:+9.3f}  Fz {fz:+9.3f} lbf\n"
+            f"Mx {mx:+9.2f}  My {my:+9.2f}  Mz {mz:+9.2f} lbf-in"
+        )
+        if not np.isnan([ax, ay, az]).all():
+            text += f"\nax {ax:+9.3f}  ay {ay:+9.3f}  az {az:+9.3f} g"
+        self.readout.set_text(text)
+
+        # Keep the box on the side of the cursor with more room
+        bbox = self.canvas.figure.bbox
+        right_half = event.x > bbox.width / 2
+        self.readout.set_horizontalalignment("right" if right_half else "left")
+        offset = -12 if right_half else 12
+        self.readout.set_position(((event.x + offset) / bbox.width, (event.y - 12) / bbox.height))
+        self.readout.set_visible(True)
+        self.blitter.update()
+
+    def hide_readout(self, event=None):
+        if self.readout is None or not self.readout.get_visible():
+            return
+        self.readout_key = None
+        self.readout.set_visible(False)
+        for line in self.cursor_lines:
+            line.set_visible(False)
+        self.blitter.update()
 
     # def hideEvent(self, event):
     #     if self.live_timer.isActive():
@@ -761,7 +900,6 @@ class PlotWindow(QWidget):
         if self.live_timer.isActive():
             self.live_timer.stop()
             print("Live timer stopped.")
-        print("Stopping worker thread.")
-        self.worker_thread.quit()
-        self.worker_thread.wait()
+        # Queries may still be in flight on the shared pool, just drop our callbacks
+        self.queries.cancel(self)
         event.accept()
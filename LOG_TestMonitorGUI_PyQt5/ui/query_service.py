@@ -0,0 +1,101 @@
+import collections
+import threading
+import time
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from comms.metrics import REGISTRY
+
+# Priority lanes, lower value is served first
+LANE_LIVE = 0
+LANE_HISTORICAL = 1
+LANE_EXPORT = 2
+LANE_NAMES = {LANE_LIVE: "live", LANE_HISTORICAL: "historical", LANE_EXPORT: "export"}
+
+
+class QueryService(QObject):
+    """
+    Small pool of SQLite query threads shared by every PlotWindow.
+
+    Jobs are plain functions (see ui/sql_worker.py) queued in priority lanes:
+    live before historical before export. One worker only serves the live lane,
+    so a slow historical query can never hold up live updates. Identical
+    requests (same function and arguments) that are still pending are coalesced
+    into one query and the result is handed to every caller.
+
+    submit() and cancel() must be called from the GUI thread; callbacks are
+    invoked on the GUI thread as well.
+    """
+    _completed = pyqtSignal(object, object, object)  # key, result, error
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, num_workers=3):
+        super().__init__()
+        self._lanes = [collections.deque() for _ in (LANE_LIVE, LANE_HISTORICAL, LANE_EXPORT)]
+        self._cond = threading.Condition()
+        self._pending = {}  # key -> [(owner, on_result, on_error), ...]
+        self._completed.connect(self._dispatch)
+        REGISTRY.gauge("query_queue_depth", "Queries waiting for a worker",
+                       fn=lambda: sum(len(lane) for lane in self._lanes))
+
+        for i in range(num_workers):
+            lanes = (LANE_LIVE,) if i == 0 else (LANE_LIVE, LANE_HISTORICAL, LANE_EXPORT)
+            threading.Thread(
+                target=self._worker_loop, args=(lanes,), name=f"QueryWorker-{i}", daemon=True
+            ).start()
+
+    def submit(self, lane, fn, args, on_result, on_error=None, owner=None):
+        key = (fn, tuple(args))
+        waiters = self._pending.get(key)
+        if waiters is not None:
+            # Same query already queued or running, piggyback on it
+            waiters.append((owner, on_result, on_error))
+            return
+
+        self._pending[key] = [(owner, on_result, on_error)]
+        with self._cond:
+            self._lanes[lane].append(key)
+            self._cond.notify_all()
+
+    def cancel(self, owner):
+        """Drop every pending callback registered by `owner` (e.g. a closing window)."""
+        for waiters in self._pending.values():
+            waiters[:] = [w for w in waiters if w[0] is not owner]
+
+    def _next_job(self, lanes):
+        with self._cond:
+            while True:
+                for lane in lanes:
+                    if self._lanes[lane]:
+                        return lane, self._lanes[lane].popleft()
+                self._cond.wait()
+
+    def _worker_loop(self, lanes):
+        while True:
+            lane, key = self._next_job(lanes)
+            fn, args = key
+            labels = {"lane": LANE_NAMES[lane]}
+            started = time.perf_counter()
+            try:
+                result = fn(*args)
+            except Exception as e:
+                REGISTRY.counter("query_errors", "Queries that raised", labels).inc()
+                self._completed.emit(key, None, f"[{fn.__name__}] {e}")
+                continue
+            finally:
+                REGISTRY.histogram("query_seconds", "Query run time per lane", labels).observe(
+                    time.perf_counter() - started)
+            self._completed.emit(key, result, None)
+
+    def _dispatch(self, key, result, error):
+        for owner, on_result, on_error in self._pending.pop(key, []):
+            if error is None:
+                on_result(result)
+            elif on_error:
+                on_error(error)
@@ -0,0 +1,243 @@
+#  python3 render_plots_commandline.py 2025-07-15 --sessions --format png,pdf
+
+import datetime
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use("Agg")  # No Qt, safe on a headless machine
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Database.averaging import BUCKET_OPTIONS, choose_bucket_ms, epoch_to_datetime
+from ui.plot_data import PlotDataModel, PLOT_TYPES, build_plot_axes, needs_accel, plot_labels
+from ui.sql_worker import query_range, query_range_with_accel, query_sessions
+
+PLOT_NAMES = list(PLOT_TYPES)
+FORMATS = ("png", "svg", "pdf")
+
+def print_usage():
+    plots = "\n".join(f"                    {i + 1}: {name}" for i, name in enumerate(PLOT_NAMES))
+    print(f"""
+render_plots_commandline.py
+
+Render the plot window's plot types from the database to image files,
+without the GUI. Figures are rendered in parallel worker processes.
+
+USAGE:
+  python3 render_plots_commandline.py YYYY-MM-DD [options]
+      Plot the whole day (00:00:00 to 23:59:59)
+
+  python3 render_plots_commandline.py "YYYY-MM-DD HH:MM:SS" "YYYY-MM-DD HH:MM:SS" [options]
+      Plot a custom time range
+
+  python3 render_plots_commandline.py --session-file FILE [options]
+      Plot every session listed in FILE, one "START,END" per line
+      (same time format, lines starting with # are ignored)
+
+OPTIONS:
+  --sessions        Split the range into sessions (one per trigger event)
+                    at gaps in the load cell data and plot each one
+  --gap SEC         Gap that separates two sessions (default: 2)
+  --pad SEC         Extra time plotted before and after each session (default: 0)
+  --plot N          Plot type to render, repeatable (default: all)
+{plots}
+  --subplots        One subplot per series instead of a single plot
+  --accel           Add the accelerometer axes below, on the same time axis
+  --bucket MS       Average into MS millisecond buckets (one of 0, 10, 100, 500, 1000;
+                    default: finest that keeps --max-points)
+  --max-points N    Point budget per series for the automatic bucket (default: 20000)
+  --format LIST     Comma separated: png, svg, pdf (default: png)
+  --dpi N           Raster resolution (default: 150)
+  --jobs N          Worker processes (default: CPU count)
+  --outdir DIR      Output directory (default: ~/Desktop/exportedPlots)
+  -h, --help        Show this help message
+""")
+
+def slug(plot_name):
+    """'Fx/Fy/Fz vs Time' -> 'fx_fy_fz'"""
+    return re.sub(r"[^a-z0-9]+", "_", plot_name.split(" vs ")[0].lower()).strip("_")
+
+def render_range(job):
+    """
+    Worker: query one time range once and save every requested plot type and
+    format for it. Returns (number of samples, [written paths]).
+    """
+    start, end = job["start"], job["end"]
+    bucket_ms = job["bucket_ms"]
+    if bucket_ms is None:
+        bucket_ms = choose_bucket_ms((end - start).total_seconds() * 1000, job["max_points"])
+
+    with_accel = job["with_accel"]
+    query = query_range_with_accel if any(needs_accel(p, with_accel) for p in job["plots"]) else query_range
+    data = PlotDataModel()
+    data.set_data(*query(start, end, bucket_ms))
+    if not len(data):
+        return 0, []
+
+    time_nums = data.time_nums()
+    base = f"{start.strftime('%Y-%m-%d_%H-%M-%S')}_to_{end.strftime('%Y-%m-%d_%H-%M-%S')}"
+    resolution = "raw" if bucket_ms == 0 else f"{bucket_ms} ms buckets"
+    written = []
+
+    for plot_name in job["plots"]:
+        labels = plot_labels(plot_name, with_accel)
+        height = 6 if job["mode_number"] == 1 else max(4, 2.2 * len(PLOT_TYPES[plot_name][0]))
+        if len(labels) > len(PLOT_TYPES[plot_name][0]):
+            height += 2  # Accelerometer panel
+        figure = Figure(figsize=(11, height))
+        FigureCanvasAgg(figure)
+
+        axes, lines, axis_series = build_plot_axes(figure, plot_name, job["mode_number"], with_accel)
+        for line, series in zip(lines, data.series(labels)):
+            line.set_data(time_nums, series)
+        for ax in axes:
+            ax.relim()
+            ax.autoscale_view()
+        axes[0].set_title(f"{plot_name}  {start:%Y-%m-%d %H:%M:%S} to {end:%H:%M:%S}  ({resolution})", fontsize=9)
+
+        for fmt in job["formats"]:
+            path = os.path.join(job["outdir"], f"{base}_{slug(plot_name)}.{fmt}")
+            figure.savefig(path, format=fmt, dpi=job["dpi"])
+            written.append(path)
+
+    return len(data), written
+
+def read_session_file(path):
+    sessions = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            start, end = (datetime.datetime.fromisoformat(part.strip()) for part in line.split(","))
+            sessions.append((start, end))
+    return sessions
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args or "-h" in args or "--help" in args:
+        print_usage()
+        sys.exit(0)
+
+    output_folder = os.path.expanduser("~/Desktop/exportedPlots")
+    split_sessions = False
+    session_file = None
+    gap_s = 2.0
+    pad_s = 0.0
+    plots = []
+    mode_number = 1
+    with_accel = False
+    bucket_ms = None
+    max_points = 20000
+    formats = ["png"]
+    dpi = 150
+    jobs = os.cpu_count() or 1
+
+    date_args = []
+    i = 0
+    while i < len(args):
+        if args[i].startswith("--"):
+            break
+        date_args.append(args[i])
+        i += 1
+
+    try:
+        options = args[i:]
+        while options:
+            opt = options.pop(0)
+            if opt == "--outdir":
+                output_folder = os.path.expanduser(options.pop(0))
+            elif opt == "--sessions":
+                split_sessions = True
+            elif opt == "--session-file":
+                session_file = options.pop(0)
+            elif opt == "--gap":
+                gap_s = float(options.pop(0))
+            elif opt == "--pad":
+                pad_s = float(options.pop(0))
+            elif opt == "--plot":
+                plots.append(PLOT_NAMES[int(options.pop(0)) - 1])
+            elif opt == "--subplots":
+                mode_number = 2
+            elif opt == "--accel":
+                with_accel = True
+            elif opt == "--bucket":
+                bucket_ms = int(options.pop(0))
+                if bucket_ms not in BUCKET_OPTIONS.values():
+                    raise ValueError(f"Unsupported bucket: {bucket_ms} ms")
+            elif opt == "--max-points":
+                max_points = int(options.pop(0))
+            elif opt == "--format":
+                formats = [fmt.strip().lower() for fmt in options.pop(0).split(",")]
+                unknown = [fmt for fmt in formats if fmt not in FORMATS]
+                if unknown:
+                    raise ValueError(f"Unsupported format: {', '.join(unknown)}")
+            elif opt == "--dpi":
+                dpi = int(options.pop(0))
+            elif opt == "--jobs":
+                jobs = max(1, int(options.pop(0)))
+            else:
+                raise ValueError(f"Unknown option: {opt}")
+
+        if session_file:
+            ranges = read_session_file(session_file)
+        elif len(date_args) == 1:
+            date = datetime.datetime.strptime(date_args[0], "%Y-%m-%d").date()
+            ranges = [(datetime.datetime.combine(date, datetime.time.min),
+                       datetime.datetime.combine(date, datetime.time(23, 59, 59)))]
+        elif len(date_args) == 2:
+            ranges = [(datetime.datetime.strptime(date_args[0], "%Y-%m-%d %H:%M:%S"),
+                       datetime.datetime.strptime(date_args[1], "%Y-%m-%d %H:%M:%S"))]
+        else:
+            raise ValueError("Invalid date/time arguments")
+    except (ValueError, IndexError, OSError) as e:
+        print(f"❌ {e}")
+        print_usage()
+        sys.exit(1)
+
+    started = time.perf_counter()
+
+    if split_sessions:
+        sessions = []
+        for start, end in ranges:
+            for s, e in query_sessions(start, end, gap_s):
+                # End is the last sample, plot up to the next microsecond so it is included
+                sessions.append((epoch_to_datetime(s), epoch_to_datetime(e + 1e-6)))
+        print(f"🔍 Found {len(sessions)} sessions")
+        ranges = sessions
+
+    pad = datetime.timedelta(seconds=pad_s)
+    os.makedirs(output_folder, exist_ok=True)
+    job_list = [
+        dict(start=start - pad, end=end + pad, bucket_ms=bucket_ms, max_points=max_points,
+             plots=plots or PLOT_NAMES, mode_number=mode_number, with_accel=with_accel,
+             formats=formats, dpi=dpi,
+             outdir=output_folder)
+        for start, end in ranges
+    ]
+
+    total_files = 0
+    failed = 0
+    with ProcessPoolExecutor(max_workers=min(jobs, max(1, len(job_list)))) as pool:
+        futures = {pool.submit(render_range, job): job for job in job_list}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                samples, written = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"❌ {job['start']} to {job['end']}: {e}")
+                continue
+            if not written:
+                print(f"⚠️ No data between {job['start']} and {job['end']}")
+            total_files += len(written)
+            for path in written:
+                print(f"✅ {path} ({samples} points)")
+
+    print(f"🏁 Rendered {total_files} files for {len(job_list)} ranges in {time.perf_counter() - started:.1f}s")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,205 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from Database.db import get_connection
+from Database.export_engine import iter_chunks
+from Database.mechanics import RIG
+from ui.plot_data import ACCEL_CHANNELS, CHANNELS
+
+# Channels the spectrum view can analyse: load cells, derived forces/moments, accelerometer axes
+SPECTRUM_CHANNELS = CHANNELS + ACCEL_CHANNELS
+
+SEGMENTS_PER_BATCH = 4096  # Bounds the memory of one vectorized FFT over a long range
+MAX_COLUMNS = 1200         # Spectrogram columns kept for a historical range
+
+
+def channel_table(channel):
+    return "accelerometer" if channel in ACCEL_CHANNELS else "load_cells"
+
+
+def channel_values(channel, values):
+    """1-D series of `channel` from raw (N, 6) loads or (N, 3) accelerometer rows."""
+    if channel in ACCEL_CHANNELS:
+        return values[:, ACCEL_CHANNELS.index(channel)]
+    index = CHANNELS.index(channel)
+    if index < 6:
+        return values[:, index]
+    return RIG.wrench(values)[:, index - 6]
+
+
+def estimate_fs(times):
+    """Sample rate from the median spacing, robust to the odd dropped sample."""
+    if len(times) < 2:
+        return None
+    dt = np.median(np.diff(times))
+    return 1.0 / dt if dt > 0 else None
+
+
+class StreamingSpectrum:
+    """
+    Welch PSD and spectrogram built from Hann-windowed, mean-removed segments
+    of `nperseg` samples overlapping by `overlap`.
+
+    push() only transforms the segments completed by the new samples, all at
+    once with numpy.fft.rfft, and keeps the unfinished overlap for the next
+    call, so a live stream never recomputes a window. Segments spanning a gap
+    in the data are skipped.
+
+    Segment spectra are summed into a preallocated array of spectrogram
+    columns. With `max_segments` (live) every column is one segment and only
+    the last `max_segments` are kept, the PSD is their mean. Without it (a
+    historical range) every segment is kept in at most `max_columns` columns:
+    when they fill up, neighbouring columns are merged in pairs, and the PSD
+    is the mean over the whole range.
+    """
+
+    def __init__(self, fs, nperseg=512, overlap=0.5, max_segments=300, max_columns=MAX_COLUMNS):
+        self.fs = fs
+        self.nperseg = nperseg
+        self.step = max(1, int(round(nperseg * (1 - overlap))))
+        self.max_segments = max_segments
+        self.window = np.hanning(nperseg)
+        # One-sided power spectral density scaling (same as scipy.signal.welch)
+        self.scale = np.full(nperseg // 2 + 1, 2.0 / (fs * np.sum(self.window ** 2)))
+        self.scale[0] /= 2
+        if nperseg % 2 == 0:
+            self.scale[-1] /= 2
+        self.freqs = np.fft.rfftfreq(nperseg, 1.0 / fs)
+
+        self._tail_t = np.empty(0)
+        self._tail_x = np.empty(0)
+        capacity = max(max_segments if max_segments is not None else max_columns, 2)
+        self._power = np.zeros((capacity, len(self.freqs)))  # Per column: summed segment spectra,
+        self._times = np.zeros(capacity)                     # summed segment centre times
+        self._counts = np.zeros(capacity, dtype="int64")     # and number of segments
+        self._columns = 0
+        self._per_column = 1  # Segments per full column, doubles on every merge
+
+    def __len__(self):
+        """Segments in the PSD."""
+        return int(self._counts[:self._columns].sum())
+
+    @property
+    def resolution(self):
+        return self.fs / self.nperseg
+
+    def push(self, times, values):
+        """Add samples, returns the number of new segments."""
+        t = np.concatenate([self._tail_t, np.asarray(times, dtype=float)])
+        x = np.concatenate([self._tail_x, np.nan_to_num(np.asarray(values, dtype=float))])
+
+        n_segments = (len(x) - self.nperseg) // self.step + 1 if len(x) >= self.nperseg else 0
+        if n_segments > 0:
+            t_windows = sliding_window_view(t, self.nperseg)[::self.step][:n_segments]
+            x_windows = sliding_window_view(x, self.nperseg)[::self.step][:n_segments]
+            max_span = 1.5 * (self.nperseg - 1) / self.fs
+            for i in range(0, n_segments, SEGMENTS_PER_BATCH):
+                tw = t_windows[i:i + SEGMENTS_PER_BATCH]
+                xw = x_windows[i:i + SEGMENTS_PER_BATCH]
+                valid = (tw[:, -1] - tw[:, 0]) <= max_span
+                self._store(tw[valid, self.nperseg // 2], self._segment_power(xw[valid]))
+
+        keep_from = n_segments * self.step
+        self._tail_t = t[keep_from:]
+        self._tail_x = x[keep_from:]
+        return n_segments
+
+    def _segment_power(self, segments):
+        segments = segments - segments.mean(axis=1, keepdims=True)
+        spectra = np.fft.rfft(segments * self.window, axis=1)
+        return (spectra.real ** 2 + spectra.imag ** 2) * self.scale
+
+    def _store(self, segment_times, power):
+        i = 0
+        while i < len(segment_times):
+            last = self._columns - 1
+            if last >= 0 and self._counts[last] < self._per_column:
+                # Fill up the open column
+                take = min(self._per_column - self._counts[last], len(segment_times) - i)
+                self._power[last] += power[i:i + take].sum(axis=0)
+                self._times[last] += segment_times[i:i + take].sum()
+                self._counts[last] += take
+                i += take
+            elif self._columns == len(self._counts):
+                self._make_room(len(segment_times) - i)
+            else:
+                # As many new columns as fit, each of up to _per_column segments
+                take = min(len(segment_times) - i, (len(self._counts) - self._columns) * self._per_column)
+                starts = np.arange(0, take, self._per_column)
+                new = slice(self._columns, self._columns + len(starts))
+                self._power[new] = np.add.reduceat(power[i:i + take], starts, axis=0)
+                self._times[new] = np.add.reduceat(segment_times[i:i + take], starts)
+                self._counts[new] = np.diff(np.append(starts, take))
+                self._columns += len(starts)
+                i += take
+
+    def _make_room(self, pending):
+        n = self._columns
+        if self.max_segments is not None:
+            # Live: drop the oldest columns, as many as are waiting to be stored
+            drop = min(n, pending)
+            for array in (self._power, self._times, self._counts):
+                array[:n - drop] = array[drop:n]
+            self._columns = n - drop
+            return
+        # Range: merge neighbouring columns in pairs, an odd last one stays as it is
+        half = n // 2
+        for array in (self._power, self._times, self._counts):
+            merged = array[0:2 * half:2] + array[1:2 * half:2]
+            if n % 2:
+                array[half] = array[n - 1]
+            array[:half] = merged
+        self._columns = half + n % 2
+        self._per_column *= 2
+
+    def psd(self):
+        """(freqs, Welch PSD averaged over the kept segments) or None before the first segment."""
+        if not len(self):
+            return None
+        return self.freqs, self._power[:self._columns].sum(axis=0) / len(self)
+
+    def spectrogram(self):
+        """(column centre times, freqs, power[n_columns, n_freqs]), each column the mean of its segments."""
+        counts = self._counts[:self._columns]
+        return self._times[:self._columns] / counts, self.freqs, self._power[:self._columns] / counts[:, None]
+
+    def spectrogram_mesh(self):
+        """
+        (time edges, freq edges, power) for pcolormesh. A column spans the hops
+        of its segments around its centre time. Columns are not evenly spaced
+        (gaps are skipped, range columns are merged), so a gap between two
+        columns gets an all-NaN column of its own and later columns keep their time.
+        """
+        times, freqs, power = self.spectrogram()
+        hop = self.step / self.fs
+        half = self._counts[:self._columns] * hop / 2
+        left, right = times - half, times + half
+        edges = np.concatenate([left[:1], (right[:-1] + left[1:]) / 2, right[-1:]])
+        gaps = np.flatnonzero(left[1:] - right[:-1] > hop)
+        edges[gaps + 1] = right[gaps]
+        edges = np.insert(edges, gaps + 2, left[gaps + 1])
+        power = np.insert(power, gaps + 1, np.nan, axis=0)
+        freq_edges = np.append(freqs - self.resolution / 2, freqs[-1] + self.resolution / 2)
+        return edges, freq_edges, power
+
+
+def query_range_spectrum(table, columns, channel, start_dt, end_dt, nperseg, overlap, max_columns=MAX_COLUMNS):
+    """
+    StreamingSpectrum of `channel` over a historical range, run on the
+    QueryService historical lane. Full-rate rows are read and pushed chunk by
+    chunk, so a long range never has all its rows or segment spectra in
+    memory. None when the range holds too few samples.
+    """
+    conn = get_connection()
+    stream = None
+    try:
+        for times, values, _ in iter_chunks(conn, table, list(columns), start_dt, end_dt):
+            if stream is None:
+                fs = estimate_fs(times)
+                if fs is None:
+                    continue
+                stream = StreamingSpectrum(fs, nperseg, overlap, max_segments=None, max_columns=max_columns)
+            stream.push(times, channel_values(channel, np.column_stack(values)))
+    finally:
+        conn.close()
+    return stream
@@ -0,0 +1,247 @@
+import numpy as np
+
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QComboBox, QDateTimeEdit
+)
+from PyQt5.QtCore import QDateTime, QTimer
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas, NavigationToolbar2QT as NavigationToolbar
+import matplotlib.ticker as ticker
+
+from ui.sql_worker import LOAD_COLUMNS, ACCEL_COLUMNS, query_raw_after
+from ui.query_service import QueryService, LANE_LIVE, LANE_HISTORICAL
+from ui.plot_data import epoch_to_datenum, format_msec
+from ui.spectral import (
+    SPECTRUM_CHANNELS, StreamingSpectrum, channel_table, channel_values, estimate_fs, query_range_spectrum
+)
+
+LIVE_INTERVAL_MS = 500      # How often new full-rate rows are fetched
+LIVE_BACKFILL_S = 10        # History loaded when live analysis starts
+LIVE_SEGMENTS = 300         # Spectrogram columns kept in live mode
+
+class SpectrumWindow(QWidget):
+    """
+    Welch PSD and spectrogram of one channel, from full-rate samples: either
+    streamed live (only the new rows are fetched and only the new FFT
+    segments are computed) or over a historical range.
+    """
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Spectrum Analyzer")
+        self.resize(1000, 800)
+
+        self.queries = QueryService.instance()
+        self.stream = None
+        self.last_time = None
+        self.query_in_flight = False
+        self.generation = 0  # Bumped on every restart, results of older requests are dropped
+
+        self.canvas = FigureCanvas(Figure(figsize=(6, 8)))
+        self.toolbar = NavigationToolbar(self.canvas, self)
+        self.psd_ax, self.spec_ax = self.canvas.figure.subplots(nrows=2)
+        self.psd_line, = self.psd_ax.semilogy([], [])
+        self.psd_ax.set_title("Welch PSD", fontsize=9)
+        self.psd_ax.set_xlabel("Frequency (Hz)", fontsize=9)
+        self.psd_ax.set_ylabel("PSD (unit²/Hz)", fontsize=9)
+        self.psd_ax.grid(True, which="both", alpha=0.4)
+        self.psd_ax.tick_params(labelsize=8)
+
+        # Rebuilt on every redraw, the column edges follow the segment times
+        self.spec_mesh = self.spec_ax.pcolormesh(np.zeros((1, 1)), cmap="viridis")
+        self.colorbar = self.canvas.figure.colorbar(self.spec_mesh, ax=self.spec_ax, label="dB")
+        self.spec_ax.set_ylabel("Frequency (Hz)", fontsize=9)
+        self.spec_ax.set_xlabel("Time", fontsize=9)
+        self.spec_ax.tick_params(labelsize=8)
+        self.spec_ax.xaxis_date()
+        self.spec_ax.xaxis.set_major_formatter(ticker.FuncFormatter(format_msec))
+        self.canvas.figure.tight_layout()
+
+        self.live_timer = QTimer()
+        self.live_timer.setInterval(LIVE_INTERVAL_MS)
+        self.live_timer.timeout.connect(self.request_live_rows)
+
+        # --- Controls ---
+        self.channel_selector = QComboBox()
+        self.channel_selector.addItems(SPECTRUM_CHANNELS)
+        self.channel_selector.currentTextChanged.connect(lambda _: self.restart())
+
+        self.segment_selector = QComboBox()
+        self.segment_selector.addItems(["256", "512", "1024", "2048", "4096"])
+        self.segment_selector.setCurrentText("512")
+        self.segment_selector.currentTextChanged.connect(lambda _: self.restart())
+
+        self.overlap_selector = QComboBox()
+        self.overlap_selector.addItems(["0%", "50%", "75%"])
+        self.overlap_selector.setCurrentText("50%")
+        self.overlap_selector.currentTextChanged.connect(lambda _: self.restart())
+
+        self.live_btn = QPushButton("Start Live")
+        self.live_btn.clicked.connect(self.toggle_live)
+
+        self.start_time_edit = QDateTimeEdit(QDateTime.currentDateTime().addSecs(-600))
+        self.start_time_edit.setDisplayFormat("yyyy-MM-dd HH:mm:ss")
+        self.start_time_edit.setCalendarPopup(True)
+
+        self.end_time_edit = QDateTimeEdit(QDateTime.currentDateTime())
+        self.end_time_edit.setDisplayFormat("yyyy-MM-dd HH:mm:ss")
+        self.end_time_edit.setCalendarPopup(True)
+
+        self.analyze_btn = QPushButton("Analyze")
+        self.analyze_btn.clicked.connect(self.analyze_range)
+
+        self.status_label = QLabel("No data")
+
+        control_layout = QHBoxLayout()
+        control_layout.addWidget(QLabel("Channel:"))
+        control_layout.addWidget(self.channel_selector)
+        control_layout.addWidget(QLabel("Segment:"))
+        control_layout.addWidget(self.segment_selector)
+        control_layout.addWidget(QLabel("Overlap:"))
+        control_layout.addWidget(self.overlap_selector)
+        control_layout.addWidget(self.live_btn)
+        control_layout.addStretch()
+
+        range_layout = QHBoxLayout()
+        range_layout.addWidget(QLabel("Start:"))
+        range_layout.addWidget(self.start_time_edit)
+        range_layout.addWidget(QLabel("End:"))
+        range_layout.addWidget(self.end_time_edit)
+        range_layout.addWidget(self.analyze_btn)
+        range_layout.addStretch()
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.toolbar)
+        layout.addLayout(control_layout)
+        layout.addLayout(range_layout)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.canvas)
+        self.setLayout(layout)
+
+    def source(self):
+        channel = self.channel_selector.currentText()
+        table = channel_table(channel)
+        columns = ACCEL_COLUMNS if table == "accelerometer" else LOAD_COLUMNS
+        return channel, table, tuple(columns)  # Hashable, query arguments are coalescing keys
+
+    def segment_settings(self):
+        return int(self.segment_selector.currentText()), int(self.overlap_selector.currentText().rstrip("%")) / 100
+
+    def new_stream(self, times, max_segments):
+        fs = estimate_fs(times)
+        if fs is None:
+            return None
+        nperseg, overlap = self.segment_settings()
+        return StreamingSpectrum(fs, nperseg, overlap, max_segments)
+
+    def restart(self):
+        # Segment settings or channel changed: live analysis starts over, a range is recomputed
+        self.stream = None
+        self.last_time = None
+        self.generation += 1
+        if not self.live_timer.isActive():
+            self.status_label.setText("Settings changed — press Analyze or Start Live")
+
+    # --- Live ---
+    def toggle_live(self):
+        if self.live_timer.isActive():
+            self.live_timer.stop()
+            self.live_btn.setText("Start Live")
+            self.analyze_btn.setEnabled(True)
+            return
+
+        self.stream = None
+        self.last_time = None
+        self.generation += 1
+        self.live_timer.start()
+        self.live_btn.setText("Stop Live")
+        self.analyze_btn.setEnabled(False)
+        self.request_live_rows()
+
+    def request_live_rows(self):
+        if self.query_in_flight:
+            return  # Previous fetch still running, new rows are picked up next time
+        _, table, columns = self.source()
+        self.query_in_flight = True
+        self.queries.submit(LANE_LIVE, query_raw_after, (table, columns, self.last_time, LIVE_BACKFILL_S),
+                            lambda rows, g=self.generation: self.on_live_rows(g, rows),
+                            self.on_error, owner=self)
+
+    def on_live_rows(self, generation, rows):
+        self.query_in_flight = False
+        times, values = rows
+        if generation != self.generation or not len(times) or not self.live_timer.isActive():
+            return
+
+        channel, _, _ = self.source()
+        if self.stream is None:
+            self.stream = self.new_stream(times, LIVE_SEGMENTS)
+            if self.stream is None:
+                return
+        self.stream.push(times, channel_values(channel, values))
+        self.last_time = times[-1]
+        self.redraw()
+
+    # --- Historical ---
+    def analyze_range(self):
+        channel, table, columns = self.source()
+        nperseg, overlap = self.segment_settings()
+        start_dt = self.start_time_edit.dateTime().toPyDateTime().replace(microsecond=0)
+        end_dt = self.end_time_edit.dateTime().toPyDateTime().replace(microsecond=0)
+        self.generation += 1
+        self.status_label.setText("Loading...")
+        # Rows are read and transformed on the worker, only the finished spectrum comes back
+        self.queries.submit(LANE_HISTORICAL, query_range_spectrum,
+                            (table, columns, channel, start_dt, end_dt, nperseg, overlap),
+                            lambda stream, g=self.generation: self.on_range_spectrum(g, stream),
+                            self.on_error, owner=self)
+
+    def on_range_spectrum(self, generation, stream):
+        if generation != self.generation:
+            return
+        self.stream = stream
+        if stream is None:
+            self.status_label.setText("Not enough data in range")
+            return
+        self.redraw()
+
+    # --- Drawing ---
+    def redraw(self):
+        channel, _, _ = self.source()
+        stream = self.stream
+        psd = stream.psd()
+        if psd is None:
+            self.status_label.setText(f"{channel}: waiting for {stream.nperseg} samples")
+            return
+
+        freqs, power = psd
+        self.psd_line.set_data(freqs[1:], power[1:])  # DC is removed by the detrend
+        self.psd_ax.relim()
+        self.psd_ax.autoscale_view()
+        self.psd_ax.set_title(f"{channel} Welch PSD", fontsize=9)
+
+        time_edges, freq_edges, spectra = stream.spectrogram_mesh()
+        db = 10 * np.log10(spectra.T + 1e-20)  # NaN gap columns stay NaN and are left blank
+        t_edges = epoch_to_datenum(time_edges)
+        self.spec_mesh.remove()
+        self.spec_mesh = self.spec_ax.pcolormesh(t_edges, freq_edges, db, cmap="viridis",
+                                                 vmin=np.nanpercentile(db, 5), vmax=np.nanmax(db))
+        self.colorbar.update_normal(self.spec_mesh)
+        self.spec_ax.set_xlim(t_edges[0], t_edges[-1])
+        self.spec_ax.set_ylim(freq_edges[0], freq_edges[-1])
+
+        self.status_label.setText(
+            f"{channel}: fs {stream.fs:.0f} Hz, {len(stream)} segments of {stream.nperseg}, "
+            f"Δf {stream.resolution:.2f} Hz"
+        )
+        self.canvas.draw_idle()
+
+    def on_error(self, msg):
+        self.query_in_flight = False
+        print(f"[QueryService] Error: {msg}")
+        self.status_label.setText(f"❌ Error: {msg}")  # Replaces "Loading..." of a failed range
+
+    def closeEvent(self, event):
+        self.live_timer.stop()
+        self.queries.cancel(self)
+        print("[SpectrumWindow] Window closed.")
+        event.accept()
@@ -1,93 +1,178 @@
-from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
-import datetime
+import numpy as np
 from Database.db import get_connection
-
-
-class SqlWorker(QObject):
-    data_ready = pyqtSignal(list)
-    single_point_ready = pyqtSignal(datetime.datetime, list)
-    error = pyqtSignal(str)
-
-    @pyqtSlot(datetime.datetime, datetime.datetime, int)
-    def query_range(self, start_dt, end_dt, avg_n):
-        try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT timestamp, lc1, lc2, lc3, lc4, lc5, lc6
-                FROM load_cells
-                WHERE timestamp >= ? AND timestamp < ?
-                ORDER BY timestamp
-            """, (start_dt, end_dt))
-            rows = cursor.fetchall()
-            conn.close()
-
-            buffer = []
-            result = []
-
-            for row in rows:
-                ts = row[0]
-                if isinstance(ts, str):
-                    try:
-                        ts = datetime.datetime.strptime(ts, "%Y-%m-%d %H:%M:%S.%f")
-                    except ValueError:
-                        try:
-                            ts = datetime.datetime.strptime(ts, "%Y-%m-%d %H:%M:%S")
-                        except ValueError:
-                            print(f"⚠️ Skipping unparseable timestamp: {ts}")
-                            continue
-
-                values = row[1:]
-                buffer.append((ts, values))
-                if len(buffer) >= avg_n:
-                    avg_ts = sum(t.timestamp() for t, _ in buffer) / avg_n
-                    avg_dt = datetime.datetime.fromtimestamp(avg_ts)
-                    avg_vals = [sum(v[i] for _, v in buffer) / avg_n for i in range(6)]
-                    result.append((avg_dt, avg_vals))
-                    buffer.clear()
-
-            self.data_ready.emit(result)
-
-        except Exception as e:
-            self.error.emit(str(e))
-
-    @pyqtSlot(int)
-    def query_last_n_samples(self, n):
-        try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT timestamp, lc1, lc2, lc3, lc4, lc5, lc6
-                FROM load_cells
-                ORDER BY timestamp DESC
-                LIMIT ?
-            """, (n,))
-            rows = cursor.fetchall()
-            conn.close()
-
-            if not rows or len(rows) < n:
-                return  # Not enough data
-
-            # Reverse to chronological order
-            rows.reverse()
-
-            # Convert timestamps to epoch seconds with fallback
-            times = []
-            for r in rows:
-                ts_str = r[0]
-                try:
-                    ts = datetime.datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S.%f")
-                except ValueError:
-                    ts = datetime.datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S")
-                times.append(ts.timestamp())
-
-            avg_time = datetime.datetime.fromtimestamp(sum(times) / n)
-
-            # Average loads
-            transposed = list(zip(*[r[1:] for r in rows]))  # Skip timestamp
-            avg_loads = [sum(col) / n for col in transposed]
-
-            self.single_point_ready.emit(avg_time, avg_loads)
-
-        except Exception as e:
-            self.error.emit(f"[query_last_n_samples] {e}")
+from Database.averaging import EPOCH_SQL, bucketed_select, epoch_to_datetime
+from Database.alignment import ACCEL_TOLERANCE_S, accel_tolerance, asof_align
+
+# Plain query functions run by the shared QueryService worker pool (ui/query_service.py).
+# They only touch SQLite, never Qt objects, so they are safe on any thread.
+
+LOAD_COLUMNS = ["timestamp", "lc1", "lc2", "lc3", "lc4", "lc5", "lc6"]
+ACCEL_COLUMNS = ["timestamp", "ax", "ay", "az"]
+
+
+def _to_arrays(rows, columns):
+    data = np.array(rows, dtype=float).reshape(-1, len(columns))
+    return data[:, 0], data[:, 1:]
+
+
+def query_table_range(table, columns, start_dt, end_dt, bucket_ms=0):
+    """Return (epoch_seconds[N], values[N, len(columns) - 1]) for the range, averaged per time bucket."""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(bucketed_select(table, columns, bucket_ms), (start_dt, end_dt))
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    return _to_arrays(rows, columns)
+
+
+def query_range(start_dt, end_dt, bucket_ms):
+    """Return (epoch_seconds[N], loads[N, 6]) arrays for the range, averaged per time bucket."""
+    return query_table_range("load_cells", LOAD_COLUMNS, start_dt, end_dt, bucket_ms)
+
+
+def query_range_with_accel(start_dt, end_dt, bucket_ms):
+    """
+    Like query_range, plus accel[N, 3]: the accelerometer rows of the same
+    range as-of aligned onto the load cell times. Both tables are read on one
+    connection inside one read transaction, so they come from the same snapshot.
+    """
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")
+        cursor.execute(bucketed_select("load_cells", LOAD_COLUMNS, bucket_ms), (start_dt, end_dt))
+        load_rows = cursor.fetchall()
+        cursor.execute(bucketed_select("accelerometer", ACCEL_COLUMNS, bucket_ms), (start_dt, end_dt))
+        accel_rows = cursor.fetchall()
+        conn.commit()
+    finally:
+        conn.close()
+
+    times, loads = _to_arrays(load_rows, LOAD_COLUMNS)
+    accel_times, accels = _to_arrays(accel_rows, ACCEL_COLUMNS)
+    return times, loads, asof_align(times, accel_times, accels, accel_tolerance(bucket_ms))
+
+
+def query_raw_after(table, columns, after_epoch, backfill_s):
+    """
+    Full-rate rows of `table` newer than after_epoch, as (epoch_seconds, values).
+    With after_epoch None, start backfill_s seconds before the newest row.
+    """
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        if after_epoch is None:
+            cursor.execute(f"SELECT {EPOCH_SQL} FROM {table} ORDER BY timestamp DESC LIMIT 1")
+            latest = cursor.fetchone()
+            if not latest or latest[0] is None:
+                return _to_arrays([], columns)
+            after_epoch = latest[0] - backfill_s
+
+        cursor.execute(bucketed_select(table, columns, 0, where="timestamp > ?"),
+                       (epoch_to_datetime(after_epoch),))
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    times, values = _to_arrays(rows, columns)
+    # Timestamp text comparison can let the boundary row through again
+    keep = times > after_epoch
+    return times[keep], values[keep]
+
+
+def query_last_bucket(bucket_ms, with_accel=False):
+    """
+    Return (epoch_seconds, [lc1..lc6], accel) for the most recent complete time
+    bucket (or the newest raw sample when bucket_ms is 0), None if there is no
+    data. accel is [ax, ay, az] for the same bucket (or the latest accelerometer
+    row within ACCEL_TOLERANCE_S of the raw sample) when with_accel is set,
+    NaNs when there is none, and None without with_accel.
+    """
+    no_accel = [float("nan")] * 3
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT {EPOCH_SQL}, lc1, lc2, lc3, lc4, lc5, lc6, timestamp
+            FROM load_cells
+            ORDER BY timestamp DESC
+            LIMIT 1
+        """)
+        latest = cursor.fetchone()
+
+        if not latest or latest[0] is None:
+            return None  # Not enough data
+
+        if bucket_ms <= 0:
+            accel = None
+            if with_accel:
+                cursor.execute(f"""
+                    SELECT {EPOCH_SQL}, ax, ay, az
+                    FROM accelerometer
+                    WHERE timestamp <= ?
+                    ORDER BY timestamp DESC
+                    LIMIT 1
+                """, (latest[7],))
+                accel_row = cursor.fetchone()
+                close = accel_row and latest[0] - accel_row[0] <= ACCEL_TOLERANCE_S
+                accel = list(accel_row[1:]) if close else no_accel
+            return latest[0], list(latest[1:7]), accel
+
+        # The bucket holding the newest sample is still filling, use the one before it
+        latest_ms = round(latest[0] * 1000)
+        bucket_end_ms = latest_ms - latest_ms % bucket_ms
+        bucket_start_ms = bucket_end_ms - bucket_ms
+        bucket_range = (epoch_to_datetime(bucket_start_ms / 1000), epoch_to_datetime(bucket_end_ms / 1000))
+
+        cursor.execute(bucketed_select("load_cells", LOAD_COLUMNS, bucket_ms), bucket_range)
+        row = cursor.fetchone()
+
+        accel = None
+        if row and with_accel:
+            cursor.execute(bucketed_select("accelerometer", ACCEL_COLUMNS, bucket_ms), bucket_range)
+            accel_row = cursor.fetchone()
+            accel = list(accel_row[1:]) if accel_row else no_accel
+    finally:
+        conn.close()
+
+    if not row:
+        return None  # Gap in the data, nothing to average
+
+    return row[0], list(row[1:]), accel
+
+
+def query_sessions(start_dt, end_dt, gap_s):
+    """
+    Split the load cell samples in the range into sessions (e.g. one per
+    trigger event) separated by gaps longer than gap_s seconds.
+    Returns a list of (start_epoch, end_epoch).
+    """
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT t, gap_before IS NULL OR gap_before > ?, gap_after IS NULL OR gap_after > ?
+            FROM (
+                SELECT t, t - LAG(t) OVER w AS gap_before, LEAD(t) OVER w - t AS gap_after
+                FROM (SELECT {EPOCH_SQL} AS t FROM load_cells WHERE timestamp >= ? AND timestamp < ?)
+                WINDOW w AS (ORDER BY t)
+            )
+            WHERE gap_before IS NULL OR gap_before > ? OR gap_after IS NULL OR gap_after > ?
+            ORDER BY t
+        """, (gap_s, gap_s, start_dt, end_dt, gap_s, gap_s))
+        edges = cursor.fetchall()
+    finally:
+        conn.close()
+
+    sessions = []
+    session_start = None
+    for t, starts, ends in edges:
+        if starts:
+            session_start = t
+        if ends and session_start is not None:
+            sessions.append((session_start, t))
+            session_start = None
+    return sessions
@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+STARTUP_TARGET_S = 1.5               # From interpreter start to the main window on screen
+REPORT_ENV = "LOG_STARTUP_REPORT"    # Set to 1 for the per-step breakdown
+DEFERRED_MODULES = ("matplotlib", "pandas")  # Must only be imported when a window needs them
+
+class StartupReport:
+    """
+    Times the steps of application startup (module imports, DB setup, main
+    window construction) and checks the total against STARTUP_TARGET_S.
+    For the full import tree use: python3 -X importtime main.py
+    """
+
+    def __init__(self, started=None):
+        self.started = time.perf_counter() if started is None else started
+        self.steps = []
+
+    @contextmanager
+    def timed(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((name, time.perf_counter() - t0))
+
+    def finish(self):
+        total = time.perf_counter() - self.started
+        loaded = [name for name in DEFERRED_MODULES if name in sys.modules]
+
+        if os.environ.get(REPORT_ENV) == "1":
+            print("[Startup] Step                          Time")
+            for name, seconds in self.steps:
+                print(f"[Startup] {name:<28} {seconds * 1000:7.1f} ms")
+            print(f"[Startup] {'other':<28} {(total - sum(s for _, s in self.steps)) * 1000:7.1f} ms")
+
+        status = "✅" if total <= STARTUP_TARGET_S else "⚠️"
+        print(f"[Startup] {status} Main window ready in {total:.2f} s (target {STARTUP_TARGET_S:.1f} s)")
+        if loaded:
+            print(f"[Startup] ⚠️ Imported during startup, should be deferred: {', '.join(loaded)}")
+        return total